@@ -3,7 +3,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.routers import artifact
 from backend.routers import workspace
+from backend.routers import job
 from backend.config import init_db
+from backend.crud.maintenance import start_compaction_scheduler
+from backend.services.jobs import start_workers
 
 origins = [
     "http://localhost.local.com",
@@ -25,8 +28,15 @@ app.add_middleware(
 # Initialize database (if using SQLModel without Alembic)
 init_db()
 
+# Background job workers; resumes jobs queued (or interrupted) before a restart
+start_workers()
+
+# Periodic version retention / VACUUM (settings.COMPACTION_INTERVAL_HOURS)
+start_compaction_scheduler()
+
 app.include_router(artifact.router)
 app.include_router(workspace.router)
+app.include_router(job.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,111 @@
+# backend/bench_sqlite.py
+# Read/write concurrency benchmark for the SQLite settings in backend/config.py.
+#
+# Runs reader threads (list_artifacts, like the UI) next to writer threads
+# (set_artifact_indexed, like a reindex) against a scratch database, once with
+# SQLite defaults (rollback journal, synchronous=FULL, no busy timeout) and once
+# with the configured PRAGMAs, and prints throughput and "database is locked" errors.
+#
+#   python -m backend.bench_sqlite --readers 8 --writers 2 --seconds 5
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine
+
+from backend.config import configure_sqlite, sqlite_pragmas
+from backend.crud.artifact import create_new_artifact, list_artifacts, set_artifact_indexed
+from backend.crud.workspace import create_workspace
+
+DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+def _make_engine(path: str, pragmas: dict):
+    # timeout=0 disables pysqlite's own busy handler so busy_timeout (if any) is the only one
+    engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 0})
+    return configure_sqlite(engine, pragmas)
+
+
+def _seed(engine, artifacts: int) -> tuple:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        workspace_id = create_workspace("bench", session=session).id
+        ids = [
+            create_new_artifact(workspace_id, f"doc{i}", f"Title {i}", "content " * 200, session=session).id
+            for i in range(artifacts)
+        ]
+    return workspace_id, ids
+
+
+def _worker(engine, stop: threading.Event, stats: dict, lock: threading.Lock, operation):
+    ops = errors = 0
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            with Session(engine) as session:
+                operation(session)
+            ops += 1
+            latencies.append(time.perf_counter() - started)
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            errors += 1
+    with lock:
+        stats["ops"] += ops
+        stats["errors"] += errors
+        stats["latencies"].extend(latencies)
+
+
+def run(label: str, pragmas: dict, readers: int, writers: int, seconds: float, artifacts: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = _make_engine(os.path.join(directory, "bench.db"), pragmas)
+        workspace_id, ids = _seed(engine, artifacts)
+
+        def read(session):
+            list_artifacts(workspace_id, limit=20, page=random.randint(1, max(1, artifacts // 20)), session=session)
+
+        def write(session):
+            set_artifact_indexed(random.choice(ids), session=session)
+
+        stop, lock = threading.Event(), threading.Lock()
+        read_stats = {"ops": 0, "errors": 0, "latencies": []}
+        write_stats = {"ops": 0, "errors": 0, "latencies": []}
+        threads = [threading.Thread(target=_worker, args=(engine, stop, read_stats, lock, read)) for _ in range(readers)]
+        threads += [threading.Thread(target=_worker, args=(engine, stop, write_stats, lock, write)) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    print(f"[{label}] {pragmas}")
+    for name, stats in (("reads", read_stats), ("writes", write_stats)):
+        latencies = sorted(stats["latencies"]) or [0.0]
+        p95 = latencies[int(len(latencies) * 0.95) - 1 if len(latencies) > 1 else 0]
+        print(
+            f"  {name:6}: {stats['ops'] / seconds:8.1f} ops/s, p95 {p95 * 1000:7.2f} ms, "
+            f"{stats['errors']} 'database is locked' errors"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite read/write concurrency benchmark")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--artifacts", type=int, default=500)
+    args = parser.parse_args()
+
+    for label, pragmas in (("sqlite defaults", DEFAULT_PRAGMAS), ("configured", sqlite_pragmas())):
+        run(label, pragmas, args.readers, args.writers, args.seconds, args.artifacts)
+
+
+if __name__ == "__main__":
+    main()
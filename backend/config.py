@@ -1,10 +1,19 @@
 # backend/config.py
+import functools
+from contextlib import contextmanager
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
-from sqlmodel import create_engine, SQLModel
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import create_engine, Session, SQLModel
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./database.db"
+    # Async driver URL for the API routers; derived from DATABASE_URL for SQLite (aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None
    
     LLM_MODEL: str = "deepseek-r1"
     EMBEDDING_MODEL: str = "deepseek-r1"
@@ -12,14 +21,178 @@ class Settings(BaseSettings):
     LLM_TIMEOUT: float = 300.0
     DEBUG: bool =  False
     VECTOR_DB_PATH: str  = "./chroma_db"
+
+    # Indexing throughput (backend/rag/crud.py): chunks are embedded
+    # EMBEDDING_BATCH_SIZE texts per request, with up to EMBEDDING_CONCURRENCY
+    # requests in flight; a reindex inserts INDEX_BATCH_SIZE artifacts at a time.
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_CONCURRENCY: int = 4
+    INDEX_BATCH_SIZE: int = 256
+    # Text embeddings are cached on disk by (model, text hash) in this SQLite file
+    # ("" disables it); query embeddings in an in-memory LRU of this many entries
+    # (backend/rag/embedding_cache.py)
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache.db"
+    EMBEDDING_QUERY_CACHE_SIZE: int = 256
+    # Node parsing before embedding (backend/rag/chunking.py): "sentence" packs
+    # sentences into chunks, "markdown" splits on headings first, "token" cuts
+    # fixed token windows. Sizes are in tokens.
+    CHUNK_SPLITTER: Literal["sentence", "markdown", "token"] = "sentence"
+    CHUNK_SIZE: int = 512
+    CHUNK_OVERLAP: int = 64
+
+    # FTS5 tokenizer for artifact keyword search. "trigram" gives substring
+    # matching for any script (Japanese, Vietnamese, ...); use e.g.
+    # "unicode61 remove_diacritics 2" for a smaller word-based index.
+    FTS_TOKENIZER: str = "trigram"
+
+    # SQLite connection tuning, applied as PRAGMAs on every new connection.
+    # WAL lets UI reads run while reindexing writes; synchronous=NORMAL is
+    # durable across app crashes in WAL mode (only an OS crash can lose the
+    # last commits). cache_size < 0 is in KiB; mmap_size is in bytes (0 = off).
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -64000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    # How long a writer waits for the lock before "database is locked" (ms)
+    SQLITE_BUSY_TIMEOUT: int = 5000
+    # INCREMENTAL lets the compaction job return free pages to the OS without a
+    # full VACUUM. Only takes effect on a new database file; the first compaction
+    # converts an existing one (see backend/crud/maintenance.py).
+    SQLITE_AUTO_VACUUM: Literal["NONE", "FULL", "INCREMENTAL"] = "INCREMENTAL"
+
+    # Archived versions whose text is no longer current are stored as a delta
+    # against their parent version; every ARTIFACT_SNAPSHOT_INTERVAL-th link of a
+    # delta chain is kept as a full snapshot to bound reconstruction cost.
+    ARTIFACT_DELTA_STORAGE: bool = True
+    ARTIFACT_SNAPSHOT_INTERVAL: int = 10
+
+    # In-process cache of current artifacts by document_id (backend/crud/cache.py)
+    ARTIFACT_CACHE_ENABLED: bool = True
+    ARTIFACT_CACHE_SIZE: int = 1024
+    ARTIFACT_CACHE_TTL: float = 60.0  # seconds; bounds staleness from writers in other processes
+
+    # Connection pool of db_engine / async_db_engine (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+
+    # Background compaction (version retention, blob GC, incremental VACUUM)
+    # every COMPACTION_INTERVAL_HOURS; 0 disables the scheduler.
+    COMPACTION_INTERVAL_HOURS: float = 24.0
+
+    # Background jobs (reindex, compaction, regeneration; backend/services/jobs.py)
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL: float = 1.0  # seconds between checks for jobs queued by other processes
+    JOB_PROGRESS_INTERVAL: float = 0.5  # minimum seconds between progress writes of a job
     
     
 settings = Settings()
 
+
+def sqlite_pragmas(config: Settings = settings) -> dict:
+    """
+    PRAGMAs applied to each SQLite connection, in order: busy_timeout comes first
+    so the others (journal_mode needs a lock) wait for concurrent connections
+    instead of failing, and auto_vacuum must run before journal_mode, which
+    writes the header of a new database file.
+    """
+    return {
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT,
+        "auto_vacuum": config.SQLITE_AUTO_VACUUM,
+        "journal_mode": config.SQLITE_JOURNAL_MODE,
+        "synchronous": config.SQLITE_SYNCHRONOUS,
+        "cache_size": config.SQLITE_CACHE_SIZE,
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+    }
+
+
+def configure_sqlite(engine: Engine, pragmas: dict) -> Engine:
+    """
+    Runs `pragmas` on every new DBAPI connection of `engine` (a no-op for other
+    databases). For async engines pass `async_engine.sync_engine`.
+    """
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return engine
+
+
+def _pool_options(url: str) -> dict:
+    # In-memory SQLite uses a single/static connection pool without sizing options
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
 # Rename 'engine' to 'db_engine' for clarity
-db_engine = create_engine(settings.DATABASE_URL, echo=False)
+db_engine = configure_sqlite(
+    create_engine(settings.DATABASE_URL, echo=False, **_pool_options(settings.DATABASE_URL)),
+    sqlite_pragmas(),
+)
+
+
+def _async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    if url.drivername != "sqlite":
+        raise ValueError("Set ASYNC_DATABASE_URL for non-SQLite databases.")
+    return url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+
+
+# Async engine on the same database, used by the API routers (backend.crud.*_async)
+async_db_engine = create_async_engine(_async_database_url(), echo=False, **_pool_options(_async_database_url()))
+configure_sqlite(async_db_engine.sync_engine, sqlite_pragmas())
+
+
+@contextmanager
+def session_scope(session: Optional[Session] = None):
+    """
+    Yields the caller's session, or a new one on db_engine that is closed on exit.
+    CRUD functions accept `session=` so the async layer can run them on the
+    sync facade of an AsyncSession (AsyncSession.run_sync).
+    """
+    if session is not None:
+        yield session
+    else:
+        with Session(db_engine) as new_session:
+            yield new_session
+
+
+def to_async(function):
+    """
+    Wraps a sync CRUD function (one that accepts `session=`) as a coroutine that runs
+    it on a new AsyncSession of async_db_engine via run_sync.
+    """
+    @functools.wraps(function)
+    async def run(*args, **kwargs):
+        async with AsyncSession(async_db_engine) as session:
+            return await session.run_sync(lambda sync_session: function(*args, session=sync_session, **kwargs))
+    return run
+
+
+# Tables init_db() keeps across restarts: queued and interrupted background jobs
+# (and their status) must survive until start_workers() picks them up again.
+PERSISTENT_TABLES = ("job",)
+
 
 def init_db():
     # Add this line to force recreate tables
-    SQLModel.metadata.drop_all(db_engine)
+    SQLModel.metadata.drop_all(
+        db_engine,
+        tables=[table for table in SQLModel.metadata.sorted_tables if table.name not in PERSISTENT_TABLES],
+    )
     SQLModel.metadata.create_all(db_engine)
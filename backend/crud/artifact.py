@@ -1,13 +1,31 @@
 # backend/crud/artifact.py
+import base64
+import copy
 import datetime
-from sqlmodel import Session, select, desc
-from backend.models.artifact import Artifact
-from backend.config import db_engine  # Clear name for the database engine
-from typing import List, Optional, Dict, Tuple
-from sqlmodel import Session, select, func
-from backend.models.artifact import Artifact
-from backend.config import db_engine
-import datetime
+import json
+import random
+import time
+from sqlmodel import Session, select, desc, func, or_, and_, delete
+from sqlalchemy import event, literal, literal_column, insert, text, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+from backend.models.artifact import (
+    Artifact, ArtifactHistory, ArtifactFTS, ArtifactImpact, ArtifactReference, ContentBlob, artifact_content, artifact_history_content,
+    blob_text_sql, encode_delta, hash_content, store_content_blobs
+)
+from backend.crud.cache import current_artifact_cache
+from backend.config import db_engine, session_scope, settings  # Clear name for the database engine
+from typing import List, Optional, Dict, Tuple, Type, Union
+
+# Number of tokens around the match returned as a search snippet
+SNIPPET_TOKENS = 16
+
+# Default / maximum number of hops followed by the reference graph queries
+REFERENCE_DEPTH = 5
+MAX_REFERENCE_DEPTH = 50
+
+# How often a version bump is retried after losing a race with a concurrent editor
+VERSION_RETRY_ATTEMPTS = 8
 
 def insert_artifact_version(
     workspace_id: int,
@@ -18,10 +36,12 @@ def insert_artifact_version(
     version: int,
     parent_version: Optional[int],
     references: Optional[Dict],
-    status: str
+    status: str,
+    session: Optional[Session] = None
 ) -> Artifact:
     now = datetime.datetime.now().isoformat()
-    artifact = Artifact(
+    model = ArtifactHistory if status == "archived" else Artifact
+    artifact = model(
         workspace_id=workspace_id,
         document_id=document_id,
         art_type=art_type,
@@ -34,9 +54,12 @@ def insert_artifact_version(
         created_at=now,
         updated_at=now,
     )
-    with Session(db_engine) as session:
+    with session_scope(session) as session:
         session.add(artifact)
+        if model is Artifact and references:
+            _refresh_impact(session, [document_id])
         session.commit()
+        current_artifact_cache.invalidate(document_id)
         session.refresh(artifact)
     return artifact
 
@@ -46,7 +69,8 @@ def create_new_artifact(
     title: str,
     content: str,
     art_type: str = "doc",
-    references: Optional[Dict] = None
+    references: Optional[Dict] = None,
+    session: Optional[Session] = None
 ) -> Artifact:
     """
     Creates a new document (artifact) with version 1.
@@ -60,274 +84,862 @@ def create_new_artifact(
         version=1,
         parent_version=None,
         references=references,
-        status="current"
+        status="current",
+        session=session
     )
 
-def list_artifacts(workspace_id: int, limit: int = 10, page: int = 1) -> Tuple[List[Artifact], int]:
-    with Session(db_engine) as session:
-        if limit == -1:
-            # Return full list if limit is -1
-            statement = select(Artifact).where(Artifact.workspace_id == workspace_id)
-            artifacts = session.exec(statement).all()
-            return artifacts, len(artifacts)  # Count using len() on the list
+def encode_cursor(artifact: Artifact, score: Optional[float] = None) -> str:
+    """
+    Encodes the keyset position of an artifact as an opaque page cursor.
+    The position is (updated_at, id), or (score, id) for ranked keyword search.
+    """
+    raw = json.dumps([artifact.updated_at if score is None else score, artifact.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[Union[str, float], int]:
+    """
+    Decodes a page cursor produced by encode_cursor. Raises ValueError if it is malformed.
+    """
+    try:
+        position, artifact_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return position, int(artifact_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def _projection(columns: Optional[List[str]], model: Type[Union[Artifact, ArtifactHistory]] = Artifact) -> tuple:
+    """
+    Returns what to SELECT: the full entity (Artifact or ArtifactHistory), or only the named columns.
+    A projection always includes id and updated_at, which the page cursor needs.
+    Projected queries return lightweight rows instead of ORM objects.
+    """
+    if columns is None:
+        return (model,)
+    names = ["id", "updated_at"] + [name for name in columns if name not in ("id", "updated_at")]
+    unknown = [name for name in names if name != "content" and name not in model.__table__.columns]
+    if unknown:
+        raise ValueError(f"Unknown artifact field(s): {', '.join(unknown)}")
+    content = artifact_content if model is Artifact else artifact_history_content
+    return tuple(content if name == "content" else getattr(model, name) for name in names)
+
+def _paginate(
+    session: Session,
+    conditions: list,
+    limit: int,
+    page: int,
+    cursor: Optional[str],
+    columns: Optional[List[str]] = None,
+    model: Type[Union[Artifact, ArtifactHistory]] = Artifact
+) -> Tuple[List[Artifact], int]:
+    """
+    Runs a filtered query on `model` (hot or history table) newest first and returns one page plus the total count.
+    Pages by `cursor` (keyset on updated_at, id) when given, otherwise by `page` (OFFSET).
+    A limit of -1 returns every matching row.
+    """
+    statement = select(*_projection(columns, model)).where(*conditions)\
+        .order_by(desc(model.updated_at), desc(model.id))
+    if limit == -1:
+        # Return full list if limit is -1
+        artifacts = session.exec(statement).all()
+        return artifacts, len(artifacts)  # Count using len() on the list
+
+    if cursor:
+        # Seek past the last row of the previous page instead of skipping rows
+        updated_at, artifact_id = decode_cursor(cursor)
+        statement = statement.where(or_(
+            model.updated_at < updated_at,
+            and_(model.updated_at == updated_at, model.id < artifact_id)
+        ))
+    else:
+        statement = statement.offset((page - 1) * limit)
+    artifacts = session.exec(statement.limit(limit)).all()
+
+    total_statement = select(func.count()).select_from(model).where(*conditions)
+    total_count = session.exec(total_statement).one()  # Count in SQL
+    return artifacts, total_count
+
+def list_artifacts(
+    workspace_id: int,
+    limit: int = 10,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    session: Optional[Session] = None
+) -> Tuple[List[Artifact], int]:
+    """
+    Lists the current artifacts of a workspace (the hot table), newest first.
+    Pass `columns` to load only those fields (e.g. everything but content) as rows.
+    """
+    with session_scope(session) as session:
+        return _paginate(session, [Artifact.workspace_id == workspace_id], limit, page, cursor, columns)
+
+def _fts_query(keyword: str) -> Optional[str]:
+    """
+    Quotes a user keyword as an FTS5 phrase query.
+    Returns None when the index cannot answer it (the trigram tokenizer needs 3+ characters).
+    """
+    phrase = '"' + keyword.replace('"', '""') + '"'
+    if settings.FTS_TOKENIZER.startswith("trigram"):
+        return phrase if len(keyword) >= 3 else None
+    return phrase + " *"  # word tokenizers: match words starting with the keyword
+
+def _search_model(status: Optional[str]) -> Type[Union[Artifact, ArtifactHistory]]:
+    # Archived versions live in the history table, everything else in the hot one
+    return ArtifactHistory if status == "archived" else Artifact
+
+def _search_conditions(
+    workspace_id: int,
+    art_type: Optional[str] = None,
+    version: Optional[int] = None,
+    status: Optional[str] = None,
+    keyword: Optional[str] = None
+) -> list:
+    model = _search_model(status)
+    conditions = [model.workspace_id == workspace_id]  # Filter by workspace_id
+    if art_type:
+        conditions.append(model.art_type == art_type)
+    if version:
+        conditions.append(model.version == version)
+    if status:
+        conditions.append(model.status == status)
+    if keyword:
+        query = _fts_query(keyword) if model is Artifact else None
+        if query is None:
+            # Too short for the full-text index, or history (not indexed); fall back to a LIKE scan
+            content = artifact_content if model is Artifact else artifact_history_content
+            conditions.append(model.title.contains(keyword) | content.contains(keyword))
         else:
-            # Calculate offset page and limit
-            offset = (page - 1) * limit
-            statement = select(Artifact).\
-                where(Artifact.workspace_id == workspace_id)\
-                .order_by(desc(Artifact.updated_at))\
-                .limit(limit)\
-                .offset(offset)
-            artifacts = session.exec(statement).all()
-            total_statement = select(Artifact).where(Artifact.workspace_id == workspace_id)
-            total_count = len(session.exec(total_statement).all())  # Count total artifacts
-            return artifacts, total_count
+            matches = select(ArtifactFTS.c.rowid).where(ArtifactFTS.c.artifact_fts.match(query))
+            conditions.append(Artifact.id.in_(matches))
+    return conditions
 
 def search_artifacts(
     workspace_id: int, 
     art_type: Optional[str] = None,
     version: Optional[int] = None,
     status: Optional[str] = None,
-    keyword: Optional[str] = None
+    keyword: Optional[str] = None,
+    limit: int = -1,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    session: Optional[Session] = None
 ) -> Tuple[List[Artifact], int]:
-    with Session(db_engine) as session:
-        query = select(Artifact).where(Artifact.workspace_id == workspace_id)  # Filter by workspace_id
-        if art_type:
-            query = query.where(Artifact.art_type == art_type)
-        if version:
-            query = query.where(Artifact.version == version)
-        if status:
-            query = query.where(Artifact.status == status)
-        if keyword:
-            query = query.where(Artifact.title.contains(keyword) | Artifact.content.contains(keyword))
-        
-        query = query.order_by(desc(Artifact.updated_at))
-        artifacts = session.exec(query).all()
-        
-        total = len(artifacts)
-    return artifacts, total
+    """
+    Lists artifacts of a workspace matching the given filters, newest first.
+    Searches current versions, or archived ones (the history table) with status="archived".
+    Paging and `columns` work as in list_artifacts; the default limit of -1 returns every match.
+    """
+    conditions = _search_conditions(workspace_id, art_type, version, status, keyword)
+    with session_scope(session) as session:
+        return _paginate(session, conditions, limit, page, cursor, columns, _search_model(status))
+
+def fulltext_search_artifacts(
+    workspace_id: int,
+    keyword: str,
+    art_type: Optional[str] = None,
+    version: Optional[int] = None,
+    status: Optional[str] = None,
+    limit: int = 10,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    session: Optional[Session] = None
+) -> Tuple[List[Tuple[Artifact, Optional[float], Optional[str]]], int]:
+    """
+    Keyword search over the FTS5 index of current versions, best bm25 match first.
+    Returns (artifact, score, snippet) triples, higher score is better, plus the total count.
+    With `columns`, the artifact is a row holding only those fields.
+    Keywords the index cannot answer, and archived versions (status="archived"),
+    fall back to search_artifacts with score and snippet None.
+    """
+    query = _fts_query(keyword)
+    if query is None or _search_model(status) is ArtifactHistory:
+        artifacts, total = search_artifacts(
+            workspace_id, art_type, version, status, keyword, limit, page, cursor, columns, session=session
+        )
+        return [(artifact, None, None) for artifact in artifacts], total
+
+    fts = literal_column("artifact_fts")
+    score = -func.bm25(fts)  # bm25() is lower-is-better; flip it so scores sort like timestamps
+    snippet = func.snippet(fts, -1, "**", "**", "…", SNIPPET_TOKENS)
+    conditions = _search_conditions(workspace_id, art_type, version, status)
+    conditions.append(ArtifactFTS.c.artifact_fts.match(query))
+
+    with session_scope(session) as session:
+        entities = _projection(columns)
+        statement = select(*entities, score.label("score"), snippet.label("snippet"))\
+            .join(ArtifactFTS, ArtifactFTS.c.rowid == Artifact.id)\
+            .where(*conditions)\
+            .order_by(desc(score), desc(Artifact.id))
+        if cursor:
+            last_score, artifact_id = decode_cursor(cursor)
+            statement = statement.where(or_(
+                score < last_score,
+                and_(score == last_score, Artifact.id < artifact_id)
+            ))
+        else:
+            statement = statement.offset((page - 1) * limit)
+        rows = session.exec(statement.limit(limit)).all()
+        if columns is None:
+            hits = [(row[0], row.score, row.snippet) for row in rows]
+        else:
+            hits = [(row, row.score, row.snippet) for row in rows]
+
+        total_statement = select(func.count())\
+            .select_from(Artifact)\
+            .join(ArtifactFTS, ArtifactFTS.c.rowid == Artifact.id)\
+            .where(*conditions)
+        total = session.exec(total_statement).one()
+    return hits, total
     
-def get_artifact_by_internal_id(artifact_id: int) -> Optional[Artifact]:
-    with Session(db_engine) as session:
-        return session.get(Artifact, artifact_id)
+def get_artifact_by_internal_id(artifact_id: int, session: Optional[Session] = None) -> Optional[Artifact]:
+    """
+    Retrieves any version by its internal id: current versions from the hot table, archived ones from history.
+    """
+    with session_scope(session) as session:
+        return session.get(Artifact, artifact_id) or session.get(ArtifactHistory, artifact_id)
+
+def _get_version(session: Session, document_id: str, version: int) -> Optional[Union[Artifact, ArtifactHistory]]:
+    for model in (Artifact, ArtifactHistory):
+        artifact = session.exec(select(model).where(
+            model.document_id == document_id, model.version == version
+        )).first()
+        if artifact:
+            return artifact
+    return None
+
+def _select_current(document_id: str):
+    return select(Artifact).where(
+        Artifact.document_id == document_id,
+        Artifact.status == "current"
+    ).order_by(Artifact.version.desc())
 
-def get_current_artifact(document_id: str) -> Optional[Artifact]:
+def get_current_artifact(document_id: str, session: Optional[Session] = None) -> Optional[Artifact]:
     """
     Retrieves the current (latest) artifact version for the given document_id.
+    Served from current_artifact_cache when possible; the result is a detached copy.
     """
-    with Session(db_engine) as session:
-        statement = select(Artifact).where(
-            Artifact.document_id == document_id,
-            Artifact.status == "current"
-        ).order_by(Artifact.version.desc())
-        return session.exec(statement).first()
+    def load() -> Optional[Dict]:
+        with session_scope(session) as load_session:
+            artifact = load_session.exec(_select_current(document_id)).first()
+            if not artifact:
+                return None
+            # warnings=False: rolled-back rows may carry references=[] in the Dict column
+            return {**artifact.model_dump(warnings=False), "content": artifact.content}
 
-def get_artifact_versions(document_id: str) -> List[Artifact]:
-    with Session(db_engine) as session:
-        statement = select(Artifact).where(
-            Artifact.document_id == document_id
-        ).order_by(Artifact.version.desc())
-        return session.exec(statement).all()
+    data = current_artifact_cache.get_or_load(document_id, load)
+    return Artifact(**copy.deepcopy(data)) if data else None
 
-def update_artifact_version(
+def get_current_artifacts(
+    document_ids: List[str],
+    columns: Optional[List[str]] = None,
+    session: Optional[Session] = None
+) -> List[Artifact]:
+    """
+    Retrieves the current versions of many documents in one query (not cached), by document_id.
+    Documents without a current version are left out. Pass `columns` to load only those fields as rows.
+    """
+    with session_scope(session) as session:
+        return session.exec(
+            select(*_projection(columns)).where(Artifact.document_id.in_(document_ids)).order_by(Artifact.document_id)
+        ).all()
+
+def get_artifact_versions(
     document_id: str,
-    new_title: str,
-    new_content: str,
-    new_art_type: str,
-    new_references: Optional[Dict] = None
-) -> Artifact:
+    columns: Optional[List[str]] = None,
+    session: Optional[Session] = None
+) -> List[Artifact]:
     """
-    Archives the current version of the document (by document_id) and creates a new version with updated content.
+    Lists every version of a document, newest first: the current one from the hot
+    table, then the archived ones from history. `columns` works as in list_artifacts.
     """
-    # Fetch the current artifact based on document_id.
-    current = get_current_artifact(document_id)
-    if not current:
-        raise Exception("Artifact not found.")
+    with session_scope(session) as session:
+        versions = []
+        for model in (Artifact, ArtifactHistory):
+            statement = select(*_projection(columns, model)).where(
+                model.document_id == document_id
+            ).order_by(model.version.desc())
+            versions.extend(session.exec(statement).all())
+        return versions
 
-    current_version = current.version
-    new_version = current_version + 1
+def _walk_references(
+    document_id: str, max_depth: int, dependents: bool, session: Optional[Session] = None
+) -> List[Dict]:
+    """
+    Documents reachable from `document_id` over the reference edges (or, with
+    `dependents`, over the reversed edges) within `max_depth` hops, nearest first.
+    Each item has the document's current version (None fields if it has none).
+    """
+    if not 1 <= max_depth <= MAX_REFERENCE_DEPTH:
+        raise ValueError(f"max_depth must be between 1 and {MAX_REFERENCE_DEPTH}.")
+    edge_from, edge_to = ArtifactReference.source_document_id, ArtifactReference.target_document_id
+    if dependents:
+        edge_from, edge_to = edge_to, edge_from
 
-    # Archive the current version
-    with Session(db_engine) as session:
-        artifact = session.get(Artifact, current.id)
-        if artifact:
-            # Mark the current artifact as archived and update the timestamp
-            artifact.status = "archived"
-            artifact.updated_at = datetime.datetime.now()  # Set to current datetime
-            session.add(artifact)
-            session.commit()  # Commit the archive update
+    # UNION (not UNION ALL) drops repeated (document, depth) pairs, so cycles and
+    # diamonds stop growing the walk; depth bounds it.
+    walk = select(edge_to.label("document_id"), literal(1).label("depth")).where(
+        edge_from == document_id
+    ).cte("walk", recursive=True)
+    walk = walk.union(
+        select(edge_to, walk.c.depth + 1)
+        .join(walk, edge_from == walk.c.document_id)
+        .where(walk.c.depth < max_depth)
+    )
+    nearest = (
+        select(walk.c.document_id, func.min(walk.c.depth).label("depth"))
+        .where(walk.c.document_id != document_id)
+        .group_by(walk.c.document_id)
+        .subquery()
+    )
+    statement = (
+        select(
+            nearest.c.document_id, nearest.c.depth, Artifact.id, Artifact.workspace_id,
+            Artifact.title, Artifact.art_type, Artifact.version,
+        )
+        .outerjoin(Artifact, Artifact.document_id == nearest.c.document_id)
+        .order_by(nearest.c.depth, nearest.c.document_id)
+    )
+    with session_scope(session) as session:
+        return [dict(row._mapping) for row in session.exec(statement).all()]
 
-    # Use the same artifact workspace_id as the current version
-    workspace_id = current.workspace_id
-    
-    # if new_art_type is provided, use it, otherwise use the current art_type
-    art_type = new_art_type if new_art_type else current.art_type
-    
-    # If no new references are provided, keep the current ones
-    references = new_references if new_references else current.references
+def get_artifact_dependencies(
+    document_id: str, max_depth: int = REFERENCE_DEPTH, session: Optional[Session] = None
+) -> List[Dict]:
+    """
+    Returns the documents `document_id` references, directly (depth 1) or transitively.
+    """
+    return _walk_references(document_id, max_depth, dependents=False, session=session)
 
-    # If no new title is provided, keep the current title
-    title = new_title if new_title else current.title
+def get_artifact_dependents(
+    document_id: str, max_depth: int = REFERENCE_DEPTH, session: Optional[Session] = None
+) -> List[Dict]:
+    """
+    Returns the documents that reference `document_id`, directly (depth 1) or transitively.
+    """
+    return _walk_references(document_id, max_depth, dependents=True, session=session)
 
-    # If no new content is provided, keep the current content
-    content = new_content if new_content else current.content
+def _refresh_impact(session: Session, document_ids) -> None:
+    """
+    Brings artifact_impact up to date after the references of `document_ids`
+    changed (their rows in artifact_reference, written by triggers on flush).
+    Only documents whose reachable set can have changed are recomputed: the
+    changed ones and the documents that reached them before the change.
+    """
+    sources = set(document_ids)
+    if not sources:
+        return
+    session.flush()
+    sources.update(session.exec(
+        select(ArtifactImpact.affected_document_id).where(ArtifactImpact.document_id.in_(sources))
+    ).all())
+    session.exec(delete(ArtifactImpact).where(ArtifactImpact.affected_document_id.in_(sources)))
 
-    # Insert the new version of the artifact
-    return insert_artifact_version(
-        workspace_id=workspace_id,
-        document_id=document_id,
-        art_type=art_type,
-        title=title,
-        content=content,
-        version=new_version,
-        parent_version=current_version,
-        references=references,
-        status="current"
+    edge = ArtifactReference
+    reach = select(
+        edge.source_document_id.label("affected_document_id"), edge.target_document_id.label("document_id")
+    ).where(edge.source_document_id.in_(sources)).cte("reach", recursive=True)
+    reach = reach.union(
+        select(reach.c.affected_document_id, edge.target_document_id)
+        .join(reach, edge.source_document_id == reach.c.document_id)
     )
+    session.exec(insert(ArtifactImpact).from_select(
+        ["document_id", "affected_document_id"],
+        select(reach.c.document_id, reach.c.affected_document_id).where(
+            reach.c.document_id != reach.c.affected_document_id
+        ),
+    ))
 
-def rollback_artifact_version(document_id: str, target_version: int) -> Artifact:
+def _mark_dependents_stale(session: Session, document_id: str) -> None:
     """
-    Rolls back the document to a target version by archiving the current version and re-creating the target version as the new current version.
+    Flags the current versions of the documents affected by a change of `document_id`
+    (artifact_impact) as stale, keeping the time they first went stale.
     """
-    # Fetch target artifact by document_id and target_version
-    with Session(db_engine) as session:
-        statement = select(Artifact).where(
-            Artifact.document_id == document_id,
-            Artifact.version == target_version
+    affected = session.exec(
+        select(ArtifactImpact.affected_document_id).where(ArtifactImpact.document_id == document_id)
+    ).all()
+    if not affected:
+        return
+    session.exec(
+        update(Artifact)
+        .where(Artifact.document_id.in_(affected), Artifact.stale_since.is_(None))
+        .values(stale_since=datetime.datetime.now().isoformat())
+        .execution_options(synchronize_session=False)
+    )
+    # Cached copies of those documents are outdated once this transaction commits
+    event.listen(session, "after_commit", lambda session: current_artifact_cache.invalidate(*affected), once=True)
+
+def rebuild_artifact_impact(session: Optional[Session] = None) -> int:
+    """
+    Recomputes artifact_impact from scratch (e.g. after editing artifact_reference by hand).
+    Returns the number of (document, affected document) pairs.
+    """
+    with session_scope(session) as session:
+        session.exec(delete(ArtifactImpact))
+        _refresh_impact(session, session.exec(select(ArtifactReference.source_document_id).distinct()).all())
+        session.commit()
+        return session.exec(select(func.count()).select_from(ArtifactImpact)).one()
+
+def get_artifact_impact(document_id: str, session: Optional[Session] = None) -> List[Dict]:
+    """
+    Returns the documents affected by a change of `document_id`: every document that
+    references it, directly or transitively. Reads the precomputed artifact_impact rows.
+    """
+    statement = (
+        select(
+            ArtifactImpact.affected_document_id.label("document_id"), Artifact.id, Artifact.workspace_id,
+            Artifact.title, Artifact.art_type, Artifact.version,
         )
-        target = session.exec(statement).first()
-        
-    if not target:
-        raise Exception(f"Target version {target_version} not found for document {document_id}.")
-    
-    # Get current version of the artifact
-    current = get_current_artifact(document_id)
+        .outerjoin(Artifact, Artifact.document_id == ArtifactImpact.affected_document_id)
+        .where(ArtifactImpact.document_id == document_id)
+        .order_by(ArtifactImpact.affected_document_id)
+    )
+    with session_scope(session) as session:
+        return [dict(row._mapping) for row in session.exec(statement).all()]
 
-    if not current:
-        raise Exception("Current artifact for document {document_id} not found.")
+def list_stale_artifacts(workspace_id: int, session: Optional[Session] = None) -> List[Artifact]:
+    """
+    Returns the current versions in the workspace that are marked stale, oldest first.
+    """
+    with session_scope(session) as session:
+        return session.exec(
+            select(Artifact)
+            .where(Artifact.workspace_id == workspace_id, Artifact.stale_since.is_not(None))
+            .order_by(Artifact.stale_since, Artifact.id)
+        ).all()
 
-    # Archive the current version if exists
-    with Session(db_engine) as session:
-        artifact = session.get(Artifact, current.id)
-        if artifact:
-            artifact.status = "archived"
-            artifact.updated_at = datetime.datetime.now().isoformat()
-            session.add(artifact)
-            session.commit()
+def is_write_conflict(error: Exception) -> bool:
+    """
+    True for errors a retry can resolve: a unique (document_id, version) violation,
+    a current row already moved to history by someone else, or SQLite refusing the
+    write lock to a concurrent writer.
+    """
+    if isinstance(error, (IntegrityError, StaleDataError)):
+        return True
+    return isinstance(error, OperationalError) and "locked" in str(error.orig)
 
-    # Set new version; If current doesn't exist, use target's version
-    new_version = target_version if not current else current.version + 1
+def _commit_version(session: Session, operation) -> Artifact:
+    artifact = operation(session)
+    session.commit()
+    current_artifact_cache.invalidate(artifact.document_id)
+    session.refresh(artifact)
+    return artifact
 
-    # Use the same artifact workspace_id as the current version
-    workspace_id = current.workspace_id
-    
-    # Prepare new version data
-    art_type = target.art_type
-    title = target.title
-    content = target.content
-    references = target.references if target.references else []
+def _run_version_transaction(operation, session: Optional[Session] = None) -> Artifact:
+    """
+    Runs operation(session) in a single transaction and commits it.
+    If a concurrent editor claimed the same version first, the transaction is
+    rolled back and the operation re-read and retried against the new current version.
+    With a caller-provided session the operation runs once and retrying is up to the caller.
+    """
+    if session is not None:
+        return _commit_version(session, operation)
+    for attempt in range(VERSION_RETRY_ATTEMPTS):
+        with Session(db_engine) as session:
+            try:
+                return _commit_version(session, operation)
+            except (IntegrityError, OperationalError, StaleDataError) as e:
+                session.rollback()
+                if not is_write_conflict(e) or attempt == VERSION_RETRY_ATTEMPTS - 1:
+                    raise
+        # Back off a little (with jitter) before re-reading the current version
+        time.sleep(random.uniform(0, 0.01 * (2 ** attempt)))
 
-    # Insert new artifact version
-    return insert_artifact_version(
-        workspace_id=workspace_id,
-        document_id=document_id,
-        art_type=art_type,
-        title=title,
-        content=content,
-        version=new_version,
-        parent_version=target.version,
-        references=references,
-        status="current"
+def _archive_and_insert(session: Session, current: Artifact, **fields) -> Artifact:
+    """
+    Archives the current version and adds its successor (version + 1) in the same session.
+    Archiving moves the row from the hot table to artifact_history, keeping its id.
+    """
+    now = datetime.datetime.now().isoformat()
+    archived = ArtifactHistory(**{
+        **{name: getattr(current, name) for name in Artifact.__table__.columns.keys()},
+        "status": "archived",
+        "updated_at": now,
+    })
+    session.add(archived)
+    session.delete(current)
+    session.flush()  # archive before the insert so only one row is ever "current"
+
+    artifact = Artifact(
+        workspace_id=current.workspace_id,  # Use the same workspace_id as the current version
+        document_id=current.document_id,
+        version=current.version + 1,
+        status="current",
+        created_at=now,
+        updated_at=now,
+        **fields
     )
+    session.add(artifact)
+    session.flush()
+    _delta_encode_archived(session, archived)
+    if artifact.references != current.references:
+        _refresh_impact(session, [current.document_id])
+    _mark_dependents_stale(session, current.document_id)
+    return artifact
+
+def _blob_text(session: Session, content_hash: str) -> Optional[str]:
+    return session.execute(text(f"SELECT {blob_text_sql(':hash')}"), {"hash": content_hash}).scalar()
+
+def _delta_encode_archived(session: Session, archived: ArtifactHistory) -> None:
+    """
+    Stores the blob of a just-archived version as a compressed delta against the
+    blob of its parent version, when no current version uses it anymore.
+    Chains are cut by a full snapshot every ARTIFACT_SNAPSHOT_INTERVAL links.
+    """
+    if not settings.ARTIFACT_DELTA_STORAGE or archived.parent_version is None:
+        return
+    blob = session.get(ContentBlob, archived.content_hash)
+    if blob is None or blob.content is None:
+        return  # already a delta
+    still_current = session.exec(select(Artifact.id).where(
+        Artifact.content_hash == blob.hash, Artifact.status == "current"
+    )).first()
+    if still_current is not None:
+        return
+    parent = _get_version(session, archived.document_id, archived.parent_version)
+    if parent is None or parent.content_hash == blob.hash:
+        return
+    base_hash = parent.content_hash
+    base = session.get(ContentBlob, base_hash)
+    if base.depth + 1 >= settings.ARTIFACT_SNAPSHOT_INTERVAL:
+        return  # keep this one as a full snapshot
+    # Never build a chain that leads back to this blob
+    node = base
+    while node.base_hash is not None:
+        if node.base_hash == blob.hash:
+            return
+        node = session.get(ContentBlob, node.base_hash)
+
+    delta = encode_delta(_blob_text(session, base_hash), blob.content)
+    if len(delta) >= blob.size:
+        return
+    blob.content = None
+    blob.base_hash = base_hash
+    blob.delta = delta
+    blob.depth = base.depth + 1
+    session.add(blob)
+    session.flush()
+
+def _update_version(
+    session: Session,
+    document_id: str,
+    new_title: Optional[str],
+    new_content: Optional[str],
+    new_art_type: Optional[str],
+    new_references: Optional[Dict],
+    current: Optional[Artifact] = None
+) -> Artifact:
+    # Fetch the current artifact based on document_id (unless the caller already has it).
+    current = current or session.exec(_select_current(document_id)).first()
+    if not current:
+        raise Exception("Artifact not found.")
+
+    return _archive_and_insert(
+        session,
+        current,
+        # if new_art_type is provided, use it, otherwise use the current art_type
+        art_type=new_art_type if new_art_type else current.art_type,
+        # If no new title is provided, keep the current title
+        title=new_title if new_title else current.title,
+        # If no new content is provided, keep pointing at the current content blob
+        **({"content": new_content} if new_content else {"content_hash": current.content_hash}),
+        # If no new references are provided, keep the current ones
+        references=new_references if new_references else current.references,
+        parent_version=current.version,
+    )
+
+def update_artifact_version(
+    document_id: str,
+    new_title: str,
+    new_content: str,
+    new_art_type: str,
+    new_references: Optional[Dict] = None,
+    session: Optional[Session] = None
+) -> Artifact:
+    """
+    Archives the current version of the document (by document_id) and creates a new version with updated content.
+    Both steps run in one transaction; the (document_id, version) unique index makes concurrent edits retry.
+    """
+    def bump(session: Session) -> Artifact:
+        return _update_version(session, document_id, new_title, new_content, new_art_type, new_references)
+
+    return _run_version_transaction(bump, session)
+
+def rollback_artifact_version(document_id: str, target_version: int, session: Optional[Session] = None) -> Artifact:
+    """
+    Rolls back the document to a target version by archiving the current version and re-creating the target version as the new current version.
+    """
+    def bump(session: Session) -> Artifact:
+        # Fetch target artifact by document_id and target_version (usually in history)
+        target = _get_version(session, document_id, target_version)
+        if not target:
+            raise Exception(f"Target version {target_version} not found for document {document_id}.")
+
+        # Get current version of the artifact
+        current = session.exec(_select_current(document_id)).first()
+        if not current:
+            raise Exception(f"Current artifact for document {document_id} not found.")
+
+        return _archive_and_insert(
+            session,
+            current,
+            art_type=target.art_type,
+            title=target.title,
+            # Same hash as the target, so its blob is reused; passing the text
+            # also turns a delta-encoded blob back into a full one (current stays full)
+            content=target.content,
+            references=target.references if target.references else [],
+            parent_version=target.version,
+        )
+
+    return _run_version_transaction(bump, session)
 
 def set_artifact_meta(
     document_id: str,
     new_title: Optional[str] = None,
     new_content: Optional[str] = None,
     new_art_type: Optional[str] = None,
-    new_references: Optional[Dict] = None
+    new_references: Optional[Dict] = None,
+    session: Optional[Session] = None
 ) -> Artifact:
     """
     Updates the metadata (title, content, references) of the current version of an artifact
     without creating a new version or archiving the existing one.
     """
-    # Fetch the current artifact based on document_id.
-    current = get_current_artifact(document_id)
-    if not current:
-        raise Exception(f"Current artifact for document {document_id} not found.")
+    with session_scope(session) as session:
+        # Fetch the current artifact based on document_id.
+        artifact = session.exec(_select_current(document_id)).first()
+        if not artifact:
+            raise Exception(f"Current artifact for document {document_id} not found.")
 
-    # Update the artifact's metadata in place
-    with Session(db_engine) as session:
-        artifact = session.get(Artifact, current.id)
-        if artifact:
-            # Update title if provided
-            if new_title is not None:
-                artifact.title = new_title
-            # Update content if provided
-            if new_content is not None:
-                artifact.content = new_content  
-            # Update art_type if provided
-            if new_art_type is not None:
-                artifact.art_type = new_art_type
-            # Update references if provided
-            if new_references is not None:
-                artifact.references = new_references
-
-            # Update the timestamp
-            artifact.updated_at = datetime.datetime.now()
+        # Update the artifact's metadata in place
+        # Update title if provided
+        if new_title is not None:
+            artifact.title = new_title
+        # Update content if provided
+        if new_content is not None:
+            artifact.content = new_content  
+        # Update art_type if provided
+        if new_art_type is not None:
+            artifact.art_type = new_art_type
+        # Update references if provided
+        if new_references is not None:
+            artifact.references = new_references
 
-            session.add(artifact)
-            session.commit()
-            session.refresh(artifact) # Refresh to get the latest state from the database
-            return artifact
-        else:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Artifact not found in session.")
+        # Update the timestamp
+        artifact.updated_at = datetime.datetime.now().isoformat()
+
+        session.add(artifact)
+        if new_references is not None:
+            _refresh_impact(session, [document_id])
+        if new_content is not None:
+            _mark_dependents_stale(session, document_id)
+        session.commit()
+        current_artifact_cache.invalidate(document_id)
+        session.refresh(artifact) # Refresh to get the latest state from the database
+        return artifact
         
-def set_artifact_indexed(internal_artifact_id: int) -> Artifact:
+def tag_artifact_version(document_id: str, version: int, tag: Optional[str], session: Optional[Session] = None) -> Artifact:
+    """
+    Sets (or with None removes) the tag of one version. Tagged versions are kept by the
+    retention rules of the compaction job (backend/crud/maintenance.py).
+    """
+    with session_scope(session) as session:
+        artifact = _get_version(session, document_id, version)
+        if not artifact:
+            raise Exception(f"Version {version} for document {document_id} not found.")
+        artifact.tag = tag
+        session.add(artifact)
+        session.commit()
+        current_artifact_cache.invalidate(document_id)
+        session.refresh(artifact)
+        return artifact
+
+def set_artifact_indexed(
+    internal_artifact_id: int,
+    indexed_hash: Optional[str] = None,
+    indexed_model: Optional[str] = None,
+    session: Optional[Session] = None
+) -> Artifact:
     """
-    Set indexed time of the document (by internal_artifact_id).
+    Set indexed time of the document (by internal_artifact_id), and what its
+    vectors were built from (see backend/crud/index.py).
     """
 
     # Set indexed time and indexed id
-    with Session(db_engine) as session:
-        artifact = session.get(Artifact, internal_artifact_id)
+    with session_scope(session) as session:
+        artifact = session.get(Artifact, internal_artifact_id) or session.get(ArtifactHistory, internal_artifact_id)
         if artifact:
             # Mark the current artifact as archived and update the timestamp
-            artifact.indexed_at = datetime.datetime.now()  # Set to current datetime
+            artifact.indexed_at = datetime.datetime.now().isoformat()  # Set to current datetime
+            artifact.indexed_hash = indexed_hash
+            artifact.indexed_model = indexed_model
             session.add(artifact)
             session.commit()  # Commit the archive update
+            current_artifact_cache.invalidate(artifact.document_id)
             return artifact
 
 
-def delete_artifact_by_id(internal_id: int) -> Optional[Artifact]:
+def set_artifacts_indexed(
+    indexed_hashes: Dict[int, str],
+    indexed_model: Optional[str] = None,
+    session: Optional[Session] = None
+) -> int:
+    """
+    Bulk set_artifact_indexed() for current versions, {internal_artifact_id: indexed_hash},
+    as one executemany UPDATE. Returns the number of artifacts updated.
+    """
+    if not indexed_hashes:
+        return 0
+    now = datetime.datetime.now().isoformat()
+    with session_scope(session) as session:
+        session.execute(update(Artifact), [
+            {"id": artifact_id, "indexed_at": now, "indexed_hash": indexed_hash, "indexed_model": indexed_model}
+            for artifact_id, indexed_hash in indexed_hashes.items()
+        ])
+        document_ids = session.exec(select(Artifact.document_id).where(Artifact.id.in_(list(indexed_hashes)))).all()
+        session.commit()
+    for document_id in document_ids:
+        current_artifact_cache.invalidate(document_id)
+    return len(document_ids)
+
+
+def delete_artifact_by_id(internal_id: int, session: Optional[Session] = None) -> Optional[Artifact]:
     """
     Delete an artifact by its internal id.
     Returns the deleted artifact (if found) or None.
     """
-    with Session(db_engine) as session:
-        artifact = session.get(Artifact, internal_id)
+    with session_scope(session) as session:
+        artifact = session.get(Artifact, internal_id) or session.get(ArtifactHistory, internal_id)
         if artifact:
             session.delete(artifact)
+            if isinstance(artifact, Artifact):
+                _refresh_impact(session, [artifact.document_id])
             session.commit()
+            current_artifact_cache.invalidate(artifact.document_id)
         return artifact
 
-def delete_artifacts_by_document(document_id: str, version: Optional[int] = None) -> int:
+def delete_artifacts_by_document(document_id: str, version: Optional[int] = None, session: Optional[Session] = None) -> int:
     """
     Delete artifacts by document_id.
     If version is provided, delete only the artifact with that version.
     If version is None, delete all artifacts with the given document_id.
     Returns the number of artifacts deleted.
     """
-    with Session(db_engine) as session:
-        if version is None:
-            statement = select(Artifact).where(Artifact.document_id == document_id)
-        else:
-            statement = select(Artifact).where(
-                Artifact.document_id == document_id, Artifact.version == version
-            )
-        artifacts_to_delete = session.exec(statement).all()
+    with session_scope(session) as session:
+        artifacts_to_delete = []
+        for model in (Artifact, ArtifactHistory):  # current and archived versions
+            statement = select(model).where(model.document_id == document_id)
+            if version is not None:
+                statement = statement.where(model.version == version)
+            artifacts_to_delete.extend(session.exec(statement).all())
         count = len(artifacts_to_delete)
         for artifact in artifacts_to_delete:
             session.delete(artifact)
+        if any(isinstance(artifact, Artifact) for artifact in artifacts_to_delete):
+            _refresh_impact(session, [document_id])
         session.commit()
-        return count
\ No newline at end of file
+        current_artifact_cache.invalidate(document_id)
+        return count
+
+def apply_artifact_batch(operations: List[Dict], session: Optional[Session] = None) -> List[Dict]:
+    """
+    Applies a list of create / update / delete operations in a single transaction.
+    Each operation is a dict with "op", "document_id" and the fields of that operation.
+    Consecutive creates are written with one executemany INSERT.
+    Returns one result dict per operation, in order, with "status" "ok" or "error".
+    Database errors (IntegrityError, OperationalError) are raised and nothing is committed.
+    """
+    results: List[Optional[Dict]] = [None] * len(operations)
+    now = datetime.datetime.now().isoformat()
+
+    with session_scope(session) as session:
+        # Documents that already exist, fetched in one query for the create checks
+        create_ids = {op["document_id"] for op in operations if op["op"] == "create"}
+        existing = set()
+        for model in (Artifact, ArtifactHistory) if create_ids else ():
+            existing.update(session.exec(
+                select(model.document_id).where(model.document_id.in_(create_ids)).distinct()
+            ).all())
+
+        pending: List[Tuple[int, Dict, str]] = []  # creates (index, row, content) waiting for the next executemany
+
+        def flush_creates():
+            if not pending:
+                return
+            # Bodies go to the blob table first (one executemany, duplicates skipped)
+            store_content_blobs(session.connection(), {row["content_hash"]: content for _, row, content in pending})
+            statement = insert(Artifact).returning(Artifact.id, sort_by_parameter_order=True)
+            ids = session.exec(statement, params=[row for _, row, _ in pending]).scalars().all()
+            for (index, row, _), artifact_id in zip(pending, ids):
+                results[index] = {"id": artifact_id, "version": row["version"]}
+            pending.clear()
+
+        for index, op in enumerate(operations):
+            document_id = op["document_id"]
+            if op["op"] == "create":
+                if document_id in existing:
+                    results[index] = {"error": "Document already exists."}
+                    continue
+                existing.add(document_id)
+                pending.append((index, {
+                    "workspace_id": op.get("workspace_id"),
+                    "document_id": document_id,
+                    "art_type": op.get("art_type") or "doc",
+                    "title": op.get("title"),
+                    "content_hash": hash_content(op.get("content")),
+                    "version": 1,
+                    "parent_version": None,
+                    "references": op.get("references"),
+                    "status": "current",
+                    "created_at": now,
+                    "updated_at": now,
+                }, op.get("content")))
+                continue
+
+            # Updates and deletes may touch rows created earlier in this batch
+            flush_creates()
+            if op["op"] == "update":
+                # Only a missing document is an operation error; database errors
+                # (e.g. a version conflict) abort and roll back the whole batch.
+                current = session.exec(_select_current(document_id)).first()
+                if not current:
+                    results[index] = {"error": "Artifact not found."}
+                    continue
+                artifact = _update_version(
+                    session, document_id, op.get("title"), op.get("content"),
+                    op.get("art_type"), op.get("references"), current=current
+                )
+                results[index] = {"id": artifact.id, "version": artifact.version}
+            elif op["op"] == "delete":
+                deleted = 0
+                for model in (Artifact, ArtifactHistory):  # current and archived versions
+                    statement = delete(model).where(model.document_id == document_id)
+                    if op.get("version") is not None:
+                        statement = statement.where(model.version == op["version"])
+                    deleted += session.exec(statement).rowcount
+                if deleted == 0:
+                    results[index] = {"error": "No artifacts found for deletion."}
+                    continue
+                if op.get("version") is None:
+                    existing.discard(document_id)
+                results[index] = {"deleted": deleted}
+            else:
+                results[index] = {"error": f"Unknown operation {op['op']}."}
+
+        flush_creates()
+        # References may have changed for created, updated and deleted documents alike
+        _refresh_impact(session, {op["document_id"] for op, result in zip(operations, results) if "error" not in result})
+        session.commit()
+        current_artifact_cache.invalidate(*{op["document_id"] for op in operations})
+
+    return [
+        {
+            "index": index,
+            "op": op["op"],
+            "document_id": op["document_id"],
+            "status": "error" if "error" in result else "ok",
+            **result,
+        }
+        for index, (op, result) in enumerate(zip(operations, results))
+    ]
@@ -0,0 +1,52 @@
+# backend/crud/artifact_async.py
+# Async counterparts of backend.crud.artifact, used by the API routers.
+# Each function runs the sync CRUD function on the sync facade of an AsyncSession
+# (AsyncSession.run_sync): the SQL goes through aiosqlite on the event loop instead
+# of holding a threadpool worker. Scripts and tests keep using backend.crud.artifact.
+import asyncio
+import functools
+import random
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+from backend.config import to_async
+from backend.crud import artifact as crud
+
+
+def _to_async_version_bump(function):
+    """
+    Like to_async, with the retry-on-conflict loop of the sync version bumps:
+    each attempt gets a fresh session and transaction.
+    """
+    run_once = to_async(function)
+
+    @functools.wraps(function)
+    async def run(*args, **kwargs):
+        for attempt in range(crud.VERSION_RETRY_ATTEMPTS):
+            try:
+                return await run_once(*args, **kwargs)
+            except (IntegrityError, OperationalError, StaleDataError) as e:
+                if not crud.is_write_conflict(e) or attempt == crud.VERSION_RETRY_ATTEMPTS - 1:
+                    raise
+            # Back off a little (with jitter) before re-reading the current version
+            await asyncio.sleep(random.uniform(0, 0.01 * (2 ** attempt)))
+    return run
+
+
+create_new_artifact = to_async(crud.create_new_artifact)
+list_artifacts = to_async(crud.list_artifacts)
+search_artifacts = to_async(crud.search_artifacts)
+fulltext_search_artifacts = to_async(crud.fulltext_search_artifacts)
+get_artifact_by_internal_id = to_async(crud.get_artifact_by_internal_id)
+get_current_artifact = to_async(crud.get_current_artifact)
+get_artifact_versions = to_async(crud.get_artifact_versions)
+get_artifact_dependencies = to_async(crud.get_artifact_dependencies)
+get_artifact_dependents = to_async(crud.get_artifact_dependents)
+get_artifact_impact = to_async(crud.get_artifact_impact)
+list_stale_artifacts = to_async(crud.list_stale_artifacts)
+update_artifact_version = _to_async_version_bump(crud.update_artifact_version)
+rollback_artifact_version = _to_async_version_bump(crud.rollback_artifact_version)
+set_artifact_meta = to_async(crud.set_artifact_meta)
+tag_artifact_version = to_async(crud.tag_artifact_version)
+delete_artifact_by_id = to_async(crud.delete_artifact_by_id)
+delete_artifacts_by_document = to_async(crud.delete_artifacts_by_document)
+apply_artifact_batch = to_async(crud.apply_artifact_batch)
@@ -1,39 +1,110 @@
 # backend/crud/index.py
 
-from backend.rag.crud import clear_index, insert_doc, delete_doc, update_doc
-from backend.rag.index import vector_index
-from backend.crud.artifact import list_artifacts, set_artifact_indexed 
-
-import uuid
-import time
-
-# In-memory store to track reindexing task statuses
-reindexing_tasks = {}
-
-
-def reindex_all_documents(workspace_id: int):
-    """
-    Reindexes all artifacts from the database into the vector store.
-    Returns a task ID for tracking the status.
-    """
-    clear_index(workspace_id)
-    
-    task_id = str(uuid.uuid4())
-    reindexing_tasks[task_id] = {"status": "in-progress", "start_time": time.time()}
-    
-    # Fetch all artifacts from the database without pagination
-    artifacts, total = list_artifacts(workspace_id=workspace_id, limit=-1)  # Get all artifacts
-    print(f"re-index for total {len(artifacts)}")
-    count = 0
-    for artifact in artifacts:
-        count += 1
-        print(f"re-index: processing {count}/{len(artifacts)}")
-        # Insert each artifact into the vector store (using document_id, title, and content)
-        insert_doc(workspace_id, artifact.document_id, artifact.title, artifact.content)  # Insert artifact into the vector store
-        set_artifact_indexed(artifact.id)
-        
-    reindexing_tasks[task_id]["status"] = "completed"
-    return {"task_id": task_id, "status": "reindexing started", "total_artifacts": total}
+import hashlib
+from typing import Dict, List, Optional
+from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
+from backend.config import settings
+from backend.rag.crud import clear_index, insert_doc, insert_docs, delete_doc, delete_docs, update_doc, indexed_document_ids
+from backend.rag.query import get_retriever
+from backend.rag.index import drop_legacy_vectors
+from backend.crud.artifact import list_artifacts, get_current_artifacts, set_artifacts_indexed
+from backend.services.jobs import register_job, enqueue_job, get_job_status, get_jobs_status, request_cancel
+
+# Columns a reindex needs to decide what changed (content is only loaded for those)
+INDEX_COLUMNS = ["document_id", "title", "art_type", "content_hash", "indexed_hash", "indexed_model"]
+
+# Chunks retrieved per requested result when semantic search filters by status afterwards
+SEMANTIC_SEARCH_OVERFETCH = 4
+
+
+def index_hash(title: str, content_hash: str, art_type: str) -> str:
+    """
+    Fingerprint of what insert_docs() stores for an artifact: its title, content
+    (by the content-addressed blob hash, so the content itself is not read) and
+    art_type, and how it is split into chunks.
+    """
+    chunking = f"{settings.CHUNK_SPLITTER}:{settings.CHUNK_SIZE}:{settings.CHUNK_OVERLAP}"
+    return hashlib.sha256(f"{title}\0{content_hash}\0{art_type}\0{chunking}".encode("utf-8")).hexdigest()
+
+
+def is_indexed(artifact, in_store: set) -> bool:
+    """
+    True when the vectors of the artifact's document were built from this version
+    with the configured embedding model.
+    """
+    return (
+        artifact.document_id in in_store
+        and artifact.indexed_model == settings.EMBEDDING_MODEL
+        and artifact.indexed_hash == index_hash(artifact.title, artifact.content_hash, artifact.art_type)
+    )
+
+
+@register_job("reindex")
+def _reindex_job(job, workspace_id: int, force: bool = False):
+    """
+    Job handler: brings the workspace's vectors in line with its current artifacts.
+    Embeds only new or changed ones (all of them when `force`), INDEX_BATCH_SIZE at a
+    time, and deletes the vectors of documents that have no current version any more.
+    Reports progress and throughput per batch (and stops there when cancelled).
+    """
+    if force:
+        clear_index(workspace_id)
+    # Vectors left in the shared collection of older versions; everything is re-embedded
+    # into the workspace's own collection, where the diff below finds nothing yet
+    legacy_removed = drop_legacy_vectors(workspace_id)
+    in_store = set() if force else indexed_document_ids(workspace_id)
+
+    # Current versions only (the hot table); archived versions are never indexed
+    artifacts, total = list_artifacts(workspace_id=workspace_id, limit=-1, columns=INDEX_COLUMNS)
+    removed = in_store - {artifact.document_id for artifact in artifacts}
+    delete_docs(workspace_id, removed)
+
+    changed = [artifact for artifact in artifacts if not is_indexed(artifact, in_store)]
+    job.progress(
+        0, len(changed), total_artifacts=total, unchanged=total - len(changed), removed=len(removed),
+        legacy_removed=legacy_removed, indexed=0,
+    )
+    stats = {"indexed": 0, "nodes": 0, "reused": 0, "tokens": 0, "seconds": 0.0}
+    for start in range(0, len(changed), settings.INDEX_BATCH_SIZE):
+        rows = changed[start:start + settings.INDEX_BATCH_SIZE]
+        # Read now: a document may have a newer version (or none) by the time we get to it
+        batch = get_current_artifacts([row.document_id for row in rows])
+        # Replaces the vectors of the previous versions, keeping those of unchanged chunks
+        inserted = insert_docs(workspace_id, [
+            {
+                "document_id": artifact.document_id,
+                "title": artifact.title,
+                "content": artifact.content,
+                "artifact_id": artifact.id,
+                "art_type": artifact.art_type,
+                "version": artifact.version,
+            }
+            for artifact in batch
+        ])
+        set_artifacts_indexed(
+            {artifact.id: index_hash(artifact.title, artifact.content_hash, artifact.art_type) for artifact in batch},
+            indexed_model=settings.EMBEDDING_MODEL,
+        )
+
+        stats["indexed"] += inserted["documents"]
+        for key in ("nodes", "reused", "tokens", "seconds"):
+            stats[key] += inserted[key]
+        job.progress(
+            start + len(rows),
+            **stats,
+            docs_per_second=stats["indexed"] / stats["seconds"] if stats["seconds"] else None,
+            tokens_per_second=stats["tokens"] / stats["seconds"] if stats["seconds"] else None,
+        )
+
+
+def reindex_all_documents(workspace_id: int, force: bool = False):
+    """
+    Queues a background job that brings the vector store in line with the artifacts in the database:
+    only new or changed artifacts are embedded, unless `force` re-embeds all of them.
+    Returns the task ID for tracking the status right away.
+    """
+    task_id = enqueue_job("reindex", workspace_id=workspace_id, force=force)
+    return {"task_id": task_id, "status": "reindexing started"}
 
 
 def get_reindexing_status(task_id: str = None):
@@ -42,8 +113,63 @@ def get_reindexing_status(task_id: str = None):
     If no task_id is provided, returns all task statuses.
     """
     if task_id:
-        task = reindexing_tasks.get(task_id)
-        if task:
-            return task
+        return get_job_status(task_id, kind="reindex")
+    return get_jobs_status(kind="reindex")
+
+
+def cancel_reindexing(task_id: str):
+    """
+    Cancels a queued reindex, or stops a running one after the artifact in progress.
+    """
+    if get_job_status(task_id, kind="reindex") == {"status": "not found"}:
         return {"status": "not found"}
-    return reindexing_tasks
+    return request_cancel(task_id)
+
+
+def semantic_search_artifacts(
+    workspace_id: int,
+    query: str,
+    k: int = 10,
+    art_type: Optional[str] = None,
+    status: Optional[str] = None
+) -> List[Dict]:
+    """
+    Ranks the workspace's indexed chunks by similarity to `query` and returns the best `k`
+    with the artifact version they come from. Only the query is embedded; no LLM is called.
+    `art_type` is filtered in the vector store. `status` is "current", or "archived" when the
+    indexed version has been replaced since; it is checked against the database, so more
+    chunks are retrieved for it. Chunks of deleted documents are left out.
+    Returns [] for a workspace that has no collection (without creating one).
+    """
+    filters = MetadataFilters(filters=[MetadataFilter(key="art_type", value=art_type)]) if art_type else None
+    retriever = get_retriever(workspace_id, k * SEMANTIC_SEARCH_OVERFETCH if status else k, filters, create=False)
+    if retriever is None:
+        return []
+    hits = retriever.retrieve(query)
+    current = {
+        row.document_id: row.version
+        for row in get_current_artifacts(list({hit.node.ref_doc_id for hit in hits}), columns=["document_id", "version"])
+    }
+
+    results = []
+    for hit in hits:
+        document_id = hit.node.ref_doc_id
+        if document_id not in current:
+            continue
+        metadata = hit.node.metadata
+        chunk_status = "current" if metadata.get("version") == current[document_id] else "archived"
+        if status and chunk_status != status:
+            continue
+        results.append({
+            "document_id": document_id,
+            "artifact_id": metadata.get("artifact_id"),
+            "version": metadata.get("version"),
+            "status": chunk_status,
+            "title": metadata.get("title"),
+            "art_type": metadata.get("art_type"),
+            "chunk_id": hit.node.node_id,
+            "chunk": metadata.get("chunk"),
+            "text": hit.node.get_content(),
+            "score": hit.score,
+        })
+    return results[:k]
@@ -0,0 +1,154 @@
+# backend/crud/job.py
+import datetime
+from sqlmodel import Session, select, desc, update
+from backend.models.job import Job
+from backend.config import session_scope
+from typing import Dict, List, Optional
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
+
+
+def create_job(kind: str, params: Optional[Dict] = None, session: Optional[Session] = None) -> Job:
+    """Queues a job of a registered kind (see backend/services/jobs.py)."""
+    job = Job(kind=kind, params=params or {})
+    with session_scope(session) as session:
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+    return job
+
+
+def get_job(job_id: str, session: Optional[Session] = None) -> Optional[Job]:
+    """Retrieve a job by ID."""
+    with session_scope(session) as session:
+        return session.get(Job, job_id)
+
+
+def list_jobs(kind: Optional[str] = None, limit: int = 100, session: Optional[Session] = None) -> List[Job]:
+    """Most recent jobs first, optionally of one kind."""
+    statement = select(Job).order_by(desc(Job.created_at)).limit(limit)
+    if kind:
+        statement = statement.where(Job.kind == kind)
+    with session_scope(session) as session:
+        return session.exec(statement).all()
+
+
+def claim_next_job(kinds: List[str], session: Optional[Session] = None) -> Optional[Job]:
+    """
+    Marks the oldest queued job of one of `kinds` as in-progress and returns it.
+    A single UPDATE ... RETURNING, so two workers can never claim the same job.
+    """
+    if not kinds:
+        return None
+    oldest = (
+        select(Job.id)
+        .where(Job.status == "queued", Job.kind.in_(kinds))
+        .order_by(Job.created_at)
+        .limit(1)
+        .scalar_subquery()
+    )
+    now = _now()
+    statement = (
+        update(Job)
+        .where(Job.id == oldest, Job.status == "queued")
+        .values(status="in-progress", started_at=now, updated_at=now)
+        .returning(Job.id)
+    )
+    with session_scope(session) as session:
+        job_id = session.exec(statement).scalar()
+        session.commit()
+        return session.get(Job, job_id) if job_id else None
+
+
+def update_job_progress(
+    job_id: str,
+    done: int,
+    total: Optional[int] = None,
+    result: Optional[Dict] = None,
+    session: Optional[Session] = None
+) -> bool:
+    """
+    Records the progress of a running job.
+    Returns True when a cancel was requested, so the handler can stop.
+    """
+    values = {"done": done, "updated_at": _now()}
+    if total is not None:
+        values["total"] = total
+    if result is not None:
+        values["result"] = result
+    statement = update(Job).where(Job.id == job_id).values(**values).returning(Job.cancel_requested)
+    with session_scope(session) as session:
+        cancel_requested = session.exec(statement).scalar()
+        session.commit()
+        return bool(cancel_requested)
+
+
+def finish_job(
+    job_id: str,
+    status: str,
+    result: Optional[Dict] = None,
+    error: Optional[str] = None,
+    done: Optional[int] = None,
+    total: Optional[int] = None,
+    session: Optional[Session] = None
+) -> Optional[Job]:
+    """Sets the final status (completed, failed or cancelled) and progress of a job."""
+    with session_scope(session) as session:
+        job = session.get(Job, job_id)
+        if not job:
+            return None
+        job.status = status
+        if result is not None:
+            job.result = result
+        if done is not None:
+            job.done = done
+        if total is not None:
+            job.total = total
+        job.error = error
+        job.finished_at = job.updated_at = _now()
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
+
+def cancel_job(job_id: str, session: Optional[Session] = None) -> Optional[Job]:
+    """
+    Cancels a queued job right away; a running job is asked to stop and is marked
+    cancelled by its worker at its next progress report.
+    """
+    now = _now()
+    # Conditional UPDATEs, so a worker claiming the job meanwhile is not overwritten
+    cancel_queued = (
+        update(Job)
+        .where(Job.id == job_id, Job.status == "queued")
+        .values(status="cancelled", finished_at=now, updated_at=now)
+    )
+    stop_running = (
+        update(Job)
+        .where(Job.id == job_id, Job.status == "in-progress")
+        .values(cancel_requested=True, updated_at=now)
+    )
+    with session_scope(session) as session:
+        if session.exec(cancel_queued).rowcount == 0:
+            session.exec(stop_running)
+        session.commit()
+        return session.get(Job, job_id, populate_existing=True)
+
+
+def requeue_interrupted_jobs(session: Optional[Session] = None) -> int:
+    """
+    Puts jobs left in-progress by a stopped process back in the queue.
+    Returns the number of jobs requeued.
+    """
+    statement = (
+        update(Job)
+        .where(Job.status == "in-progress")
+        .values(status="queued", started_at=None, updated_at=_now())
+    )
+    with session_scope(session) as session:
+        count = session.exec(statement).rowcount
+        session.commit()
+        return count
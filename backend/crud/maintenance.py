@@ -0,0 +1,184 @@
+# backend/crud/maintenance.py
+# Database compaction: version retention per workspace, garbage collection of
+# content blobs nothing points to any more, and an incremental VACUUM that
+# returns the freed pages to the OS.
+import datetime
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlmodel import Session, select, delete, and_, or_, func
+
+from backend.config import db_engine, session_scope, settings
+from backend.models.artifact import ArtifactHistory
+from backend.models.workspace import Workspace
+from backend.services.jobs import register_job, enqueue_job, get_job_status
+
+
+def prune_artifact_versions(
+    workspace_id: int,
+    keep_last: Optional[int] = None,
+    max_age_days: Optional[int] = None,
+    session: Optional[Session] = None
+) -> int:
+    """
+    Deletes archived versions of the workspace's documents that fall outside the
+    retention rules: beyond the `keep_last` newest versions of their document
+    (the current version counts as one), or created more than `max_age_days` ago.
+    Current and tagged versions are never deleted.
+    Returns the number of versions deleted.
+    """
+    if not keep_last and not max_age_days:
+        return 0
+
+    expired = []
+    if keep_last:
+        # Archived versions ranked newest first; rank 1 is the newest archived version
+        ranked = select(
+            ArtifactHistory.id,
+            func.row_number().over(
+                partition_by=ArtifactHistory.document_id, order_by=ArtifactHistory.version.desc()
+            ).label("rank"),
+        ).where(ArtifactHistory.workspace_id == workspace_id).subquery()
+        expired.append(ArtifactHistory.id.in_(select(ranked.c.id).where(ranked.c.rank >= keep_last)))
+    if max_age_days:
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=max_age_days)).isoformat()
+        expired.append(ArtifactHistory.created_at < cutoff)
+
+    with session_scope(session) as session:
+        statement = delete(ArtifactHistory).where(
+            and_(
+                ArtifactHistory.workspace_id == workspace_id,
+                ArtifactHistory.tag.is_(None),
+                or_(*expired),
+            )
+        )
+        deleted = session.exec(statement).rowcount
+        session.commit()
+        return deleted
+
+
+def delete_orphan_blobs(session: Optional[Session] = None) -> int:
+    """
+    Deletes content blobs that no version references, directly or as the base of
+    a delta that a referenced blob is stored against.
+    Returns the number of blobs deleted.
+    """
+    # (DELETE first: sqlite3 reports no rowcount for statements starting with WITH)
+    statement = text("""
+        DELETE FROM contentblob WHERE hash NOT IN (
+            WITH RECURSIVE live(hash) AS (
+                SELECT content_hash FROM artifact
+                UNION SELECT content_hash FROM artifact_history
+                UNION SELECT contentblob.base_hash FROM contentblob JOIN live ON contentblob.hash = live.hash
+                    WHERE contentblob.base_hash IS NOT NULL
+            )
+            SELECT hash FROM live
+        )
+    """)
+    with session_scope(session) as session:
+        deleted = session.exec(statement).rowcount
+        session.commit()
+        return deleted
+
+
+def _database_bytes(cursor) -> int:
+    page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+    return cursor.execute("PRAGMA page_count").fetchone()[0] * page_size
+
+
+def vacuum_database(engine=db_engine) -> Dict:
+    """
+    Merges the full-text index segments and returns free pages to the OS:
+    PRAGMA incremental_vacuum when the database has auto_vacuum=INCREMENTAL,
+    otherwise one full VACUUM that also switches it to the configured auto_vacuum
+    mode. Returns the database size before and after, in bytes.
+    """
+    if engine.dialect.name != "sqlite":
+        return {"bytes_before": None, "bytes_after": None, "bytes_reclaimed": 0}
+
+    connection = engine.raw_connection()
+    try:
+        # The sqlite3 connection itself: executescript() runs a statement to
+        # completion, while execute() steps incremental_vacuum only once (one page).
+        sqlite = connection.driver_connection
+        cursor = sqlite.cursor()
+        bytes_before = _database_bytes(cursor)
+        sqlite.executescript("INSERT INTO artifact_fts(artifact_fts) VALUES('optimize');")
+        if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:  # INCREMENTAL
+            sqlite.executescript("PRAGMA incremental_vacuum;")
+        else:
+            sqlite.executescript(f"PRAGMA auto_vacuum={settings.SQLITE_AUTO_VACUUM}; VACUUM;")
+        # Copy the WAL back into the database file and truncate it
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        bytes_after = _database_bytes(cursor)
+        cursor.close()
+    finally:
+        connection.close()
+    return {"bytes_before": bytes_before, "bytes_after": bytes_after, "bytes_reclaimed": bytes_before - bytes_after}
+
+
+def compact_database(workspace_id: Optional[int] = None) -> Dict:
+    """
+    Applies the retention rules of one workspace (or of every workspace), deletes
+    orphaned blobs and vacuums the database. Returns a report of the run.
+    """
+    started = time.time()
+    pruned = {}
+    with Session(db_engine) as session:
+        statement = select(Workspace)
+        if workspace_id is not None:
+            statement = statement.where(Workspace.id == workspace_id)
+        for workspace in session.exec(statement).all():
+            pruned[workspace.id] = prune_artifact_versions(
+                workspace.id, workspace.retention_keep_last, workspace.retention_max_age_days, session=session
+            )
+        blobs_deleted = delete_orphan_blobs(session=session)
+
+    report = vacuum_database()
+    report.update({
+        "versions_pruned": sum(pruned.values()),
+        "versions_pruned_by_workspace": pruned,
+        "blobs_deleted": blobs_deleted,
+        "duration": time.time() - started,
+    })
+    return report
+
+
+@register_job("compaction")
+def _compaction_job(job, workspace_id: Optional[int] = None) -> Dict:
+    return compact_database(workspace_id)
+
+
+def start_compaction(workspace_id: Optional[int] = None) -> Dict:
+    """
+    Queues compact_database() as a background job.
+    Returns a task ID for tracking the status with get_compaction_status().
+    """
+    task_id = enqueue_job("compaction", workspace_id=workspace_id)
+    return {"task_id": task_id, "status": "compaction started"}
+
+
+def get_compaction_status(task_id: str) -> Dict:
+    """Fetches the status (and, once completed, the report) of a compaction run."""
+    return get_job_status(task_id, kind="compaction")
+
+
+def start_compaction_scheduler(interval_hours: float = settings.COMPACTION_INTERVAL_HOURS) -> Optional[threading.Thread]:
+    """
+    Starts a daemon thread that queues a compaction of every workspace every
+    `interval_hours` (the first one after one interval). Returns None when
+    disabled (interval <= 0).
+    """
+    if interval_hours <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval_hours * 3600)
+            start_compaction()
+
+    thread = threading.Thread(target=loop, name="compaction-scheduler", daemon=True)
+    thread.start()
+    return thread
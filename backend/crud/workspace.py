@@ -1,37 +1,47 @@
 # backend/crud/workspace.py
 import datetime
-from sqlmodel import select, desc
+from sqlmodel import select, desc, update
 from backend.models.workspace import Workspace
-from backend.config import db_engine  # Database engine for session handling
+from backend.models.artifact import ArtifactHistory
+from backend.crud.cache import current_artifact_cache
+from backend.config import db_engine, session_scope  # Database engine for session handling
 from typing import List, Optional, Tuple
 from sqlmodel import Session, func
 
 
-def create_workspace(title: str, description: Optional[str] = None) -> Workspace:
+def create_workspace(
+    title: str,
+    description: Optional[str] = None,
+    retention_keep_last: Optional[int] = None,
+    retention_max_age_days: Optional[int] = None,
+    session: Optional[Session] = None
+) -> Workspace:
     """Create a new workspace."""
     now = datetime.datetime.now().isoformat()
     workspace = Workspace(
         title=title,
         description=description,
+        retention_keep_last=retention_keep_last,
+        retention_max_age_days=retention_max_age_days,
         created_at=now,
         updated_at=now,
     )
-    with Session(db_engine) as session:
+    with session_scope(session) as session:
         session.add(workspace)
         session.commit()
         session.refresh(workspace)
     return workspace
 
 
-def get_workspace(workspace_id: int) -> Optional[Workspace]:
+def get_workspace(workspace_id: int, session: Optional[Session] = None) -> Optional[Workspace]:
     """Retrieve a workspace by ID."""
-    with Session(db_engine) as session:
+    with session_scope(session) as session:
         return session.get(Workspace, workspace_id)
 
 
-def list_workspaces(limit: int = 10, page: int = 1) -> Tuple[List[Workspace], int]:
+def list_workspaces(limit: int = 10, page: int = 1, session: Optional[Session] = None) -> Tuple[List[Workspace], int]:
     """Retrieve a paginated list of workspaces."""
-    with Session(db_engine) as session:
+    with session_scope(session) as session:
         total = session.exec(select(func.count()).select_from(Workspace)).one()
         
         workspaces = (
@@ -42,9 +52,16 @@ def list_workspaces(limit: int = 10, page: int = 1) -> Tuple[List[Workspace], in
     return workspaces, total
 
 
-def update_workspace(workspace_id: int, title: Optional[str] = None, description: Optional[str] = None) -> Optional[Workspace]:
-    """Update a workspace's title or description."""
-    with Session(db_engine) as session:
+def update_workspace(
+    workspace_id: int,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    retention_keep_last: Optional[int] = None,
+    retention_max_age_days: Optional[int] = None,
+    session: Optional[Session] = None
+) -> Optional[Workspace]:
+    """Update a workspace's title, description or retention rules (0 removes a rule)."""
+    with session_scope(session) as session:
         workspace = session.get(Workspace, workspace_id)
         if not workspace:
             raise Exception("Workspace not found.")
@@ -54,6 +71,10 @@ def update_workspace(workspace_id: int, title: Optional[str] = None, description
             workspace.title = title
         if description:
             workspace.description = description
+        if retention_keep_last is not None:
+            workspace.retention_keep_last = retention_keep_last or None
+        if retention_max_age_days is not None:
+            workspace.retention_max_age_days = retention_max_age_days or None
         workspace.updated_at = datetime.datetime.now().isoformat()
         session.add(workspace)
         session.commit()
@@ -61,11 +82,17 @@ def update_workspace(workspace_id: int, title: Optional[str] = None, description
     return workspace
 
 
-def delete_workspace(workspace_id: int) -> bool:
+def delete_workspace(workspace_id: int, session: Optional[Session] = None) -> bool:
     """Delete a workspace by ID."""
-    with Session(db_engine) as session:
+    with session_scope(session) as session:
         workspace = session.get(Workspace, workspace_id)
         if workspace:
             session.delete(workspace)
+            # Archived versions are not part of the relationship; detach them too
+            session.exec(
+                update(ArtifactHistory).where(ArtifactHistory.workspace_id == workspace_id).values(workspace_id=None)
+            )
             session.commit()
+            # Artifacts of the workspace were detached (workspace_id = NULL)
+            current_artifact_cache.clear()
             return workspace
\ No newline at end of file
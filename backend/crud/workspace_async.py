@@ -0,0 +1,11 @@
+# backend/crud/workspace_async.py
+# Async counterparts of backend.crud.workspace, used by the API routers
+# (see backend/crud/artifact_async.py).
+from backend.config import to_async
+from backend.crud import workspace as crud
+
+create_workspace = to_async(crud.create_workspace)
+get_workspace = to_async(crud.get_workspace)
+list_workspaces = to_async(crud.list_workspaces)
+update_workspace = to_async(crud.update_workspace)
+delete_workspace = to_async(crud.delete_workspace)
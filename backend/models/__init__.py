@@ -1,2 +1,3 @@
 from .workspace import Workspace
-from .artifact import Artifact
\ No newline at end of file
+from .artifact import Artifact, ArtifactHistory, ArtifactImpact, ArtifactReference, ContentBlob
+from .job import Job
@@ -1,33 +1,349 @@
 # backend/models/artifact.py
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, Dict
-from sqlalchemy import Column, JSON
+from sqlalchemy import JSON, DDL, Index, event, table, column, text, literal_column
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, column_property
+from backend.config import settings
 import datetime
+import difflib
+import hashlib
+import json
+import zlib
 
-class Artifact(SQLModel, table=True):
+
+def hash_content(content: str) -> str:
+    """Key of a content blob: SHA-256 of the UTF-8 text."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def encode_delta(base: str, content: str) -> bytes:
+    """
+    Line-based delta that turns `base` into `content`, zlib-compressed JSON:
+    ["=", i, j] copies base lines i..j, ["+", [lines]] inserts new lines.
+    """
+    base_lines = base.splitlines(keepends=True)
+    lines = content.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["=", i1, i2])
+        elif j2 > j1:  # replace / insert (deletes need no op)
+            ops.append(["+", lines[j1:j2]])
+    return zlib.compress(json.dumps(ops, ensure_ascii=False).encode("utf-8"))
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Rebuilds the content from `base` and a delta made by encode_delta."""
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for op in json.loads(zlib.decompress(delta)):
+        parts.extend(base_lines[op[1]:op[2]] if op[0] == "=" else op[1])
+    return "".join(parts)
+
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    # apply_delta() is used by the blob text SQL below (views, triggers, queries)
+    if hasattr(dbapi_connection, "create_function"):
+        dbapi_connection.create_function("apply_delta", 2, apply_delta)
+
+
+class ContentBlob(SQLModel, table=True):
+    # Artifact bodies, stored once per distinct content and shared by every
+    # version (and document) with the same text.
+    # Blobs only referenced by archived versions may be stored as a delta
+    # against the blob of the parent version (content is NULL, base_hash/delta
+    # set); depth counts the deltas down to the nearest full snapshot.
+    hash: str = Field(primary_key=True)  # hash_content(content)
+    content: Optional[str] = None
+    base_hash: Optional[str] = Field(default=None, foreign_key="contentblob.hash")
+    delta: Optional[bytes] = None
+    depth: int = 0
+    size: int = 0  # length of content in bytes (UTF-8)
+    created_at: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
+
+
+def blob_text_sql(hash_sql: str) -> str:
+    """
+    SQL scalar expression with the full text of the blob whose hash is `hash_sql`:
+    the stored content, or the delta chain replayed from the nearest snapshot.
+    """
+    return f"""COALESCE(
+        (SELECT content FROM contentblob WHERE hash = {hash_sql}),
+        (WITH RECURSIVE
+            chain(n, content, delta, base_hash) AS MATERIALIZED (
+                SELECT 0, content, delta, base_hash FROM contentblob WHERE hash = {hash_sql}
+                UNION ALL
+                SELECT chain.n + 1, b.content, b.delta, b.base_hash
+                FROM contentblob b JOIN chain ON b.hash = chain.base_hash
+                WHERE chain.content IS NULL AND chain.n < 1000
+            ),
+            replay(n, text) AS (
+                SELECT n, content FROM chain WHERE content IS NOT NULL
+                UNION ALL
+                SELECT chain.n, apply_delta(replay.text, chain.delta)
+                FROM replay JOIN chain ON chain.n = replay.n - 1
+            )
+        SELECT text FROM replay WHERE n = 0)
+    )"""
+
+
+def store_content_blobs(connection, contents: Dict[str, str]) -> None:
+    """
+    Inserts {hash: content} blobs that are not stored yet. A hash that is stored
+    as a delta is turned back into a full blob, since it is about to be current again.
+    """
+    if not contents:
+        return
+    now = datetime.datetime.now().isoformat()
+    statement = sqlite_insert(ContentBlob)
+    statement = statement.on_conflict_do_update(
+        index_elements=["hash"],
+        set_={"content": statement.excluded.content, "base_hash": None, "delta": None, "depth": 0},
+        where=ContentBlob.content.is_(None),
+    )
+    connection.execute(statement, [
+        {"hash": key, "content": content, "size": len(content.encode("utf-8")), "created_at": now}
+        for key, content in contents.items()
+    ])
+
+
+class ArtifactBase(SQLModel):
+    # Columns shared by the hot table (artifact) and the cold one (artifact_history)
     id: Optional[int] = Field(default=None, primary_key=True)
-    document_id: str = Field(index=True)  # external identifier for a document
+    document_id: str  # external identifier for a document
     art_type: str = Field(default="doc")  # type of artifact; default is "doc"
     title: str
-    content: str
+    # Body lives in ContentBlob; read and write it through the `content` property
+    content_hash: str = Field(foreign_key="contentblob.hash")
     version: int = Field(default=1)  # version number (starts at 1)
     parent_version: Optional[int] = None  # previous version number (if any)
     status: str = Field(default="current")  # "current" or "archived"
-    references: Optional[Dict] = Field(
-        default=None, sa_column=Column(JSON, nullable=True)
-    )
+    tag: Optional[str] = None  # release label; tagged versions are exempt from retention
+    # Set when a document this version references (transitively) changed after it
+    # was written; a new version of this document starts fresh (None)
+    stale_since: Optional[str] = None
+    references: Optional[Dict] = Field(default=None, sa_type=JSON, nullable=True)
     created_at: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
     updated_at: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
     
     # field for manage indexing with vectordb
     indexed_at: Optional[str] = None # time index
-
+    # What the vectors were built from: index_hash() of title + content, and the
+    # embedding model. A reindex skips versions whose values still match.
+    indexed_hash: Optional[str] = None
+    indexed_model: Optional[str] = None
 
     # Optional reference to workspace
     workspace_id: Optional[int] = Field(default=None, foreign_key="workspace.id")
-    workspace: Optional['Workspace'] = Relationship(back_populates="artifacts")
 
     # New field for visualization preferences
-    visualization_preferences: Optional[Dict] = Field(
-        default=None, sa_column=Column(JSON, nullable=True)
-    )
\ No newline at end of file
+    visualization_preferences: Optional[Dict] = Field(default=None, sa_type=JSON, nullable=True)
+
+    def __init__(self, **data):
+        content = data.pop("content", None)
+        super().__init__(**data)
+        if content is not None and data.get("content_hash") == hash_content(content):
+            self.__dict__["_content"] = content
+        elif content is not None:
+            self.content = content
+
+    @property
+    def content(self) -> Optional[str]:
+        # Text assigned on this instance, else the blob text loaded with the row
+        content = self.__dict__.get("_content")
+        if content is None:
+            return self.blob_content
+        return content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self.__dict__["_content"] = value
+        self.content_hash = hash_content(value)
+
+
+class Artifact(ArtifactBase, table=True):
+    # Hot table: current versions only. Archived versions are moved to
+    # artifact_history (same id) when a newer version replaces them.
+    # Composite indexes matching the CRUD access paths:
+    # - workspace listing ordered by updated_at (keyset on updated_at, id)
+    # - current version lookup by (document_id, status) ordered by version
+    # - version lookup by (document_id, version)
+    # The last two are unique so concurrent version bumps cannot both succeed.
+    # AUTOINCREMENT: ids of rows moved to the history table are never reused.
+    __table_args__ = (
+        Index("ix_artifact_workspace_updated", "workspace_id", "updated_at", "id"),
+        Index("ix_artifact_document_status_version", "document_id", "status", "version"),
+        Index("ix_artifact_document_version", "document_id", "version", unique=True),
+        Index(
+            "ix_artifact_document_current", "document_id", unique=True,
+            sqlite_where=text("status = 'current'"), postgresql_where=text("status = 'current'")
+        ),
+        # Versions sharing a blob (delta encoding checks whether a blob is still current)
+        Index("ix_artifact_content_hash", "content_hash", "status"),
+        # Stale derived artifacts of a workspace, oldest first (list_stale_artifacts)
+        Index(
+            "ix_artifact_workspace_stale", "workspace_id", "stale_since", "id",
+            sqlite_where=text("stale_since IS NOT NULL"), postgresql_where=text("stale_since IS NOT NULL")
+        ),
+        {"sqlite_autoincrement": True},
+    )
+
+    workspace: Optional['Workspace'] = Relationship(back_populates="artifacts")
+
+
+class ArtifactHistory(ArtifactBase, table=True):
+    # Cold table: archived versions, keeping the id they had in artifact.
+    __tablename__ = "artifact_history"
+    __table_args__ = (
+        Index("ix_artifact_history_document_version", "document_id", "version", unique=True),
+        Index("ix_artifact_history_workspace_updated", "workspace_id", "updated_at", "id"),
+        Index("ix_artifact_history_content_hash", "content_hash"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": False})
+    status: str = Field(default="archived")
+
+
+# SQL expressions for the artifact body, for projections and filters
+# (ArtifactBase.content is a Python property, not a column).
+artifact_content = literal_column(blob_text_sql("artifact.content_hash")).label("content")
+artifact_history_content = literal_column(blob_text_sql("artifact_history.content_hash")).label("content")
+
+# Loaded with every row; read it through .content
+Artifact.blob_content = column_property(literal_column(blob_text_sql("artifact.content_hash")))
+ArtifactHistory.blob_content = column_property(literal_column(blob_text_sql("artifact_history.content_hash")))
+
+
+@event.listens_for(Session, "before_flush")
+def _store_pending_content(session, flush_context, instances):
+    # Write the blobs of new / edited artifacts before their rows reference them
+    contents = {}
+    for instance in list(session.new) + list(session.dirty):
+        if isinstance(instance, ArtifactBase) and instance.__dict__.get("_content") is not None:
+            contents[instance.content_hash] = instance.__dict__["_content"]
+    store_content_blobs(session.connection(), contents)
+
+
+# -----------------------------------------------------------------------------
+# Full-text index (SQLite FTS5) over title and content of current versions
+# (the hot artifact table). An external-content table (rowid = artifact.id): the text itself is read back
+# from the artifact_fts_source view (artifact joined with its blob), so bodies are
+# not stored twice. Triggers keep it in sync, so every write path updates it
+# without extra code.
+# -----------------------------------------------------------------------------
+ArtifactFTS = table(
+    "artifact_fts",
+    column("rowid"),
+    column("artifact_fts"),  # hidden column used as the left side of MATCH
+    column("title"),
+    column("content"),
+)
+
+
+_fts_ddl = [
+    f"""CREATE VIEW IF NOT EXISTS artifact_fts_source AS
+        SELECT artifact.id AS id, artifact.title AS title, {blob_text_sql("artifact.content_hash")} AS content
+        FROM artifact""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS artifact_fts USING fts5(
+        title, content, content = 'artifact_fts_source', content_rowid = 'id',
+        tokenize = '{settings.FTS_TOKENIZER}'
+    )""",
+    # (document_id, version) is unique across the hot and the history table
+    """CREATE TRIGGER IF NOT EXISTS artifact_version_unique BEFORE INSERT ON artifact
+    WHEN EXISTS (
+        SELECT 1 FROM artifact_history WHERE document_id = new.document_id AND version = new.version
+    ) BEGIN
+        SELECT RAISE(ABORT, 'UNIQUE constraint failed: artifact.document_id, artifact.version');
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS artifact_fts_ai AFTER INSERT ON artifact BEGIN
+        INSERT INTO artifact_fts(rowid, title, content)
+        VALUES (new.id, new.title, {blob_text_sql("new.content_hash")});
+    END""",
+    # External-content FTS deletes need the old values to remove their terms
+    f"""CREATE TRIGGER IF NOT EXISTS artifact_fts_ad AFTER DELETE ON artifact BEGIN
+        INSERT INTO artifact_fts(artifact_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, {blob_text_sql("old.content_hash")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS artifact_fts_au AFTER UPDATE OF title, content_hash ON artifact BEGIN
+        INSERT INTO artifact_fts(artifact_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, {blob_text_sql("old.content_hash")});
+        INSERT INTO artifact_fts(rowid, title, content)
+        VALUES (new.id, new.title, {blob_text_sql("new.content_hash")});
+    END""",
+]
+
+for statement in _fts_ddl:
+    event.listen(Artifact.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in ("DROP TABLE IF EXISTS artifact_fts", "DROP VIEW IF EXISTS artifact_fts_source"):
+    event.listen(Artifact.__table__, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
+
+
+# -----------------------------------------------------------------------------
+# Reference graph: one edge per document the current version of a document
+# references, so dependency queries are index lookups instead of parsing every
+# `references` JSON. Entries of `references` (at any nesting level) are artifact
+# ids (resolved to their document) or document ids. Triggers on the hot table
+# keep the edges in step with every write path, like the FTS index above.
+# -----------------------------------------------------------------------------
+class ArtifactReference(SQLModel, table=True):
+    __tablename__ = "artifact_reference"
+    # The primary key serves "what does X reference", the index "who references X"
+    __table_args__ = (
+        Index("ix_artifact_reference_target", "target_document_id", "source_document_id"),
+    )
+
+    source_document_id: str = Field(primary_key=True)
+    target_document_id: str = Field(primary_key=True)
+
+
+class ArtifactImpact(SQLModel, table=True):
+    # Transitive closure of artifact_reference: affected_document_id references
+    # document_id directly or through other documents, i.e. it is affected when
+    # document_id changes. Maintained incrementally by the CRUD functions that
+    # change references (crud.artifact._refresh_impact); WITH is not allowed in
+    # trigger bodies, so it cannot be a trigger like the edges.
+    __tablename__ = "artifact_impact"
+    __table_args__ = (
+        # Rows to recompute when the references of affected_document_id change
+        Index("ix_artifact_impact_affected", "affected_document_id", "document_id"),
+    )
+
+    document_id: str = Field(primary_key=True)
+    affected_document_id: str = Field(primary_key=True)
+
+
+def _reference_edges_sql(row: str) -> str:
+    # Edges (source, target) of the artifact row `row` (new / old in a trigger)
+    return f"""SELECT {row}.document_id, target FROM (
+            SELECT CASE type
+                WHEN 'integer' THEN COALESCE(
+                    (SELECT document_id FROM artifact WHERE id = value),
+                    (SELECT document_id FROM artifact_history WHERE id = value)
+                )
+                ELSE value
+            END AS target
+            FROM json_tree({row}."references") WHERE type IN ('integer', 'text')
+        ) WHERE target IS NOT NULL AND target != {row}.document_id"""
+
+
+_reference_ddl = [
+    f"""CREATE TRIGGER IF NOT EXISTS artifact_reference_ai AFTER INSERT ON artifact BEGIN
+        INSERT OR IGNORE INTO artifact_reference(source_document_id, target_document_id)
+        {_reference_edges_sql("new")};
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS artifact_reference_ad AFTER DELETE ON artifact BEGIN
+        DELETE FROM artifact_reference WHERE source_document_id = old.document_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS artifact_reference_au AFTER UPDATE OF "references" ON artifact BEGIN
+        DELETE FROM artifact_reference WHERE source_document_id = old.document_id;
+        INSERT OR IGNORE INTO artifact_reference(source_document_id, target_document_id)
+        {_reference_edges_sql("new")};
+    END""",
+]
+
+for statement in _reference_ddl:
+    event.listen(Artifact.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
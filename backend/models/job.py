@@ -0,0 +1,34 @@
+# backend/models/job.py
+from sqlmodel import SQLModel, Field
+from typing import Optional, Dict
+from sqlalchemy import Index, JSON
+import datetime
+import uuid
+
+
+class Job(SQLModel, table=True):
+    # Background task (reindex, compaction, regeneration, ...) run by the worker
+    # threads of backend/services/jobs.py. Persisted so clients can poll it by id
+    # and queued work survives a restart.
+    __table_args__ = (
+        # Workers claim the oldest queued job
+        Index("ix_job_status_created", "status", "created_at"),
+        Index("ix_job_kind_created", "kind", "created_at"),
+    )
+
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
+    kind: str  # registered handler name, e.g. "reindex"
+    params: Optional[Dict] = Field(default=None, sa_type=JSON, nullable=True)  # handler keyword arguments
+    status: str = Field(default="queued")  # queued, in-progress, completed, failed, cancelled
+    cancel_requested: bool = False
+
+    # Progress reported by the handler: `done` of `total` items
+    total: Optional[int] = None
+    done: int = 0
+    result: Optional[Dict] = Field(default=None, sa_type=JSON, nullable=True)
+    error: Optional[str] = None
+
+    created_at: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    finished_at: Optional[str] = None
@@ -11,6 +11,12 @@ class Workspace(SQLModel, table=True):
 
     created_at: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
     updated_at: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
+
+    # Version retention, applied by the compaction job (backend/crud/maintenance.py).
+    # Archived versions beyond the last N of a document, or created more than D
+    # days ago, are pruned; current and tagged versions are always kept.
+    retention_keep_last: Optional[int] = None
+    retention_max_age_days: Optional[int] = None
     
     # Relationship to artifacts
     artifacts: List["Artifact"] = Relationship(back_populates="workspace")
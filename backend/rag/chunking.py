@@ -0,0 +1,92 @@
+# backend/rag/chunking.py
+# Node parsing stage of backend indexing: splits artifacts into chunks with the
+# splitter configured in settings (CHUNK_SPLITTER, CHUNK_SIZE, CHUNK_OVERLAP)
+# and gives each chunk a stable id and a hash of the text that gets embedded,
+# so an update can keep the vectors of the chunks that did not change.
+import hashlib
+from typing import Dict, List, Optional
+
+from llama_index.core import Document
+from llama_index.core.ingestion import run_transformations
+from llama_index.core.node_parser import MarkdownNodeParser, SentenceSplitter, TokenTextSplitter
+from llama_index.core.schema import BaseNode, MetadataMode, NodeRelationship
+
+from backend.config import settings
+
+# Chunk bookkeeping kept in the vector store but out of the embedded / LLM text
+INTERNAL_METADATA_KEYS = ["artifact_id", "art_type", "version", "chunk", "chunk_hash"]
+
+
+def get_node_parsers(
+    splitter: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None
+) -> list:
+    """
+    Transformations that split documents into chunks (defaults from settings):
+    "sentence" packs whole sentences into chunks of up to `chunk_size` tokens,
+    "markdown" splits on headings first and then by sentence, "token" cuts
+    fixed windows of `chunk_size` tokens. Consecutive chunks share `chunk_overlap` tokens.
+    """
+    splitter = splitter or settings.CHUNK_SPLITTER
+    chunk_size = chunk_size or settings.CHUNK_SIZE
+    chunk_overlap = settings.CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+    if splitter == "sentence":
+        return [SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)]
+    if splitter == "markdown":
+        return [MarkdownNodeParser(), SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)]
+    if splitter == "token":
+        return [TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)]
+    raise ValueError(f"Unknown chunk splitter {splitter}.")
+
+
+def chunk_id(document_id: str, version: Optional[int], index: int) -> str:
+    """Id of the `index`-th chunk of a document version."""
+    if version is None:
+        return f"{document_id}:{index}"
+    return f"{document_id}:v{version}:{index}"
+
+
+def chunk_hash(node: BaseNode) -> str:
+    """Hash of what gets embedded for the chunk (its text with the embedded metadata)."""
+    return hashlib.sha256(node.get_content(metadata_mode=MetadataMode.EMBED).encode("utf-8")).hexdigest()
+
+
+def split_documents(workspace_id: int, docs: List[Dict], transformations: Optional[list] = None) -> List[BaseNode]:
+    """
+    Splits documents (dicts with document_id, title, content and optionally artifact_id,
+    art_type and version) into chunks, in document order. Chunks get ids from chunk_id()
+    and carry those optional fields plus chunk (index) and chunk_hash as metadata.
+    """
+    documents = []
+    for doc in docs:
+        metadata = {"title": doc["title"], "workspace_id": workspace_id}
+        for key in ("artifact_id", "art_type", "version"):
+            if doc.get(key) is not None:
+                metadata[key] = doc[key]
+        documents.append(Document(
+            text=doc["content"],
+            metadata=metadata,
+            id_=doc["document_id"],
+            excluded_embed_metadata_keys=list(INTERNAL_METADATA_KEYS),
+            excluded_llm_metadata_keys=list(INTERNAL_METADATA_KEYS),
+        ))
+    nodes = run_transformations(documents, transformations or get_node_parsers())
+
+    # Parsers assign random ids; number the chunks of each document instead
+    versions = {doc["document_id"]: doc.get("version") for doc in docs}
+    counts: Dict[str, int] = {}
+    new_ids: Dict[str, str] = {}
+    for node in nodes:
+        index = counts.get(node.ref_doc_id, 0)
+        counts[node.ref_doc_id] = index + 1
+        new_ids[node.id_] = chunk_id(node.ref_doc_id, versions.get(node.ref_doc_id), index)
+        node.metadata["chunk"] = index
+    for node in nodes:
+        node.id_ = new_ids[node.id_]
+        for relationship in (NodeRelationship.PREVIOUS, NodeRelationship.NEXT):
+            related = node.relationships.get(relationship)
+            if related is not None and related.node_id in new_ids:
+                related.node_id = new_ids[related.node_id]
+        node.metadata["chunk_hash"] = chunk_hash(node)
+    return nodes
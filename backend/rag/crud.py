@@ -1,29 +1,109 @@
 # backend/rag/crud.py
-from llama_index.core import Document
-from backend.rag.index import vector_index, reset
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set
+from llama_index.core import Settings
+from llama_index.core.schema import MetadataMode
+from llama_index.core.utils import get_tokenizer
+from backend.config import settings
+from backend.rag.chunking import split_documents
+from backend.rag.index import get_collection, get_vector_index, reset
 
-def clear_index(workspace_id: int):
+def clear_index(workspace_id: int) -> Dict:
     """
-    Clears the entire vector store (Chroma DB).
+    Clears the vectors of one workspace from the vector store (Chroma DB).
+    Returns the number of vectors deleted.
     """
-    reset()
+    return reset(workspace_id)
     
-def insert_doc(workspace_id: int, document_id: str, title: str, content: str):
+def insert_doc(workspace_id: int, document_id: str, title: str, content: str, version: int = None):
     """
-    Insert a new document into the vector index.
+    Insert a new document into the vector index (replacing its previous chunks).
     """
-    doc = Document(text=content, metadata={"title": title, "workspace_id": workspace_id}, id_=document_id)
-    vector_index.insert(doc)
+    return insert_docs(workspace_id, [{"document_id": document_id, "title": title, "content": content, "version": version}])
 
-def delete_doc(document_id: str):
+def embed_nodes(nodes: list, batch_size: int = None, concurrency: int = None) -> None:
+    """
+    Sets the embedding of each node, `batch_size` texts per embedding request with
+    up to `concurrency` requests in flight (defaults from settings).
+    """
+    batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+    concurrency = concurrency or settings.EMBEDDING_CONCURRENCY
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # map() keeps the batch order, so embeddings line up with the nodes
+        embeddings = [embedding for batch in pool.map(Settings.embed_model.get_text_embedding_batch, batches) for embedding in batch]
+    for node, embedding in zip(nodes, embeddings):
+        node.embedding = embedding
+
+def _stored_embeddings(workspace_id: int, document_ids: List[str]) -> Dict[str, list]:
+    """Embeddings of the documents' chunks in the vector store, by chunk_hash."""
+    ret = get_collection(workspace_id).get(
+        where={"document_id": {"$in": list(document_ids)}}, include=["embeddings", "metadatas"]
+    )
+    return {
+        meta["chunk_hash"]: [float(value) for value in embedding]
+        for meta, embedding in zip(ret["metadatas"], ret["embeddings"])
+        if meta.get("chunk_hash")
+    }
+
+def insert_docs(workspace_id: int, docs: List[Dict]) -> Dict:
+    """
+    Insert many documents (dicts with document_id, title, content and optionally artifact_id,
+    art_type and version)
+    into the vector index, replacing their previous chunks.
+    Chunks (see backend/rag/chunking.py) unchanged since the previous version keep their
+    stored embedding; the others are embedded together in batches (see embed_nodes).
+    Returns throughput stats: documents, nodes, reused, tokens (embedded), seconds,
+    docs_per_second, tokens_per_second.
+    """
+    started = time.perf_counter()
+    document_ids = [doc["document_id"] for doc in docs]
+    nodes = split_documents(workspace_id, docs)
+    stored = _stored_embeddings(workspace_id, document_ids) if document_ids else {}
+    for node in nodes:
+        node.embedding = stored.get(node.metadata["chunk_hash"])
+    new_nodes = [node for node in nodes if node.embedding is None]
+    embed_nodes(new_nodes)
+    delete_docs(workspace_id, document_ids)
+    get_vector_index(workspace_id).insert_nodes(nodes)
+
+    tokenizer = get_tokenizer()
+    tokens = sum(len(tokenizer(node.get_content(metadata_mode=MetadataMode.EMBED))) for node in new_nodes)
+    seconds = time.perf_counter() - started
+    return {
+        "documents": len(docs),
+        "nodes": len(nodes),
+        "reused": len(nodes) - len(new_nodes),
+        "tokens": tokens,
+        "seconds": seconds,
+        "docs_per_second": len(docs) / seconds if seconds else None,
+        "tokens_per_second": tokens / seconds if seconds else None,
+    }
+
+def indexed_document_ids(workspace_id: int) -> Set[str]:
+    """
+    Ids of the documents of the workspace that have vectors in the index.
+    """
+    ret = get_collection(workspace_id).get(include=["metadatas"])
+    return {meta["document_id"] for meta in ret["metadatas"]}
+
+def delete_doc(workspace_id: int, document_id: str):
     """
     Delete a document from the vector index.
     """
-    vector_index.delete(document_id)
+    get_vector_index(workspace_id).delete_ref_doc(document_id)
+    
+def delete_docs(workspace_id: int, document_ids: List[str]) -> None:
+    """
+    Delete many documents from the vector index in one call.
+    """
+    if document_ids:
+        get_collection(workspace_id).delete(where={"document_id": {"$in": list(document_ids)}})
     
-def update_doc(workspace_id: int, document_id: str, title: str, content: str):
+def update_doc(workspace_id: int, document_id: str, title: str, content: str, version: int = None):
     """
-    Update an existing document in the vector index.
+    Update an existing document in the vector index; only its changed chunks are embedded again.
     """
-    doc = Document(text=content, metadata={"title": title, "workspace_id": workspace_id}, id_=document_id)
-    vector_index.update(doc)
+    return insert_doc(workspace_id, document_id, title, content, version)
@@ -0,0 +1,168 @@
+# backend/rag/embedding_cache.py
+# Persistent embedding cache shared by backend/rag (backend/rag/llm.py) and the
+# Streamlit app's data_management (llm_service/embedding_handler.py).
+#
+# Text embeddings are stored in their own SQLite file keyed by (model name,
+# sha256 of the text), so re-embedding unchanged chunks - on a reindex, after
+# clear_index or when VectorDatabase rebuilds an index - costs a lookup instead
+# of an Ollama request. Query embeddings are kept in a small in-memory LRU.
+# Kept free of backend.config so both apps can import it.
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from pydantic import Field, PrivateAttr
+
+# Keys per SELECT ... IN (...), below SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    SQLite table of embeddings by (model, text hash), stored as float32 arrays.
+    Safe to share between threads (one connection behind a lock).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embedding ("
+                " model TEXT NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, hash)) WITHOUT ROWID"
+            )
+            self._connection.commit()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, Embedding]:
+        """Embeddings of `model` found for `hashes`, by hash."""
+        found: Dict[str, Embedding] = {}
+        keys = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+                chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+                rows = self._connection.execute(
+                    f"SELECT hash, vector FROM embedding WHERE model = ? AND hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                )
+                for key, vector in rows:
+                    found[key] = array("f", vector).tolist()
+        return found
+
+    def put_many(self, model: str, embeddings: Dict[str, Embedding]) -> None:
+        """Stores embeddings of `model` by text hash."""
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embedding (model, hash, vector) VALUES (?, ?, ?)",
+                [(model, key, array("f", vector).tobytes()) for key, vector in embeddings.items()],
+            )
+            self._connection.commit()
+
+    def count(self, model: Optional[str] = None) -> int:
+        with self._lock:
+            if model is None:
+                return self._connection.execute("SELECT count(*) FROM embedding").fetchone()[0]
+            return self._connection.execute("SELECT count(*) FROM embedding WHERE model = ?", (model,)).fetchone()[0]
+
+    def clear(self, model: Optional[str] = None) -> int:
+        """Deletes the embeddings of `model` (all when None); returns the number deleted."""
+        with self._lock:
+            if model is None:
+                deleted = self._connection.execute("DELETE FROM embedding").rowcount
+            else:
+                deleted = self._connection.execute("DELETE FROM embedding WHERE model = ?", (model,)).rowcount
+            self._connection.commit()
+            return deleted
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    Embedding model wrapping another one (e.g. OllamaEmbedding): text embeddings
+    come from the EmbeddingStore when present, and only the missing texts of a
+    batch are sent to the wrapped model. Query embeddings go through an LRU of
+    `query_cache_size` entries.
+    """
+
+    embed_model: BaseEmbedding = Field(description="The wrapped embedding model.")
+    query_cache_size: int = Field(default=256)
+
+    _store: EmbeddingStore = PrivateAttr()
+    _queries: "OrderedDict[str, Embedding]" = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)  # queries and stats
+    _stats: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    def __init__(self, embed_model: BaseEmbedding, path: str, query_cache_size: int = 256, **kwargs):
+        super().__init__(
+            embed_model=embed_model,
+            query_cache_size=query_cache_size,
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            **kwargs,
+        )
+        self._store = EmbeddingStore(path)
+        self._stats = {"text_hits": 0, "text_misses": 0, "query_hits": 0, "query_misses": 0}
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def store(self) -> EmbeddingStore:
+        return self._store
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Cache hits and misses for text and query embeddings since start."""
+        return dict(self._stats)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        hashes = [text_hash(text) for text in texts]
+        found = self._store.get_many(self.model_name, hashes)
+        missing = {key: text for key, text in zip(hashes, texts) if key not in found}
+        if missing:
+            embeddings = self.embed_model.get_text_embedding_batch(list(missing.values()))
+            computed = dict(zip(missing, embeddings))
+            self._store.put_many(self.model_name, computed)
+            found.update(computed)
+        with self._lock:
+            self._stats["text_hits"] += len(texts) - len(missing)
+            self._stats["text_misses"] += len(missing)
+        return [found[key] for key in hashes]
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embedding(text)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self._get_text_embeddings(texts)
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        with self._lock:
+            embedding = self._queries.get(query)
+            if embedding is not None:
+                self._queries.move_to_end(query)
+                self._stats["query_hits"] += 1
+                return embedding
+        embedding = self.embed_model.get_query_embedding(query)
+        with self._lock:
+            self._stats["query_misses"] += 1
+            self._queries[query] = embedding
+            while len(self._queries) > self.query_cache_size:
+                self._queries.popitem(last=False)
+        return embedding
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return self._get_query_embedding(query)
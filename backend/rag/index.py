@@ -2,12 +2,15 @@
 # doc: https://docs.llamaindex.ai/en/stable/api_reference/indices/
 
 import os
+import threading
+from typing import Dict, Optional
 from llama_index.core import (
     VectorStoreIndex,
     StorageContext,
     SimpleDirectoryReader,
 )
 import chromadb
+from chromadb.errors import NotFoundError
 from llama_index.vector_stores.chroma import ChromaVectorStore
 from backend.config import settings
 from backend.rag.llm import init_llm
@@ -15,36 +18,110 @@ from backend.rag.llm import init_llm
 # Initialize ChromaDB client
 chroma_client = chromadb.PersistentClient(path=settings.VECTOR_DB_PATH)
 
-# Get (or create) a collection for our artifacts.
-# The collection name can be anything, here we use "artifacts_collection"
-chroma_collection = chroma_client.get_or_create_collection("artifacts_collection")
-
-# Initialize ChromaVectorStore with the collection object.
-vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
+# Each workspace has its own collection (and HNSW graph), so indexing, clearing
+# and retrieval never touch the vectors of other workspaces.
+COLLECTION_PREFIX = "artifacts_workspace_"
+# The collection all workspaces shared before. Its vectors are not migrated: a
+# workspace's are deleted when it is cleared or reindexed (into its own collection).
+LEGACY_COLLECTION = "artifacts_collection"
 
 # Initialize the LLM and Embedding settings (this sets global settings for LlamaIndex)
 init_llm()
 
-# Create a StorageContext using the vector store.
-storage_context = StorageContext.from_defaults(vector_store=vector_store)
+# workspace_id -> (collection, index), opened on first use
+_workspace_indexes: Dict[int, tuple] = {}
+_workspace_indexes_lock = threading.Lock()
 
-# Create the vector index from the vector store.
-vector_index = VectorStoreIndex.from_vector_store(
-    vector_store,
-    storage_context=storage_context
-)
 
-# Create query engine (default)
-query_engine = vector_index.as_query_engine()
+def collection_name(workspace_id: int) -> str:
+    return f"{COLLECTION_PREFIX}{workspace_id}"
+
+
+def _open(workspace_id: int, create: bool = True) -> Optional[tuple]:
+    with _workspace_indexes_lock:
+        handle = _workspace_indexes.get(workspace_id)
+        if handle is None:
+            # Get (or create) the workspace's collection
+            if create:
+                collection = chroma_client.get_or_create_collection(collection_name(workspace_id))
+            else:
+                try:
+                    collection = chroma_client.get_collection(collection_name(workspace_id))
+                except NotFoundError:
+                    # Nothing indexed in this workspace yet
+                    return None
+            # Initialize ChromaVectorStore with the collection object.
+            vector_store = ChromaVectorStore(chroma_collection=collection)
+            # Create a StorageContext using the vector store.
+            storage_context = StorageContext.from_defaults(vector_store=vector_store)
+            # Create the vector index from the vector store.
+            index = VectorStoreIndex.from_vector_store(vector_store, storage_context=storage_context)
+            handle = _workspace_indexes[workspace_id] = (collection, index)
+        return handle
+
+
+def get_collection(workspace_id: int):
+    """Chroma collection of the workspace (created on first use, then cached)."""
+    return _open(workspace_id)[0]
+
+
+def get_vector_index(workspace_id: int, create: bool = True) -> Optional[VectorStoreIndex]:
+    """
+    Vector index over the workspace's collection (created on first use, then cached).
+    With `create` False a workspace without a collection gets None instead, so
+    read-only callers do not create empty collections.
+    """
+    handle = _open(workspace_id, create)
+    return handle[1] if handle else None
+
+
+def drop_legacy_vectors(workspace_id: int) -> int:
+    """
+    Deletes the workspace's vectors from the legacy shared collection (one filtered
+    delete), and the collection itself once no workspace has vectors left in it.
+    Returns the number of vectors deleted.
+    """
+    with _workspace_indexes_lock:
+        try:
+            collection = chroma_client.get_collection(LEGACY_COLLECTION)
+        except NotFoundError:
+            return 0
+        where = {"workspace_id": workspace_id}
+        deleted = len(collection.get(where=where, include=[])["ids"])
+        if deleted:
+            collection.delete(where=where)
+        if collection.count() == 0:
+            chroma_client.delete_collection(LEGACY_COLLECTION)
+        return deleted
+
 
-def reset():
-    print("chroma db: count before", chroma_collection.count())
-    ret = chroma_collection.get()
-    for meta in ret['metadatas']:
-        print("document_id", meta['document_id'])
-        
-    for docid in ret['ids']:
-        print("deleting", docid)
-        chroma_collection.delete(ids=[docid,])
-    print("chroma db: count after", chroma_collection.count())
+def reset(workspace_id: Optional[int] = None) -> Dict:
+    """
+    Drops the collection of one workspace (of every workspace, and the legacy
+    shared collection, when None): one call however many vectors it holds.
+    For one workspace its vectors in the legacy collection are deleted too.
+    Returns the number of vectors deleted.
+    """
+    deleted = 0 if workspace_id is None else drop_legacy_vectors(workspace_id)
+    if workspace_id is None:
+        names = [
+            collection.name for collection in chroma_client.list_collections()
+            if collection.name.startswith(COLLECTION_PREFIX) or collection.name == LEGACY_COLLECTION
+        ]
+    else:
+        names = [collection_name(workspace_id)]
 
+    with _workspace_indexes_lock:
+        for name in names:
+            try:
+                collection = chroma_client.get_collection(name)
+            except NotFoundError:
+                # Nothing indexed in this workspace yet
+                continue
+            deleted += collection.count()
+            chroma_client.delete_collection(name)
+        if workspace_id is None:
+            _workspace_indexes.clear()
+        else:
+            _workspace_indexes.pop(workspace_id, None)
+    return {"workspace_id": workspace_id, "deleted": deleted}
@@ -4,14 +4,21 @@ from llama_index.llms.ollama import Ollama
 from llama_index.embeddings.ollama import OllamaEmbedding
 from llama_index.core import Settings # ADD THIS
 from backend.config import settings as config
+from backend.rag.embedding_cache import CachedEmbedding
 
 class EmbeddingHandler:
     def __init__(self):
         self.embedding_model = OllamaEmbedding(
             model_name=config.EMBEDDING_MODEL, 
             base_url=config.LLM_HOST, 
-            request_timeout=config.LLM_TIMEOUT
+            request_timeout=config.LLM_TIMEOUT,
+            embed_batch_size=config.EMBEDDING_BATCH_SIZE,  # texts per embedding request
         )
+        if config.EMBEDDING_CACHE_PATH:
+            # Only texts not embedded before by this model reach Ollama
+            self.embedding_model = CachedEmbedding(
+                self.embedding_model, config.EMBEDDING_CACHE_PATH, config.EMBEDDING_QUERY_CACHE_SIZE
+            )
         
     def get_embeddings(self, text_list):
         """
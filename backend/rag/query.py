@@ -1,3 +1,5 @@
+from typing import Optional
+
 from llama_index.core import get_response_synthesizer
 from llama_index.core.retrievers import (
     BaseRetriever,
@@ -5,25 +7,37 @@ from llama_index.core.retrievers import (
     KeywordTableSimpleRetriever,
 )
 from llama_index.core.query_engine import RetrieverQueryEngine
-from backend.rag.index import vector_index
+from llama_index.core.vector_stores import MetadataFilters
+from backend.rag.index import get_vector_index
 
-def get_query_engine(similarity_top_k: int = 3, filters: list = None) -> RetrieverQueryEngine:
+def get_retriever(
+    workspace_id: int, similarity_top_k: int = 3, filters: MetadataFilters = None, create: bool = True
+) -> Optional[VectorIndexRetriever]:
     """
-    Creates and returns a RetrieverQueryEngine based on the vector index.
-    You can pass optional parameters like similarity_top_k or filters.
+    Creates a retriever over the workspace's own collection only.
+    `filters` narrows it further by node metadata (e.g. title).
+    With `create` False, returns None when nothing was indexed in the workspace.
     """
-    retriever = VectorIndexRetriever(
-        index=vector_index,
+    index = get_vector_index(workspace_id, create=create)
+    if index is None:
+        return None
+    return VectorIndexRetriever(
+        index=index,
         similarity_top_k=similarity_top_k,
         vector_store_query_mode="default",
         filters=filters,
         alpha=None,
         doc_ids=None,
     )
+
+def get_query_engine(workspace_id: int, similarity_top_k: int = 3, filters: MetadataFilters = None) -> RetrieverQueryEngine:
+    """
+    Creates and returns a RetrieverQueryEngine based on the vector index of the workspace.
+    You can pass optional parameters like similarity_top_k or filters.
+    """
+    retriever = get_retriever(workspace_id, similarity_top_k, filters)
     query_engine = RetrieverQueryEngine(
         retriever=retriever,
         response_synthesizer=get_response_synthesizer(response_mode="tree_summarize",)
     )
     return query_engine
-
-query_engine = get_query_engine(similarity_top_k=3)
\ No newline at end of file
@@ -1,41 +1,78 @@
 # backend/routers/artifact.py
 from fastapi import status, APIRouter, UploadFile, File, HTTPException, Query, Depends
-from typing import List, Tuple, Optional
+from typing import List, Literal, Tuple, Optional, Union
+from sqlalchemy.exc import IntegrityError, OperationalError
 from backend.schemas.artifact import (
     ArtifactCreate,
     ArtifactUpdate,
     RollbackRequest,
+    TagRequest,
     ReIndexRequest,
+    RegenerateRequest,
     ClearIndexRequest,
     ArtifactResponse,
-    PaginatedResponse
+    PaginatedResponse,
+    ArtifactSummary,
+    PaginatedSummaryResponse,
+    SUMMARY_FIELDS,
+    BatchRequest,
+    BatchResponse,
+    ReferenceNode,
+    SemanticSearchResult,
 )
-from backend.crud.artifact import (
+from backend.crud.artifact import encode_cursor, is_write_conflict, REFERENCE_DEPTH, MAX_REFERENCE_DEPTH
+from backend.crud.cache import current_artifact_cache
+from backend.crud.artifact_async import (
     create_new_artifact,
     list_artifacts,
     search_artifacts,
+    fulltext_search_artifacts,
     get_artifact_by_internal_id,
     get_current_artifact,
     get_artifact_versions,
+    get_artifact_dependencies,
+    get_artifact_dependents,
+    get_artifact_impact,
+    list_stale_artifacts,
     update_artifact_version,
     set_artifact_meta,
     rollback_artifact_version,
+    tag_artifact_version,
     delete_artifact_by_id,
     delete_artifacts_by_document,
+    apply_artifact_batch,
 )
+from backend.services.regeneration import start_regeneration, get_regeneration_status
 from backend.crud.index import (
     clear_index, 
     reindex_all_documents, 
-    get_reindexing_status
+    get_reindexing_status,
+    cancel_reindexing,
+    semantic_search_artifacts,
 )
 
 router = APIRouter(prefix="/artifacts", tags=["Artifacts"])
 
+def _summary_columns(include_content: bool, fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Maps the `include_content` / `fields` query options to the columns to load.
+    Returns None when full artifacts (with content) should be returned.
+    """
+    if fields:
+        columns = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in columns if name not in SUMMARY_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+        return columns
+    if not include_content:
+        return SUMMARY_FIELDS
+    return None
+
 # -----------------------------------------------------------------------------
 # List artifacts with pagination and optional filters
 # -----------------------------------------------------------------------------
-@router.get("/", response_model=PaginatedResponse)
-def api_list_artifacts(
+@router.get("/", response_model=Union[PaginatedSummaryResponse, PaginatedResponse], response_model_exclude_unset=True)
+async def api_list_artifacts(
     workspace_id: int,  # Added required workspace_id query parameter
     limit: int = Query(10, gt=0),
     page: int = Query(1, gt=0),
@@ -43,30 +80,67 @@ def api_list_artifacts(
     version: Optional[int] = None,
     status: Optional[str] = None,
     keyword: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_content: bool = True,
+    fields: Optional[str] = None,
 ):
-    if art_type or version or status or keyword:
-        artifacts, total = search_artifacts(
-            workspace_id=workspace_id, 
-            art_type=art_type, 
-            version=version, 
-            status=status, 
-            keyword=keyword
-        )
-    else:
-        artifacts, total = list_artifacts(workspace_id=workspace_id, page=page, limit=limit)
+    columns = _summary_columns(include_content, fields)
+    item_model = ArtifactResponse if columns is None else ArtifactSummary
+    try:
+        if keyword:
+            # Ranked full-text search: attach score and snippet to each item
+            hits, total = await fulltext_search_artifacts(
+                workspace_id=workspace_id,
+                keyword=keyword,
+                art_type=art_type,
+                version=version,
+                status=status,
+                limit=limit,
+                page=page,
+                cursor=cursor,
+                columns=columns
+            )
+            items = [
+                item_model.model_validate(artifact).model_copy(update={"score": score, "snippet": snippet})
+                for artifact, score, snippet in hits
+            ]
+            last_artifact, last_score, _ = hits[-1] if hits else (None, None, None)
+        else:
+            if art_type or version or status:
+                artifacts, total = await search_artifacts(
+                    workspace_id=workspace_id, 
+                    art_type=art_type, 
+                    version=version, 
+                    status=status, 
+                    limit=limit,
+                    page=page,
+                    cursor=cursor,
+                    columns=columns
+                )
+            else:
+                artifacts, total = await list_artifacts(workspace_id=workspace_id, page=page, limit=limit, cursor=cursor, columns=columns)
+            items = [item_model.model_validate(artifact) for artifact in artifacts]
+            last_artifact, last_score = (artifacts[-1] if artifacts else None), None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # A full page means there may be more rows after the last item
+    next_cursor = encode_cursor(last_artifact, last_score) if len(items) == limit else None
 
-    return PaginatedResponse(
+    response_model = PaginatedResponse if columns is None else PaginatedSummaryResponse
+    return response_model(
         total=total,
         page=page,
         limit=limit,
-        items=artifacts
+        items=items,
+        next_cursor=next_cursor
     )
 
 # -----------------------------------------------------------------------------
 # saerch artifacts with pagination and optional filters - alias for list_artifacts
 # -----------------------------------------------------------------------------
-@router.get("/search", response_model=PaginatedResponse)
-def api_search_artifacts(
+@router.get("/search", response_model=Union[PaginatedSummaryResponse, PaginatedResponse], response_model_exclude_unset=True)
+async def api_search_artifacts(
     workspace_id: int,
     limit: int = Query(10, gt=0),
     page: int = Query(1, gt=0),
@@ -74,15 +148,56 @@ def api_search_artifacts(
     version: Optional[int] = None,
     status: Optional[str] = None,
     keyword: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_content: bool = True,
+    fields: Optional[str] = None,
+):
+    return await api_list_artifacts(workspace_id, limit, page, art_type, version, status, keyword, cursor, include_content, fields)
+
+# -----------------------------------------------------------------------------
+# Semantic search over the indexed chunks of a workspace; embeds the query only,
+# without an LLM call, for sidebar search (declared before /{artifact_id})
+# -----------------------------------------------------------------------------
+@router.get("/semantic_search", response_model=List[SemanticSearchResult])
+def api_semantic_search(
+    workspace_id: int,
+    q: str = Query(..., min_length=1),
+    k: int = Query(10, ge=1, le=100),
+    art_type: Optional[str] = None,
+    status: Optional[Literal["current", "archived"]] = None,
 ):
-    return api_list_artifacts(workspace_id, limit, page, art_type, version, status, keyword)
+    return semantic_search_artifacts(workspace_id, q, k, art_type, status)
+
+# -----------------------------------------------------------------------------
+# Derived artifacts marked stale by a change of a document they reference
+# -----------------------------------------------------------------------------
+@router.get("/stale", response_model=List[ArtifactSummary])
+async def api_list_stale_artifacts(workspace_id: int):
+    return await list_stale_artifacts(workspace_id)
+
+# -----------------------------------------------------------------------------
+# Hit/miss counters of the current-artifact cache (declared before /{artifact_id})
+# -----------------------------------------------------------------------------
+@router.get("/cache_stats")
+def api_cache_stats():
+    return current_artifact_cache.stats()
+
+# -----------------------------------------------------------------------------
+# Status of all reindexing tasks (declared before /{artifact_id})
+# -----------------------------------------------------------------------------
+@router.get("/reindex_status")
+def get_all_status():
+    """
+    API to get the status of all reindexing tasks.
+    """
+    return get_reindexing_status()
     
 # -----------------------------------------------------------------------------
 # Get artifact by its internal ID
 # -----------------------------------------------------------------------------
 @router.get("/{artifact_id}", response_model=ArtifactResponse)
-def api_get_artifact_by_id(artifact_id: int):
-    artifact = get_artifact_by_internal_id(artifact_id)
+async def api_get_artifact_by_id(artifact_id: int):
+    artifact = await get_artifact_by_internal_id(artifact_id)
     if not artifact:
         raise HTTPException(status_code=404, detail="Artifact not found")
     return artifact
@@ -91,8 +206,8 @@ def api_get_artifact_by_id(artifact_id: int):
 # Get the latest version of an artifact by document_id
 # -----------------------------------------------------------------------------
 @router.get("/current/{document_id}", response_model=ArtifactResponse)
-def api_get_current_artifact(document_id: str):
-    artifact = get_current_artifact(document_id)
+async def api_get_current_artifact(document_id: str):
+    artifact = await get_current_artifact(document_id)
     if not artifact:
         raise HTTPException(status_code=404, detail="Current artifact not found")
     return artifact
@@ -100,34 +215,77 @@ def api_get_current_artifact(document_id: str):
 # -----------------------------------------------------------------------------
 # Get all versions of an artifact by document_id
 # -----------------------------------------------------------------------------
-@router.get("/versions/{document_id}", response_model=List[ArtifactResponse])
-def api_get_artifact_versions(document_id: str):
-    artifacts = get_artifact_versions(document_id)
+@router.get("/versions/{document_id}", response_model=Union[List[ArtifactSummary], List[ArtifactResponse]], response_model_exclude_unset=True)
+async def api_get_artifact_versions(document_id: str, include_content: bool = True, fields: Optional[str] = None):
+    columns = _summary_columns(include_content, fields)
+    artifacts = await get_artifact_versions(document_id, columns=columns)
     if not artifacts:
         raise HTTPException(status_code=404, detail="No artifact versions found")
-    return artifacts
+    item_model = ArtifactResponse if columns is None else ArtifactSummary
+    return [item_model.model_validate(artifact) for artifact in artifacts]
+
+# -----------------------------------------------------------------------------
+# Reference graph: documents a document depends on / that depend on it
+# -----------------------------------------------------------------------------
+@router.get("/{document_id}/dependencies", response_model=List[ReferenceNode])
+async def api_get_artifact_dependencies(
+    document_id: str, max_depth: int = Query(REFERENCE_DEPTH, ge=1, le=MAX_REFERENCE_DEPTH)
+):
+    return await get_artifact_dependencies(document_id, max_depth=max_depth)
+
+@router.get("/{document_id}/dependents", response_model=List[ReferenceNode])
+async def api_get_artifact_dependents(
+    document_id: str, max_depth: int = Query(REFERENCE_DEPTH, ge=1, le=MAX_REFERENCE_DEPTH)
+):
+    return await get_artifact_dependents(document_id, max_depth=max_depth)
+
+@router.get("/{document_id}/impact", response_model=List[ReferenceNode])
+async def api_get_artifact_impact(document_id: str):
+    # Every document affected by a change of document_id (precomputed, no graph walk)
+    return await get_artifact_impact(document_id)
 
 # -----------------------------------------------------------------------------
 # Create a new artifact (initial version)
 # -----------------------------------------------------------------------------
 @router.post("/", response_model=ArtifactResponse,  status_code=status.HTTP_201_CREATED)
-def api_create_artifact(artifact_data: ArtifactCreate):
-    artifact = create_new_artifact(
-        workspace_id=artifact_data.workspace_id,
-        document_id=artifact_data.document_id,
-        title=artifact_data.title,
-        content=artifact_data.content,
-        art_type=artifact_data.art_type,
-        references=artifact_data.references
-    )
+async def api_create_artifact(artifact_data: ArtifactCreate):
+    try:
+        artifact = await create_new_artifact(
+            workspace_id=artifact_data.workspace_id,
+            document_id=artifact_data.document_id,
+            title=artifact_data.title,
+            content=artifact_data.content,
+            art_type=artifact_data.art_type,
+            references=artifact_data.references
+        )
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Document already exists")
     return artifact
 
+# -----------------------------------------------------------------------------
+# Apply many create / update / delete operations in one transaction
+# -----------------------------------------------------------------------------
+@router.post("/batch", response_model=BatchResponse)
+async def api_batch_artifacts(batch: BatchRequest):
+    for index, operation in enumerate(batch.operations):
+        if operation.op == "create" and (operation.workspace_id is None or operation.title is None or operation.content is None):
+            raise HTTPException(status_code=422, detail=f"Operation {index}: create needs workspace_id, title and content")
+    try:
+        results = await apply_artifact_batch([operation.model_dump() for operation in batch.operations])
+    except (IntegrityError, OperationalError) as e:
+        # The session was rolled back; conflicts (a version clash, a locked database) are the client's to retry
+        if not is_write_conflict(e):
+            raise
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Batch rolled back: {e.orig}")
+    failed = sum(1 for result in results if result["status"] == "error")
+    return BatchResponse(succeeded=len(results) - failed, failed=failed, results=results)
+
 # -----------------------------------------------------------------------------
 # Update artifact version: Archive current version and create a new version
 # -----------------------------------------------------------------------------
 @router.put("/{document_id}/update", response_model=ArtifactResponse, status_code=status.HTTP_200_OK)
-def api_update_artifact_version(document_id: str, update_data: ArtifactUpdate):
-    artifact = update_artifact_version(
+async def api_update_artifact_version(document_id: str, update_data: ArtifactUpdate):
+    artifact = await update_artifact_version(
         document_id,
         update_data.title,
         update_data.content,
@@ -141,8 +299,8 @@ def api_update_artifact_version(document_id: str, update_data: ArtifactUpdate):
 # Set artifact meta data : without archive current version and and create a new version
 # -----------------------------------------------------------------------------
 @router.put("/{document_id}/setmeta", response_model=ArtifactResponse, status_code=status.HTTP_200_OK)
-def api_set_artifact_meta(document_id: str, update_data: ArtifactUpdate):
-    artifact = set_artifact_meta(
+async def api_set_artifact_meta(document_id: str, update_data: ArtifactUpdate):
+    artifact = await set_artifact_meta(
         document_id,
         update_data.title,
         update_data.content,
@@ -156,18 +314,27 @@ def api_set_artifact_meta(document_id: str, update_data: ArtifactUpdate):
 # Rollback artifact to a previous version
 # -----------------------------------------------------------------------------
 @router.post("/{document_id}/rollback", response_model=ArtifactResponse)
-def api_rollback_artifact_version(document_id: str, rollback_data: RollbackRequest):
+async def api_rollback_artifact_version(document_id: str, rollback_data: RollbackRequest):
     try:
-        artifact = rollback_artifact_version(document_id, rollback_data.target_version)
+        artifact = await rollback_artifact_version(document_id, rollback_data.target_version)
         return artifact
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 # -----------------------------------------------------------------------------
+# Tag a version (tagged versions are exempt from retention pruning)
+# -----------------------------------------------------------------------------
+@router.put("/{document_id}/versions/{version}/tag", response_model=ArtifactResponse)
+async def api_tag_artifact_version(document_id: str, version: int, tag_data: TagRequest):
+    try:
+        return await tag_artifact_version(document_id, version, tag_data.tag)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+# -----------------------------------------------------------------------------
 # Delete an artifact by its internal ID
 # -----------------------------------------------------------------------------
 @router.delete("/{artifact_id}", status_code=status.HTTP_204_NO_CONTENT)
-def api_delete_artifact_by_id(artifact_id: int):
-    success = delete_artifact_by_id(artifact_id)
+async def api_delete_artifact_by_id(artifact_id: int):
+    success = await delete_artifact_by_id(artifact_id)
     if not success:
         raise HTTPException(status_code=404, detail="Artifact not found")
     return {"message": "Artifact deleted successfully"}
@@ -176,8 +343,8 @@ def api_delete_artifact_by_id(artifact_id: int):
 # Delete artifacts by document_id (optionally specify a version)
 # -----------------------------------------------------------------------------
 @router.delete("/document/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
-def api_delete_artifacts_by_document(document_id: str, version: Optional[int] = Query(None)):
-    count = delete_artifacts_by_document(document_id, version=version)
+async def api_delete_artifacts_by_document(document_id: str, version: Optional[int] = Query(None)):
+    count = await delete_artifacts_by_document(document_id, version=version)
     if count == 0:
         raise HTTPException(status_code=404, detail="No artifacts found for deletion")
     return {"message": f"Deleted {count} artifact(s)"}
@@ -212,22 +379,26 @@ async def api_upload_artifact(workspace_id: int, file: UploadFile = File(...)):
     document_id = file.filename
 
     # Create the artifact using the workspace_id
-    artifact = create_new_artifact(workspace_id, document_id, file.filename, text)
+    try:
+        artifact = await create_new_artifact(workspace_id, document_id, file.filename, text)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Document already exists")
     return artifact
 
 # for vector db store management
 @router.post("/artifacts/clear_index")
-async def clear_vector_store(data: ClearIndexRequest):
+def clear_vector_store(data: ClearIndexRequest):
     """
-    API to clear the vector store index (ChromaDB).
+    API to clear the vectors of a workspace from the vector store index (ChromaDB).
+    Returns the number of vectors deleted.
     """
     result = clear_index(data.workspace_id)
     return result
 
 
 @router.post("/", response_model=ArtifactResponse,  status_code=status.HTTP_201_CREATED)
-def api_create_artifact(artifact_data: ArtifactCreate):
-    artifact = create_new_artifact(
+async def api_create_artifact(artifact_data: ArtifactCreate):
+    artifact = await create_new_artifact(
         workspace_id=artifact_data.workspace_id,
         document_id=artifact_data.document_id,
         title=artifact_data.title,
@@ -241,10 +412,12 @@ def api_create_artifact(artifact_data: ArtifactCreate):
 def reindex_all(data: ReIndexRequest):
     """
     API to reindex all documents in the vector store. Returns task ID for status tracking.
+    The reindex runs as a background job; poll /reindex_status/{task_id} for progress.
+    Only new or changed artifacts are embedded unless `force` is set.
     """
     try:
-        result = reindex_all_documents(data.workspace_id)
-        return {"message": f"indexing.."}
+        result = reindex_all_documents(data.workspace_id, force=data.force)
+        return {"message": f"indexing..", **result}
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail="Reindex Failed.")
@@ -259,9 +432,30 @@ def get_status(task_id: str):
         raise HTTPException(status_code=404, detail="Task ID not found.")
     return result
 
-@router.get("/reindex_status")
-def get_all_status():
+@router.post("/reindex_cancel/{task_id}")
+def cancel_status(task_id: str):
     """
-    API to get the status of all reindexing tasks.
+    API to cancel a reindexing task (a running one stops after the current artifact).
+    """
+    result = cancel_reindexing(task_id)
+    if result == {"status": "not found"}:
+        raise HTTPException(status_code=404, detail="Task ID not found.")
+    return result
+
+@router.post("/regenerate_stale", status_code=status.HTTP_202_ACCEPTED)
+def regenerate_stale(data: RegenerateRequest):
+    """
+    API to regenerate the stale derived artifacts of a workspace in the background.
+    Returns task ID for status tracking.
+    """
+    return start_regeneration(data.workspace_id)
+
+@router.get("/regenerate_status/{task_id}")
+def get_regenerate_status(task_id: str):
     """
-    return get_reindexing_status()
\ No newline at end of file
+    API to get the progress of a regeneration run by task ID.
+    """
+    result = get_regeneration_status(task_id)
+    if result == {"status": "not found"}:
+        raise HTTPException(status_code=404, detail="Task ID not found.")
+    return result
@@ -0,0 +1,30 @@
+# backend/routers/job.py
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from backend.services.jobs import get_job_status, get_jobs_status, request_cancel
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/")
+def list_jobs_route(kind: Optional[str] = None, limit: int = 100):
+    """API endpoint to list the most recent background jobs, optionally of one kind."""
+    return get_jobs_status(kind=kind, limit=limit)
+
+
+@router.get("/{job_id}")
+def get_job_route(job_id: str):
+    """API endpoint to get the status and progress of a background job."""
+    result = get_job_status(job_id)
+    if result == {"status": "not found"}:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return result
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job_route(job_id: str):
+    """API endpoint to cancel a queued job or stop a running one at its next item."""
+    result = request_cancel(job_id)
+    if result == {"status": "not found"}:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return result
@@ -6,45 +6,55 @@ from backend.schemas.workspace import (
     WorkspaceResponse,
     PaginatedResponse,
 )
-from backend.crud.workspace import (
+from backend.crud.workspace_async import (
     create_workspace,
     get_workspace,
     list_workspaces,
     update_workspace,
     delete_workspace,
 )
+from backend.crud.maintenance import start_compaction, get_compaction_status
 
 router = APIRouter(prefix="/workspaces", tags=["workspaces"])
 
 
 @router.post("/", response_model=WorkspaceResponse, status_code=status.HTTP_201_CREATED)
-def create_workspace_route(workspace_data: WorkspaceCreate):
+async def create_workspace_route(workspace_data: WorkspaceCreate):
     """API endpoint to create a new workspace."""
-    workspace = create_workspace(title=workspace_data.title, description=workspace_data.description)
+    workspace = await create_workspace(
+        title=workspace_data.title,
+        description=workspace_data.description,
+        retention_keep_last=workspace_data.retention_keep_last,
+        retention_max_age_days=workspace_data.retention_max_age_days,
+    )
     return workspace
 
 
 @router.get("/{workspace_id}", response_model=WorkspaceResponse)
-def get_workspace_route(workspace_id: int):
+async def get_workspace_route(workspace_id: int):
     """API endpoint to retrieve a workspace by ID."""
-    workspace = get_workspace(workspace_id)
+    workspace = await get_workspace(workspace_id)
     if not workspace:
         raise HTTPException(status_code=404, detail="Workspace not found")
     return workspace
 
 
 @router.get("/", response_model=PaginatedResponse)
-def list_workspaces_route(page: int = 1, limit: int = 10):
+async def list_workspaces_route(page: int = 1, limit: int = 10):
     """API endpoint to list all workspaces with pagination."""
-    workspaces, total = list_workspaces(limit=limit, page=page)
+    workspaces, total = await list_workspaces(limit=limit, page=page)
     return PaginatedResponse(total=total, page=page, limit=limit, items=workspaces)
 
 
 @router.put("/{workspace_id}", response_model=WorkspaceResponse)
-def update_workspace_route(workspace_id: int, workspace_data: WorkspaceUpdate):
+async def update_workspace_route(workspace_id: int, workspace_data: WorkspaceUpdate):
     """API endpoint to update a workspace."""
-    workspace = update_workspace(
-        workspace_id=workspace_id, title=workspace_data.title, description=workspace_data.description
+    workspace = await update_workspace(
+        workspace_id=workspace_id,
+        title=workspace_data.title,
+        description=workspace_data.description,
+        retention_keep_last=workspace_data.retention_keep_last,
+        retention_max_age_days=workspace_data.retention_max_age_days,
     )
     if not workspace:
         raise HTTPException(status_code=404, detail="Workspace not found")
@@ -52,8 +62,28 @@ def update_workspace_route(workspace_id: int, workspace_data: WorkspaceUpdate):
 
 
 @router.delete("/{workspace_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_workspace_route(workspace_id: int):
+async def delete_workspace_route(workspace_id: int):
     """API endpoint to delete a workspace."""
-    if not delete_workspace(workspace_id):
+    if not await delete_workspace(workspace_id):
         raise HTTPException(status_code=404, detail="Workspace not found")
     return {"message": "Workspace deleted successfully"}
+
+
+@router.post("/{workspace_id}/compact", status_code=status.HTTP_202_ACCEPTED)
+async def compact_workspace_route(workspace_id: int):
+    """
+    API endpoint to start a compaction run: prunes versions by the workspace's
+    retention rules, deletes orphaned blobs and vacuums the database.
+    """
+    if not await get_workspace(workspace_id):
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    return start_compaction(workspace_id)
+
+
+@router.get("/compaction_status/{task_id}")
+def compaction_status_route(task_id: str):
+    """API endpoint to get the status and report of a compaction run."""
+    result = get_compaction_status(task_id)
+    if result == {"status": "not found"}:
+        raise HTTPException(status_code=404, detail="Task ID not found.")
+    return result
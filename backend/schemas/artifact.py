@@ -1,6 +1,6 @@
 # backend/schemas/artifact.py
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 
 
@@ -22,11 +22,51 @@ class ArtifactUpdate(BaseModel):
     references: Optional[List[int]] = None
 
 
+#  Schema for one operation of a batch request (POST /artifacts/batch)
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    document_id: str
+    workspace_id: Optional[int] = None  # required for "create"
+    title: Optional[str] = None
+    content: Optional[str] = None
+    art_type: Optional[str] = None
+    references: Optional[List[int]] = None
+    version: Optional[int] = None  # "delete" only: delete just this version
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+
+class BatchOperationResult(BaseModel):
+    index: int
+    op: str
+    document_id: str
+    status: str  # "ok" or "error"
+    id: Optional[int] = None  # created / new version artifact id
+    version: Optional[int] = None
+    deleted: Optional[int] = None  # number of versions removed by "delete"
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchOperationResult]
+
+
 class RollbackRequest(BaseModel):
     target_version: int
 
+class TagRequest(BaseModel):
+    tag: Optional[str] = None  # None removes the tag
+
 class ReIndexRequest(BaseModel):
     workspace_id: int
+    force: bool = False  # clear the workspace's vectors and embed every artifact again
+
+class RegenerateRequest(BaseModel):
+    workspace_id: int
 
 class ClearIndexRequest(BaseModel):
     workspace_id: int
@@ -38,6 +78,8 @@ class ArtifactResponse(BaseModel):
     art_type: str
     version: int
     status: str
+    tag: Optional[str] = None
+    stale_since: Optional[datetime] = None  # a referenced document changed since this version
     created_at: datetime
     updated_at: Optional[datetime] = None
     indexed_at: Optional[datetime] = None
@@ -46,14 +88,79 @@ class ArtifactResponse(BaseModel):
     document_id: str
     parent_version: Optional[int] = None
     references: Optional[List[int]] = None  # List of dependent artifact IDs
+    score: Optional[float] = None  # keyword search relevance (higher is better)
+    snippet: Optional[str] = None  # keyword search excerpt, matches wrapped in **
 
     class Config:
         from_attributes = True  # Allows direct conversion from ORM models
 
 
+#  Slim schema for table / sidebar views: no content, and with `fields=` only the
+#  requested fields are loaded and returned (id and updated_at always are)
+class ArtifactSummary(BaseModel):
+    id: int
+    document_id: Optional[str] = None
+    workspace_id: Optional[int] = None
+    title: Optional[str] = None
+    art_type: Optional[str] = None
+    version: Optional[int] = None
+    parent_version: Optional[int] = None
+    status: Optional[str] = None
+    tag: Optional[str] = None
+    stale_since: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    indexed_at: Optional[datetime] = None
+    references: Optional[List[int]] = None
+    score: Optional[float] = None
+    snippet: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+# Fields a client may request with `fields=` (the stored columns of ArtifactSummary)
+SUMMARY_FIELDS = [name for name in ArtifactSummary.model_fields if name not in ("score", "snippet")]
+
+
+#  One document of a dependency / dependents walk or of an impact set (current
+#  version fields are None when the document has no current version)
+class ReferenceNode(BaseModel):
+    document_id: str
+    depth: Optional[int] = None  # reference hops from the start document (walks only)
+    id: Optional[int] = None
+    workspace_id: Optional[int] = None
+    title: Optional[str] = None
+    art_type: Optional[str] = None
+    version: Optional[int] = None
+
+
+#  One chunk returned by semantic search, with the artifact version it was indexed from
+class SemanticSearchResult(BaseModel):
+    document_id: str
+    artifact_id: Optional[int] = None  # internal id of the indexed version
+    version: Optional[int] = None
+    status: str  # "current", or "archived" when the indexed version was replaced since
+    title: Optional[str] = None
+    art_type: Optional[str] = None
+    chunk_id: str
+    chunk: Optional[int] = None  # position of the chunk in the artifact
+    text: str
+    score: Optional[float] = None  # similarity to the query (higher is better)
+
+
 # ✅ Pagination response schema (for listing/search results)
 class PaginatedResponse(BaseModel):
     total: int
     page: int
     limit: int
-    items: List[ArtifactResponse]
\ No newline at end of file
+    items: List[ArtifactResponse]
+    next_cursor: Optional[str] = None  # pass back as `cursor` to fetch the next page
+
+
+class PaginatedSummaryResponse(BaseModel):
+    total: int
+    page: int
+    limit: int
+    items: List[ArtifactSummary]
+    next_cursor: Optional[str] = None
\ No newline at end of file
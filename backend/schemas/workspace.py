@@ -1,5 +1,5 @@
 # backend/schemas/workspace.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 import datetime
 
@@ -7,17 +7,24 @@ import datetime
 class WorkspaceCreate(BaseModel):
     title: str
     description: Optional[str] = None
+    retention_keep_last: Optional[int] = Field(None, gt=0)
+    retention_max_age_days: Optional[int] = Field(None, gt=0)
 
 
 class WorkspaceUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
+    # 0 removes the rule
+    retention_keep_last: Optional[int] = Field(None, ge=0)
+    retention_max_age_days: Optional[int] = Field(None, ge=0)
 
 
 class WorkspaceResponse(BaseModel):
     id: int
     title: str
     description: Optional[str]
+    retention_keep_last: Optional[int] = None
+    retention_max_age_days: Optional[int] = None
     created_at: datetime.datetime
     updated_at: datetime.datetime
 
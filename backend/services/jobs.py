@@ -0,0 +1,177 @@
+# backend/services/jobs.py
+# Background job queue backed by the job table (backend/models/job.py).
+#
+# Modules register a handler per job kind with @register_job("kind"). enqueue_job()
+# persists a job and returns its id at once; worker threads claim queued jobs
+# oldest first and run handler(job, **params). Handlers report progress with
+# job.progress(done, total, **result), which also raises JobCancelled once a
+# cancel was requested, so long loops stop at the next item.
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from backend.config import settings
+from backend.crud.job import (
+    create_job,
+    get_job,
+    list_jobs,
+    claim_next_job,
+    update_job_progress,
+    finish_job,
+    cancel_job,
+    requeue_interrupted_jobs,
+)
+from backend.models.job import Job
+
+# kind -> handler(job: JobContext, **params) returning the result dict (or None)
+handlers: Dict[str, Callable] = {}
+
+_workers: List[threading.Thread] = []
+_workers_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+class JobCancelled(Exception):
+    """Raised by JobContext.progress() when the job was cancelled."""
+
+
+class JobContext:
+    """Handle passed to a running handler to report progress and results."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.done = 0
+        self.total: Optional[int] = None
+        self.result: Dict = {}
+        self._last_write = 0.0
+
+    def progress(self, done: int, total: Optional[int] = None, **result) -> None:
+        """
+        Records `done` of `total` items and merges `result` into the job result.
+        Written at most every JOB_PROGRESS_INTERVAL seconds (and when done == total).
+        Raises JobCancelled when a cancel was requested.
+        """
+        self.done = done
+        if total is not None:
+            self.total = total
+        self.result.update(result)
+        now = time.monotonic()
+        if now - self._last_write < settings.JOB_PROGRESS_INTERVAL and done != self.total:
+            return
+        self._last_write = now
+        if update_job_progress(self.job_id, self.done, self.total, self.result):
+            raise JobCancelled()
+
+
+def register_job(kind: str):
+    """Decorator registering the handler that runs jobs of `kind`."""
+    def register(function):
+        handlers[kind] = function
+        return function
+    return register
+
+
+def run_job(job: Job) -> Job:
+    """Runs a claimed job in the current thread and records its outcome."""
+    context = JobContext(job.id)
+    try:
+        result = handlers[job.kind](context, **(job.params or {}))
+    except JobCancelled:
+        return finish_job(job.id, "cancelled", context.result, done=context.done, total=context.total)
+    except Exception as e:
+        return finish_job(job.id, "failed", context.result, str(e), done=context.done, total=context.total)
+    result = {**context.result, **(result or {})}
+    return finish_job(job.id, "completed", result, done=context.done, total=context.total)
+
+
+def _work() -> None:
+    while True:
+        try:
+            job = claim_next_job(list(handlers))
+        except Exception as e:
+            # e.g. the database is busy or being recreated; try again at the next poll
+            print(f"job queue: {e}")
+            job = None
+        if job is None:
+            _wakeup.wait(settings.JOB_POLL_INTERVAL)
+            _wakeup.clear()
+            continue
+        try:
+            run_job(job)
+        except Exception as e:
+            # e.g. the job row was deleted while running; keep the worker alive
+            print(f"job {job.id} ({job.kind}): {e}")
+
+
+def start_workers(count: int = settings.JOB_WORKERS) -> None:
+    """
+    Starts the worker threads once per process. Jobs left in-progress by a
+    previous run of the app are queued again first (the app runs one process).
+    """
+    with _workers_lock:
+        if _workers:
+            return
+        requeue_interrupted_jobs()
+        for index in range(count):
+            worker = threading.Thread(target=_work, name=f"job-worker-{index}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+
+def enqueue_job(kind: str, **params) -> str:
+    """Queues a job of a registered kind and returns its id."""
+    if kind not in handlers:
+        raise ValueError(f"Unknown job kind {kind}.")
+    job = create_job(kind, params)
+    start_workers()
+    _wakeup.set()
+    return job.id
+
+
+def job_status(job: Optional[Job]) -> Dict:
+    """Status dict of a job for the API: its fields with the handler's result on top."""
+    if job is None:
+        return {"status": "not found"}
+    return {
+        "task_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params,
+        "done": job.done,
+        "total": job.total,
+        "progress": job.done / job.total if job.total else None,
+        "cancel_requested": job.cancel_requested,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        **(job.result or {}),
+    }
+
+
+def get_job_status(job_id: str, kind: Optional[str] = None) -> Dict:
+    """Status of one job (of `kind`, if given)."""
+    job = get_job(job_id)
+    if job is not None and kind is not None and job.kind != kind:
+        job = None
+    return job_status(job)
+
+
+def get_jobs_status(kind: Optional[str] = None, limit: int = 100) -> Dict[str, Dict]:
+    """Status of the most recent jobs (of `kind`, if given), by id."""
+    return {job.id: job_status(job) for job in list_jobs(kind, limit)}
+
+
+def request_cancel(job_id: str) -> Dict:
+    """Cancels a queued job or asks a running one to stop."""
+    return job_status(cancel_job(job_id))
+
+
+def wait_for_job(job_id: str, timeout: float = 60.0) -> Dict:
+    """Blocks until the job has finished (or `timeout` seconds passed); returns its status."""
+    deadline = time.monotonic() + timeout
+    while True:
+        status = job_status(get_job(job_id))
+        if status["status"] not in ("queued", "in-progress") or time.monotonic() > deadline:
+            return status
+        time.sleep(0.05)
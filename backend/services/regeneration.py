@@ -0,0 +1,148 @@
+# backend/services/regeneration.py
+# Incremental regeneration of derived artifacts (screen lists, DB table lists,
+# ER diagrams, ...). A derived artifact references its source documents; when a
+# source gets a new version the CRUD layer marks every artifact that depends on
+# it stale (Artifact.stale_since). Only those are regenerated, sources before
+# the artifacts derived from them, as a background job (backend/services/jobs.py).
+from typing import Callable, Dict, List, Optional
+
+from sqlmodel import select
+
+from backend.config import session_scope
+from backend.crud.artifact import get_current_artifacts, list_stale_artifacts, update_artifact_version
+from backend.models.artifact import Artifact, ArtifactReference
+from backend.rag.llm import llm_handler
+from backend.services.jobs import JobContext, register_job, enqueue_job, get_job_status
+
+# art_type -> generator(artifact, sources) returning the new content
+generators: Dict[str, Callable[[Artifact, List[Artifact]], str]] = {}
+
+
+def register_generator(art_type: str):
+    """Decorator registering the function that regenerates artifacts of `art_type`."""
+    def register(function):
+        generators[art_type] = function
+        return function
+    return register
+
+
+def _sources_text(sources: List[Artifact]) -> str:
+    return "\n\n".join(f"# {source.title}\n{source.content}" for source in sources)
+
+
+@register_generator("screen_list")
+def generate_screen_list(artifact: Artifact, sources: List[Artifact]) -> str:
+    # Same output as components/screen_list_generator.py, from the referenced documents
+    return llm_handler.generate_text(
+        f"{_sources_text(sources)}\n\n"
+        "Generate a list of screens based on the documents above. "
+        "Return a JSON array (list) of JSON objects (dictionaries). Each JSON object should represent a screen and contain the following keys: "
+        "No, Code, Module, Screen_Name, Description. Make the 'Code' column unique. Ensure the JSON is valid and parsable. Only return JSON, without other text."
+    )
+
+
+@register_generator("db_table_list")
+def generate_db_table_list(artifact: Artifact, sources: List[Artifact]) -> str:
+    # Same output as the table list step of components/db_info_generator.py
+    return llm_handler.generate_text(
+        f"{_sources_text(sources)}\n\n"
+        "Generate the list of database tables of the system described above. "
+        "Return a JSON array of objects with the keys table_name, table_description and columns; each column has "
+        "column_name, data_type (integer, varchar, date, decimal or boolean), is_primary_key, is_foreign_key and, for "
+        "foreign keys, references_table and references_column. Use snake_case, singular table names and <table_name>_id "
+        "primary keys. Only return the complete JSON array, without other text."
+    )
+
+
+@register_generator("er_diagram")
+def generate_er_diagram(artifact: Artifact, sources: List[Artifact]) -> str:
+    # Same output as the ER diagram step of components/db_info_generator.py
+    return llm_handler.generate_text(
+        f"{_sources_text(sources)}\n\n"
+        "Generate a Mermaid erDiagram for the database tables above. Represent relationships between tables using "
+        "Mermaid's relationship syntax and label them; for foreign keys include FK references <TABLE>.<COLUMN>. "
+        "Only return the Mermaid code, without other text."
+    )
+
+
+def regeneration_order(artifacts: List[Artifact], edges: Dict[str, List[str]]) -> List[Artifact]:
+    """
+    Orders stale artifacts so each comes after the stale artifacts it references
+    (`edges`: document_id -> referenced document_ids). Members of a reference
+    cycle keep their input order after everything else.
+    """
+    by_document = {artifact.document_id: artifact for artifact in artifacts}
+    waiting_on = {
+        document_id: {target for target in edges.get(document_id, []) if target in by_document and target != document_id}
+        for document_id in by_document
+    }
+    ordered = []
+    ready = [document_id for document_id in by_document if not waiting_on[document_id]]
+    while ready:
+        document_id = ready.pop(0)
+        ordered.append(by_document[document_id])
+        del waiting_on[document_id]
+        for other, targets in waiting_on.items():
+            if document_id in targets:
+                targets.discard(document_id)
+                if not targets:
+                    ready.append(other)
+    ordered.extend(by_document[document_id] for document_id in by_document if document_id in waiting_on)
+    return ordered
+
+
+def _references_of(document_ids: List[str]) -> Dict[str, List[str]]:
+    edges: Dict[str, List[str]] = {}
+    with session_scope() as session:
+        for source, target in session.exec(
+            select(ArtifactReference.source_document_id, ArtifactReference.target_document_id)
+            .where(ArtifactReference.source_document_id.in_(document_ids))
+        ).all():
+            edges.setdefault(source, []).append(target)
+    return edges
+
+
+def regenerate_stale_artifacts(workspace_id: int, job: Optional[JobContext] = None) -> Dict:
+    """
+    Regenerates the stale artifacts of the workspace that have a generator, in
+    dependency order, each as a new version (which clears its stale mark).
+    Progress is reported to `job` if given. Returns the run's counters.
+    """
+    stale = [artifact for artifact in list_stale_artifacts(workspace_id) if artifact.art_type in generators]
+    edges = _references_of([artifact.document_id for artifact in stale])
+    result = {"regenerated": 0, "failed": 0, "errors": {}}
+    if job:
+        job.progress(0, len(stale), **result)
+
+    for count, artifact in enumerate(regeneration_order(stale, edges), start=1):
+        try:
+            # Sources are read now, so they include the ones regenerated earlier in this run
+            sources = get_current_artifacts(edges.get(artifact.document_id, []))
+            content = generators[artifact.art_type](artifact, sources)
+            update_artifact_version(artifact.document_id, artifact.title, content, artifact.art_type)
+            result["regenerated"] += 1
+        except Exception as e:
+            result["failed"] += 1
+            result["errors"][artifact.document_id] = str(e)
+        if job:
+            job.progress(count, **result)
+    return {"total": len(stale), **result}
+
+
+@register_job("regeneration")
+def _regeneration_job(job: JobContext, workspace_id: int) -> Dict:
+    return regenerate_stale_artifacts(workspace_id, job)
+
+
+def start_regeneration(workspace_id: int) -> Dict:
+    """
+    Queues regenerate_stale_artifacts() as a background job.
+    Returns a task ID for tracking the status with get_regeneration_status().
+    """
+    task_id = enqueue_job("regeneration", workspace_id=workspace_id)
+    return {"task_id": task_id, "status": "regeneration started"}
+
+
+def get_regeneration_status(task_id: str) -> Dict:
+    """Fetches the progress of a regeneration run."""
+    return get_job_status(task_id, kind="regeneration")
@@ -4,9 +4,11 @@ from fastapi import status, HTTPException
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
 from backend.app import app
-from backend.models.artifact import Artifact
+from backend.models.artifact import Artifact, ArtifactHistory, ArtifactImpact
+from backend.crud.cache import current_artifact_cache
 from backend.config import db_engine
 from backend.config import init_db
+from backend.rag.index import chroma_client, collection_name
 
 init_db()
 
@@ -17,7 +19,10 @@ client = TestClient(app)
 def clear_db():
     with Session(db_engine) as session:
         session.exec(delete(Artifact))
+        session.exec(delete(ArtifactHistory))
+        session.exec(delete(ArtifactImpact))
         session.commit()
+    current_artifact_cache.clear()
 
 # Helper function to create a workspace first
 def create_workspace():
@@ -66,6 +71,57 @@ def test_list_artifacts():
     assert len(data) >= 2
 
 
+def test_list_artifacts_with_cursor():
+    workspace_id = create_workspace()  # Create workspace and get workspace_id
+    for i in range(3):
+        response = client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": f"doc_page_{i}", "title": f"Page {i}", "content": f"Content {i}"})
+        assert response.status_code == 201
+
+    response = client.get("/artifacts/", params={"workspace_id": workspace_id, "limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert len(data["items"]) == 2
+    assert data["next_cursor"]
+
+    response = client.get("/artifacts/", params={"workspace_id": workspace_id, "limit": 2, "cursor": data["next_cursor"]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert len(data["items"]) == 1
+    assert data["next_cursor"] is None
+
+    response = client.get("/artifacts/", params={"workspace_id": workspace_id, "cursor": "bogus"})
+    assert response.status_code == 400
+
+
+def test_list_artifacts_without_content():
+    workspace_id = create_workspace()  # Create workspace and get workspace_id
+    client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc_slim", "title": "Slim", "content": "Big content"})
+
+    response = client.get("/artifacts/", params={"workspace_id": workspace_id, "include_content": False})
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert "content" not in item
+    assert item["title"] == "Slim"
+    assert item["version"] == 1
+
+    response = client.get("/artifacts/", params={"workspace_id": workspace_id, "fields": "title,art_type"})
+    item = response.json()["items"][0]
+    assert set(item) == {"id", "updated_at", "title", "art_type"}
+
+    response = client.get("/artifacts/versions/doc_slim", params={"fields": "version"})
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"id", "updated_at", "version"}
+
+    response = client.get("/artifacts/", params={"workspace_id": workspace_id, "fields": "content"})
+    assert response.status_code == 400
+
+    # Full items are unchanged
+    response = client.get("/artifacts/", params={"workspace_id": workspace_id})
+    assert response.json()["items"][0]["content"] == "Big content"
+
+
 def test_get_artifact_by_id():
     workspace_id = create_workspace()  # Create workspace and get workspace_id
     response = client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc4", "title": "Title4", "content": "Content4"})
@@ -141,6 +197,79 @@ def test_search_artifacts():
     # Assert that only one result is returned
     assert len(data["items"]) == 1  # Make sure the result is correct, based on 'items'
     assert data["items"][0]["title"] == "Alpha Title"
+    assert data["items"][0]["score"] is not None
+    assert "**Alpha**" in data["items"][0]["snippet"]
+
+def test_search_artifacts_paginated():
+    workspace_id = create_workspace()  # Create workspace and get workspace_id
+    for i in range(3):
+        response = client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": f"doc_kw_{i}", "title": f"Gamma {i}", "content": f"Content {i}"})
+        assert response.status_code == 201
+
+    response = client.get("/artifacts/search", params={"workspace_id": workspace_id, "keyword": "Gamma", "limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert len(data["items"]) == 2
+
+    response = client.get("/artifacts/search", params={"workspace_id": workspace_id, "keyword": "Gamma", "limit": 2, "cursor": data["next_cursor"]})
+    data = response.json()
+    assert data["total"] == 3
+    assert len(data["items"]) == 1
+
+def test_reindex_status_of_all_tasks():
+    workspace_id = create_workspace()  # Create workspace and get workspace_id
+    # Nothing to embed in an empty workspace
+    response = client.post("/artifacts/reindex_all", json={"workspace_id": workspace_id})
+    assert response.status_code == 201
+    task_id = response.json()["task_id"]
+
+    response = client.get("/artifacts/reindex_status")
+    assert response.status_code == 200
+    assert task_id in response.json()
+
+def test_batch_artifacts():
+    workspace_id = create_workspace()  # Create workspace and get workspace_id
+    payload = {"operations": [
+        {"op": "create", "document_id": "batch_a", "workspace_id": workspace_id, "title": "A", "content": "Content A"},
+        {"op": "create", "document_id": "batch_b", "workspace_id": workspace_id, "title": "B", "content": "Content B"},
+        {"op": "update", "document_id": "batch_a", "content": "Content A2"},
+        {"op": "delete", "document_id": "batch_unknown"},
+    ]}
+    response = client.post("/artifacts/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["succeeded"] == 3
+    assert data["failed"] == 1
+    assert data["results"][2]["version"] == 2
+    assert data["results"][3]["status"] == "error"
+
+    response = client.get("/artifacts/current/batch_a")
+    assert response.json()["content"] == "Content A2"
+
+    # create needs the artifact fields
+    response = client.post("/artifacts/batch", json={"operations": [{"op": "create", "document_id": "batch_c"}]})
+    assert response.status_code == 422
+
+def test_batch_artifacts_conflict():
+    workspace_id = create_workspace()  # Create workspace and get workspace_id
+    created = client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "batch_x", "title": "X", "content": "Content X"}).json()
+    # A stray archived version 2 makes the update in the batch hit the (document_id, version) unique check
+    with Session(db_engine) as session:
+        row = session.get(Artifact, created["id"])
+        session.add(ArtifactHistory(**{
+            **{name: getattr(row, name) for name in Artifact.__table__.columns.keys()},
+            "id": created["id"] + 1_000_000, "version": 2, "status": "archived",
+        }))
+        session.commit()
+
+    response = client.post("/artifacts/batch", json={"operations": [
+        {"op": "create", "document_id": "batch_y", "workspace_id": workspace_id, "title": "Y", "content": "Content Y"},
+        {"op": "update", "document_id": "batch_x", "title": "X2"},
+    ]})
+    assert response.status_code == 409
+    assert response.json()["detail"].startswith("Batch rolled back")
+    assert client.get("/artifacts/current/batch_y").status_code == 404
 
 def test_update_artifact_version():
     workspace_id = create_workspace()  # Create workspace and get workspace_id
@@ -276,3 +405,86 @@ def test_set_artifact_meta_api():
     assert fetched_data["title"] == update_payload["title"]
     assert fetched_data["content"] == update_payload["content"]
     assert fetched_data["version"] == initial_version
+
+def test_current_artifact_cache_stats():
+    workspace_id = create_workspace()
+    client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc_cache", "title": "T", "content": "C"})
+    client.get("/artifacts/current/doc_cache")
+    client.get("/artifacts/current/doc_cache")
+    response = client.get("/artifacts/cache_stats")
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["hits"] >= 1
+    assert stats["misses"] >= 1
+    assert stats["size"] >= 1
+
+def test_tag_artifact_version():
+    workspace_id = create_workspace()
+    client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc_tag", "title": "T", "content": "v1"})
+    client.put("/artifacts/doc_tag/update", json={"title": "T", "content": "v2", "art_type": "doc"})
+
+    response = client.put("/artifacts/doc_tag/versions/1/tag", json={"tag": "release-1"})
+    assert response.status_code == 200
+    assert response.json()["tag"] == "release-1"
+    assert response.json()["status"] == "archived"
+
+    assert client.put("/artifacts/doc_tag/versions/9/tag", json={"tag": "x"}).status_code == 404
+
+def test_artifact_dependencies_and_dependents():
+    workspace_id = create_workspace()
+    srs = client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc_srs", "title": "SRS", "content": "C"}).json()
+    client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc_design", "title": "D", "content": "C", "references": [srs["id"]]})
+
+    response = client.get("/artifacts/doc_design/dependencies")
+    assert response.status_code == 200
+    assert [(node["document_id"], node["depth"]) for node in response.json()] == [("doc_srs", 1)]
+    assert response.json()[0]["title"] == "SRS"
+
+    response = client.get("/artifacts/doc_srs/dependents?max_depth=3")
+    assert [node["document_id"] for node in response.json()] == ["doc_design"]
+    assert client.get("/artifacts/doc_srs/dependents?max_depth=0").status_code == 422
+
+def test_artifact_impact():
+    workspace_id = create_workspace()
+    client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc_srs", "title": "SRS", "content": "C"})
+    srs = client.get("/artifacts/current/doc_srs").json()
+    client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc_design", "title": "D", "content": "C", "references": [srs["id"]]})
+    design = client.get("/artifacts/current/doc_design").json()
+    client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc_test", "title": "T", "content": "C", "references": [design["id"]]})
+
+    response = client.get("/artifacts/doc_srs/impact")
+    assert response.status_code == 200
+    assert [node["document_id"] for node in response.json()] == ["doc_design", "doc_test"]
+    assert response.json()[1]["title"] == "T"
+    assert client.get("/artifacts/doc_test/impact").json() == []
+
+def test_stale_artifacts_and_regeneration_status():
+    workspace_id = create_workspace()
+    srs = client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc_srs", "title": "SRS", "content": "C"}).json()
+    client.post("/artifacts/", json={"workspace_id": workspace_id, "document_id": "doc_er", "title": "ER", "content": "C", "art_type": "er_diagram", "references": [srs["id"]]})
+    client.put("/artifacts/doc_srs/update", json={"title": "SRS", "content": "C2", "art_type": "doc"})
+
+    response = client.get(f"/artifacts/stale?workspace_id={workspace_id}")
+    assert response.status_code == 200
+    assert [item["document_id"] for item in response.json()] == ["doc_er"]
+    assert response.json()[0]["stale_since"] is not None
+
+    assert client.get("/artifacts/regenerate_status/unknown").status_code == 404
+
+def test_semantic_search_validation():
+    workspace_id = create_workspace()
+    # Routed to semantic search (not /{artifact_id}); the query is required
+    response = client.get(f"/artifacts/semantic_search?workspace_id={workspace_id}")
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["query", "q"]
+    assert client.get(f"/artifacts/semantic_search?workspace_id={workspace_id}&q=login&k=0").status_code == 422
+    assert client.get(f"/artifacts/semantic_search?workspace_id={workspace_id}&q=login&status=draft").status_code == 422
+
+
+def test_semantic_search_of_unindexed_workspace():
+    workspace_id = create_workspace()
+    response = client.get(f"/artifacts/semantic_search?workspace_id={workspace_id}&q=login")
+    assert response.status_code == 200
+    assert response.json() == []
+    # A read does not create the workspace's collection
+    assert collection_name(workspace_id) not in [collection.name for collection in chroma_client.list_collections()]
@@ -1,25 +1,41 @@
+import asyncio
 import datetime
 import json
+import threading
 import pytest
 from typing import Dict
 
-from sqlmodel import Session, delete, select
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, delete, func, select
 from backend.crud.artifact import (
     insert_artifact_version,
     create_new_artifact,
     list_artifacts,
+    encode_cursor,
     search_artifacts,
+    fulltext_search_artifacts,
     get_artifact_by_internal_id,
     get_current_artifact,
+    get_current_artifacts,
     get_artifact_versions,
     set_artifact_meta,
     update_artifact_version,
     rollback_artifact_version,
     delete_artifact_by_id,
     delete_artifacts_by_document,
+    apply_artifact_batch,
+    get_artifact_dependencies,
+    get_artifact_dependents,
+    get_artifact_impact,
+    rebuild_artifact_impact,
+    list_stale_artifacts,
+    set_artifacts_indexed,
 )
+from backend.crud import artifact_async
 from backend.crud.workspace import create_workspace  # Import the workspace creation function
-from backend.models.artifact import Artifact
+from backend.models.artifact import Artifact, ArtifactHistory, ArtifactImpact, ArtifactReference, ContentBlob
+from backend.crud.cache import current_artifact_cache
 from backend.config import db_engine
 from backend.config import init_db
 
@@ -30,7 +46,10 @@ init_db()
 def clear_artifacts_table():
     with Session(db_engine) as session:
         session.exec(delete(Artifact))
+        session.exec(delete(ArtifactHistory))
+        session.exec(delete(ArtifactImpact))
         session.commit()
+    current_artifact_cache.clear()
 
 # Fixture to create a workspace before tests
 @pytest.fixture
@@ -91,9 +110,38 @@ def test_list_artifacts(workspace):
     artifacts, total = list_artifacts(workspace_id=workspace.id,limit=10, page=1)
     assert len(artifacts) >= 2
 
+def test_list_artifacts_with_cursor(workspace):
+    for i in range(5):
+        create_new_artifact(workspace.id, f"doc_cursor_{i}", f"Title {i}", f"Content {i}")
+
+    first_page, total = list_artifacts(workspace_id=workspace.id, limit=2, page=1)
+    assert total == 5
+    assert len(first_page) == 2
+
+    # Walk the remaining pages with the cursor of each page's last row
+    seen = [a.id for a in first_page]
+    cursor = encode_cursor(first_page[-1])
+    while True:
+        next_page, total = list_artifacts(workspace_id=workspace.id, limit=2, cursor=cursor)
+        assert total == 5
+        if not next_page:
+            break
+        seen.extend(a.id for a in next_page)
+        cursor = encode_cursor(next_page[-1])
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+    # The cursor walk returns the same order as OFFSET paging
+    all_items, _ = list_artifacts(workspace_id=workspace.id, limit=-1)
+    assert seen == [a.id for a in all_items]
+
+def test_list_artifacts_invalid_cursor(workspace):
+    with pytest.raises(ValueError):
+        list_artifacts(workspace_id=workspace.id, limit=2, cursor="not-a-cursor")
+
 def test_search_artifacts(workspace):
     create_new_artifact(workspace.id, "doc5", "Searchable Title", "Some Content")
-    create_new_artifact(workspace.id, "doc5", "Another Title", "Different Content")
+    create_new_artifact(workspace.id, "doc5b", "Another Title", "Different Content")
     
     # Search by keyword in title.
     results, total = search_artifacts(workspace_id=workspace.id, keyword="Searchable")
@@ -108,6 +156,65 @@ def test_search_artifacts(workspace):
     results, total = search_artifacts(workspace_id=workspace.id, status="current")
     assert all(a.status == "current" for a in results)
 
+def test_search_artifacts_paginated(workspace):
+    for i in range(5):
+        create_new_artifact(workspace.id, f"doc_paged_{i}", f"Paged Title {i}", f"Content {i}")
+    create_new_artifact(workspace.id, "doc_other", "Other Title", "Other Content")
+
+    results, total = search_artifacts(workspace_id=workspace.id, keyword="Paged", limit=2, page=1)
+    assert total == 5
+    assert len(results) == 2
+
+    results, total = search_artifacts(workspace_id=workspace.id, keyword="Paged", limit=2, page=3)
+    assert total == 5
+    assert len(results) == 1
+
+    # Cursor paging over a filtered search
+    results, total = search_artifacts(workspace_id=workspace.id, keyword="Paged", limit=3, cursor=encode_cursor(results[0]))
+    assert total == 5
+    assert len(results) == 0
+
+def test_fulltext_search_artifacts(workspace):
+    create_new_artifact(workspace.id, "doc_fts_1", "Login screen", "The login screen validates the password twice. Password rules apply.")
+    create_new_artifact(workspace.id, "doc_fts_2", "Logout", "Ends the session; no password needed.")
+    create_new_artifact(workspace.id, "doc_fts_3", "画面一覧", "ログイン画面の仕様書です。")
+
+    hits, total = fulltext_search_artifacts(workspace_id=workspace.id, keyword="password")
+    assert total == 2
+    # Ranked best match first, with a highlighted snippet
+    assert hits[0][0].document_id == "doc_fts_1"
+    assert hits[0][1] >= hits[1][1]
+    assert "**" in hits[0][2]
+
+    # Substring match inside Japanese text (trigram tokenizer)
+    hits, total = fulltext_search_artifacts(workspace_id=workspace.id, keyword="仕様書")
+    assert total == 1
+    assert hits[0][0].document_id == "doc_fts_3"
+
+    # The index follows updates and deletes
+    update_artifact_version("doc_fts_2", "Sign out", "Ends the session.", new_art_type="doc")
+    results, total = search_artifacts(workspace_id=workspace.id, keyword="Sign out")
+    assert [a.document_id for a in results] == ["doc_fts_2"]
+    delete_artifacts_by_document("doc_fts_1")
+    hits, total = fulltext_search_artifacts(workspace_id=workspace.id, keyword="validates")
+    assert total == 0
+
+def test_list_artifacts_projection(workspace):
+    create_new_artifact(workspace.id, "doc_slim", "Slim Title", "Large content " * 100)
+    update_artifact_version("doc_slim", "Slim Title 2", None, new_art_type="doc")
+
+    rows, total = list_artifacts(workspace_id=workspace.id, limit=10, columns=["title", "version"])
+    assert total == 1  # listings only read current versions
+    assert rows[0].title == "Slim Title 2"
+    assert rows[0].id is not None and rows[0].updated_at is not None
+    assert not hasattr(rows[0], "content")
+
+    versions = get_artifact_versions("doc_slim", columns=["version", "status"])
+    assert [(v.version, v.status) for v in versions] == [(2, "current"), (1, "archived")]
+
+    with pytest.raises(ValueError):
+        list_artifacts(workspace_id=workspace.id, columns=["no_such_field"])
+
 def test_get_artifact_by_internal_id(workspace):
     artifact = create_new_artifact(workspace.id, "doc6", "Title 6", "Content 6")
     fetched = get_artifact_by_internal_id(artifact.id)
@@ -153,6 +260,177 @@ def test_rollback_artifact_version(workspace):
     # New version should be greater than the previous current version.
     assert rolled_back.version == artifact2.version + 1
 
+def test_current_artifact_cache(workspace):
+    create_new_artifact(workspace.id, "doc_cached", "Title 1", "Content 1")
+    current_artifact_cache.hits = current_artifact_cache.misses = 0
+
+    first = get_current_artifact("doc_cached")
+    second = get_current_artifact("doc_cached")
+    assert first.title == second.title == "Title 1"
+    assert first is not second  # callers get their own copy
+    assert (current_artifact_cache.hits, current_artifact_cache.misses) == (1, 1)
+
+    # Every write path invalidates the cached entry
+    update_artifact_version("doc_cached", "Title 2", "Content 2", new_art_type="doc")
+    assert get_current_artifact("doc_cached").title == "Title 2"
+    set_artifact_meta("doc_cached", new_title="Title 3")
+    assert get_current_artifact("doc_cached").title == "Title 3"
+    rollback_artifact_version("doc_cached", 1)
+    assert get_current_artifact("doc_cached").title == "Title 1"
+    apply_artifact_batch([{"op": "update", "document_id": "doc_cached", "title": "Title 4"}])
+    assert get_current_artifact("doc_cached").title == "Title 4"
+    delete_artifacts_by_document("doc_cached")
+    assert get_current_artifact("doc_cached") is None
+
+def test_current_artifact_cache_disabled(workspace, monkeypatch):
+    monkeypatch.setattr(current_artifact_cache, "enabled", False)
+    create_new_artifact(workspace.id, "doc_uncached", "Title", "Content")
+    current_artifact_cache.hits = current_artifact_cache.misses = 0
+    get_current_artifact("doc_uncached")
+    get_current_artifact("doc_uncached")
+    assert current_artifact_cache.stats()["size"] == 0
+    assert (current_artifact_cache.hits, current_artifact_cache.misses) == (0, 0)
+
+def test_async_artifact_crud(workspace):
+    async def run():
+        artifact1 = await artifact_async.create_new_artifact(workspace.id, "doc_async", "Title A", "Content A")
+        artifact2 = await artifact_async.update_artifact_version("doc_async", "Title B", "Content B", new_art_type="doc")
+        current = await artifact_async.get_current_artifact("doc_async")
+        artifacts, total = await artifact_async.list_artifacts(workspace.id)
+        return artifact1, artifact2, current, total
+
+    artifact1, artifact2, current, total = asyncio.run(run())
+    assert artifact2.version == artifact1.version + 1
+    assert current.id == artifact2.id
+    assert current.title == "Title B"
+    assert total == 1
+
+def test_versions_share_content_blobs(workspace):
+    def blob_count():
+        with Session(db_engine) as session:
+            return session.exec(select(func.count()).select_from(ContentBlob)).one()
+
+    create_new_artifact(workspace.id, "doc_blob", "Title 1", "Shared body")
+    before = blob_count()
+    update_artifact_version("doc_blob", "Title 2", None, new_art_type="doc")  # metadata only
+    rollback_artifact_version("doc_blob", 1)
+    create_new_artifact(workspace.id, "doc_blob_copy", "Copy", "Shared body")
+    assert blob_count() == before  # same text, same blob
+
+    versions = get_artifact_versions("doc_blob")
+    assert len({artifact.content_hash for artifact in versions}) == 1
+    assert all(artifact.content == "Shared body" for artifact in versions)
+
+    # Full-text search reads the text through the blob table
+    hits, total = fulltext_search_artifacts(workspace_id=workspace.id, keyword="Shared", status="current")
+    assert total == 2
+    assert "**Shared**" in hits[0][2]
+
+    set_artifact_meta("doc_blob", new_content="New body")
+    assert blob_count() == before + 1
+    assert get_current_artifact("doc_blob").content == "New body"
+    results, total = search_artifacts(workspace_id=workspace.id, keyword="New body")
+    assert [a.document_id for a in results] == ["doc_blob"]
+
+def test_archived_versions_stored_as_deltas(workspace):
+    lines = [f"Requirement {i}: the system shall do thing {i}.\n" for i in range(200)]
+    bodies = ["".join(lines)]
+    create_new_artifact(workspace.id, "doc_delta", "SRS", bodies[0])
+    for version in range(2, 26):
+        lines[version] = f"Requirement {version}: revised in version {version}.\n"
+        bodies.append("".join(lines))
+        update_artifact_version("doc_delta", "SRS", bodies[-1], new_art_type="doc")
+
+    with Session(db_engine) as session:
+        hashes = select(ArtifactHistory.content_hash).where(ArtifactHistory.document_id == "doc_delta")\
+            .union(select(Artifact.content_hash).where(Artifact.document_id == "doc_delta"))
+        blobs = session.exec(select(ContentBlob).where(ContentBlob.hash.in_(hashes))).all()
+    deltas = [blob for blob in blobs if blob.content is None]
+    assert len(blobs) == 25
+    assert len(deltas) > 15  # most archived bodies are deltas, with periodic snapshots
+    assert max(blob.depth for blob in blobs) < 10
+    current = get_current_artifact("doc_delta")
+    assert current.content == bodies[-1]
+    assert next(blob for blob in blobs if blob.hash == current.content_hash).content is not None
+
+    # Reconstruction is transparent to the readers
+    versions = get_artifact_versions("doc_delta")
+    assert [artifact.content for artifact in reversed(versions)] == bodies
+    assert get_artifact_by_internal_id(versions[-2].id).content == bodies[1]
+    assert get_artifact_versions("doc_delta", columns=["content"])[5].content == bodies[19]
+
+    # Archived text stays searchable (a scan of the history table, unranked),
+    # and deletes keep the FTS index consistent
+    hits, total = fulltext_search_artifacts(workspace_id=workspace.id, keyword="version 3.", status="archived")
+    assert total == 22  # versions 3..24
+    assert hits[0][1] is None
+    delete_artifacts_by_document("doc_delta", version=2)
+    with Session(db_engine) as session:
+        session.exec(text("INSERT INTO artifact_fts(artifact_fts, rank) VALUES ('integrity-check', 1)"))
+
+    # A rollback makes the old text current again, stored in full
+    rolled_back = rollback_artifact_version("doc_delta", 3)
+    assert rolled_back.content == bodies[2]
+    with Session(db_engine) as session:
+        assert session.get(ContentBlob, rolled_back.content_hash).content == bodies[2]
+
+def test_archived_versions_move_to_history(workspace):
+    artifact1 = create_new_artifact(workspace.id, "doc_cold", "Title 1", "Content 1")
+    artifact2 = update_artifact_version("doc_cold", "Title 2", "Content 2", new_art_type="doc")
+
+    with Session(db_engine) as session:
+        hot = session.exec(select(Artifact).where(Artifact.document_id == "doc_cold")).all()
+        cold = session.exec(select(ArtifactHistory).where(ArtifactHistory.document_id == "doc_cold")).all()
+    assert [a.id for a in hot] == [artifact2.id]
+    assert [(a.id, a.version, a.status) for a in cold] == [(artifact1.id, 1, "archived")]
+
+    # History reads see the archived version under its original id
+    archived = get_artifact_by_internal_id(artifact1.id)
+    assert archived.status == "archived"
+    assert archived.content == "Content 1"
+    results, total = search_artifacts(workspace_id=workspace.id, status="archived", keyword="Content")
+    assert [a.id for a in results] == [artifact1.id]
+    results, total = search_artifacts(workspace_id=workspace.id, keyword="Content")
+    assert [a.id for a in results] == [artifact2.id]
+
+    # (document_id, version) stays unique across both tables
+    delete_artifact_by_id(artifact2.id)
+    with pytest.raises(IntegrityError):
+        create_new_artifact(workspace.id, "doc_cold", "Again", "Again")
+    # Ids are not reused after the hot table's last row is removed
+    assert create_new_artifact(workspace.id, "doc_cold_2", "New", "New").id > artifact2.id
+
+def test_create_duplicate_document_rejected(workspace):
+    create_new_artifact(workspace.id, "doc_dup", "Title", "Content")
+    # (document_id, version) is unique, so a second version 1 cannot be created
+    with pytest.raises(IntegrityError):
+        create_new_artifact(workspace.id, "doc_dup", "Title again", "Content again")
+
+def test_concurrent_updates_keep_version_chain(workspace):
+    doc_id = "doc_concurrent"
+    create_new_artifact(workspace.id, doc_id, "Title", "Content")
+    errors = []
+
+    def edit(worker: int):
+        try:
+            for i in range(3):
+                update_artifact_version(doc_id, f"Title {worker}-{i}", f"Content {worker}-{i}", new_art_type="doc")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=edit, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    versions = get_artifact_versions(doc_id)
+    # Every edit got its own version number and exactly one version is current
+    assert sorted(a.version for a in versions) == list(range(1, 14))
+    assert [a.version for a in versions if a.status == "current"] == [13]
+    assert all(a.parent_version == a.version - 1 for a in versions if a.version > 1)
+
 def test_set_artifact_meta(workspace):
     """
     Test updating artifact metadata using set_artifact_meta function
@@ -213,4 +491,177 @@ def test_delete_artifacts_by_document(workspace):
     # With two versions created, deleting version 1 should leave one remaining.
     remains, total = list_artifacts(workspace_id=workspace.id,limit=-1)
     remaining_after = [a for a in remains if a.document_id == doc_id]
-    assert len(remaining_after) == 1
\ No newline at end of file
+    assert len(remaining_after) == 1
+
+def test_apply_artifact_batch(workspace):
+    create_new_artifact(workspace.id, "batch_existing", "Existing", "Existing content")
+    operations = [
+        {"op": "create", "document_id": f"batch_{i}", "workspace_id": workspace.id, "title": f"Batch {i}", "content": f"Content {i}"}
+        for i in range(3)
+    ] + [
+        {"op": "update", "document_id": "batch_1", "title": "Batch 1 Updated"},
+        {"op": "create", "document_id": "batch_existing", "workspace_id": workspace.id, "title": "Dup", "content": "Dup"},
+        {"op": "update", "document_id": "batch_missing", "title": "Nope"},
+        {"op": "delete", "document_id": "batch_2"},
+        {"op": "delete", "document_id": "batch_existing", "version": 1},
+    ]
+
+    results = apply_artifact_batch(operations)
+
+    assert [r["status"] for r in results] == ["ok", "ok", "ok", "ok", "error", "error", "ok", "ok"]
+    assert all(r["id"] is not None for r in results[:3])
+    assert results[3]["version"] == 2
+    assert results[6]["deleted"] == 1
+
+    assert get_current_artifact("batch_0").title == "Batch 0"
+    assert get_current_artifact("batch_1").title == "Batch 1 Updated"
+    assert get_current_artifact("batch_1").content == "Content 1"
+    assert get_artifact_versions("batch_2") == []
+    assert get_artifact_versions("batch_existing") == []
+
+def test_apply_artifact_batch_rolls_back_on_conflict(workspace):
+    current = create_new_artifact(workspace.id, "batch_conflict", "Conflict", "Conflict content")
+    # A stray archived version 2 makes the next version bump violate (document_id, version)
+    with Session(db_engine) as session:
+        row = session.get(Artifact, current.id)
+        session.add(ArtifactHistory(**{
+            **{name: getattr(row, name) for name in Artifact.__table__.columns.keys()},
+            "id": current.id + 1_000_000, "version": 2, "status": "archived",
+        }))
+        session.commit()
+
+    with pytest.raises(IntegrityError):
+        apply_artifact_batch([
+            {"op": "create", "document_id": "batch_new", "workspace_id": workspace.id, "title": "New", "content": "New"},
+            {"op": "update", "document_id": "batch_conflict", "title": "Conflict Updated"},
+            {"op": "delete", "document_id": "batch_conflict", "version": 2},
+        ])
+
+    # Nothing of the batch was committed
+    assert get_artifact_versions("batch_new") == []
+    assert get_current_artifact("batch_conflict").title == "Conflict"
+    assert sorted(a.version for a in get_artifact_versions("batch_conflict")) == [1, 2]
+
+
+def _documents(nodes):
+    return [(node["document_id"], node["depth"]) for node in nodes]
+
+
+def test_reference_graph_traversal(workspace):
+    # design -> srs, test -> design and srs, and srs -> test closes a cycle
+    srs = create_new_artifact(workspace.id, "srs", "SRS", "requirements")
+    design = create_new_artifact(workspace.id, "design", "Design", "design", references=[srs.id])
+    create_new_artifact(workspace.id, "test", "Tests", "tests", references={"covers": ["design", srs.id]})
+    set_artifact_meta("srs", new_references=["test"])
+
+    assert _documents(get_artifact_dependencies("test")) == [("design", 1), ("srs", 1)]
+    assert _documents(get_artifact_dependents("srs")) == [("design", 1), ("test", 1)]
+    assert _documents(get_artifact_dependents("design")) == [("test", 1), ("srs", 2)]
+    assert _documents(get_artifact_dependents("design", max_depth=1)) == [("test", 1)]
+    nodes = get_artifact_dependencies("design")
+    assert _documents(nodes) == [("srs", 1), ("test", 2)]
+    assert nodes[0]["title"] == "SRS" and nodes[0]["version"] == 1
+
+    with pytest.raises(ValueError):
+        get_artifact_dependencies("design", max_depth=0)
+
+
+def test_reference_edges_follow_versions(workspace):
+    srs = create_new_artifact(workspace.id, "srs", "SRS", "requirements")
+    create_new_artifact(workspace.id, "design", "Design", "v1", references=[srs.id])
+    # A new version keeps its references unless new ones are given
+    update_artifact_version("design", "Design", "v2", "doc")
+    assert _documents(get_artifact_dependents("srs")) == [("design", 1)]
+    update_artifact_version("design", "Design", "v3", "doc", new_references=["other"])
+    assert get_artifact_dependents("srs") == []
+    # Rollback restores the references of the target version
+    rollback_artifact_version("design", 1)
+    assert _documents(get_artifact_dependencies("design")) == [("srs", 1)]
+
+    delete_artifacts_by_document("design")
+    with Session(db_engine) as session:
+        assert session.exec(select(ArtifactReference).where(ArtifactReference.source_document_id == "design")).all() == []
+
+
+def _impact(document_id):
+    return [node["document_id"] for node in get_artifact_impact(document_id)]
+
+
+def _walked_impact(document_id):
+    return sorted(node["document_id"] for node in get_artifact_dependents(document_id, max_depth=50))
+
+
+def test_artifact_impact_is_maintained_incrementally(workspace):
+    # srs <- design <- screens <- tests, and an unrelated document
+    srs = create_new_artifact(workspace.id, "srs", "SRS", "requirements")
+    design = create_new_artifact(workspace.id, "design", "Design", "design", references=[srs.id])
+    create_new_artifact(workspace.id, "screens", "Screens", "screens", references=["design"])
+    create_new_artifact(workspace.id, "tests", "Tests", "tests", references=["screens"])
+    create_new_artifact(workspace.id, "other", "Other", "other")
+    assert _impact("srs") == ["design", "screens", "tests"]
+    assert _impact("screens") == ["tests"]
+
+    # Re-pointing design cuts srs off from everything downstream
+    update_artifact_version("design", "Design", "design v2", "doc", new_references=["other"])
+    assert _impact("srs") == []
+    assert _impact("other") == ["design", "screens", "tests"]
+
+    # set_artifact_meta, a cycle, a rollback and a batch
+    set_artifact_meta("tests", new_references=["screens", "srs"])
+    set_artifact_meta("srs", new_references=["tests"])
+    assert _impact("srs") == ["tests"]
+    assert _impact("tests") == ["srs"]
+    rollback_artifact_version("design", 1)
+    assert _impact("srs") == ["design", "screens", "tests"]
+    apply_artifact_batch([
+        {"op": "create", "document_id": "report", "workspace_id": workspace.id, "title": "R", "content": "r", "references": ["tests"]},
+        {"op": "delete", "document_id": "screens"},
+    ])
+    assert _impact("tests") == ["design", "report", "srs"]
+    assert _impact("srs") == ["design", "report", "tests"]
+    assert _impact("design") == []  # screens is gone
+
+    for document_id in ("srs", "design", "screens", "tests", "other", "report"):
+        assert _impact(document_id) == _walked_impact(document_id)
+
+    pairs = rebuild_artifact_impact()
+    assert pairs == sum(len(_impact(d)) for d in ("srs", "design", "screens", "tests", "other", "report"))
+    assert _impact("srs") == ["design", "report", "tests"]
+
+
+def test_new_source_version_marks_dependents_stale(workspace):
+    srs = create_new_artifact(workspace.id, "srs", "SRS", "requirements")
+    create_new_artifact(workspace.id, "screens", "Screens", "[]", art_type="screen_list", references=[srs.id])
+    create_new_artifact(workspace.id, "er", "ER", "erDiagram", art_type="er_diagram", references=["screens"])
+    create_new_artifact(workspace.id, "other", "Other", "other")
+    get_current_artifact("er")  # cached before it goes stale
+    assert list_stale_artifacts(workspace.id) == []
+
+    update_artifact_version("srs", "SRS", "requirements v2", "doc")
+    stale = list_stale_artifacts(workspace.id)
+    assert sorted(artifact.document_id for artifact in stale) == ["er", "screens"]
+    assert get_current_artifact("er").stale_since is not None
+
+    # A later change keeps the first stale time; a new version of the derived one clears it
+    first_stale = get_current_artifact("screens").stale_since
+    set_artifact_meta("srs", new_content="requirements v3")
+    assert get_current_artifact("screens").stale_since == first_stale
+    update_artifact_version("screens", "Screens", "[1]", "screen_list")
+    assert [artifact.document_id for artifact in list_stale_artifacts(workspace.id)] == ["er"]
+
+
+def test_bulk_current_artifacts_and_indexed(workspace):
+    create_new_artifact(workspace.id, "doc_a", "A", "content a")
+    create_new_artifact(workspace.id, "doc_b", "B", "content b")
+    update_artifact_version("doc_b", "B", "content b v2", "doc")
+    get_current_artifact("doc_b")  # cached before it is marked indexed
+
+    current = get_current_artifacts(["doc_b", "doc_a", "missing"])
+    assert [(artifact.document_id, artifact.version, artifact.content) for artifact in current] == [
+        ("doc_a", 1, "content a"), ("doc_b", 2, "content b v2")
+    ]
+
+    assert set_artifacts_indexed({artifact.id: f"hash {artifact.document_id}" for artifact in current}, "model") == 2
+    indexed = get_current_artifact("doc_b")
+    assert (indexed.indexed_hash, indexed.indexed_model) == ("hash doc_b", "model")
+    assert indexed.indexed_at is not None
@@ -0,0 +1,44 @@
+import pytest
+from llama_index.core.schema import MetadataMode, NodeRelationship
+
+from backend.rag.chunking import chunk_id, get_node_parsers, split_documents
+
+
+def _srs(sections, version=1):
+    content = "\n\n".join(f"## Section {i}\n{text}" for i, text in enumerate(sections))
+    return {"document_id": "srs", "title": "SRS", "content": content, "version": version}
+
+
+SECTIONS = [" ".join(f"word{i}_{j}." for j in range(40)) for i in range(4)]
+
+
+def test_chunks_have_stable_ids_and_links():
+    nodes = split_documents(1, [_srs(SECTIONS, 3), {"document_id": "other", "title": "Other", "content": "short"}],
+                            get_node_parsers("sentence", 64, 0))
+
+    srs = [node for node in nodes if node.ref_doc_id == "srs"]
+    assert [node.id_ for node in srs] == [chunk_id("srs", 3, i) for i in range(len(srs))]
+    assert srs[0].id_ == "srs:v3:0"
+    assert [node.id_ for node in nodes if node.ref_doc_id == "other"] == ["other:0"]
+    # Sibling links point at the new ids
+    assert srs[1].relationships[NodeRelationship.PREVIOUS].node_id == "srs:v3:0"
+    assert srs[0].relationships[NodeRelationship.NEXT].node_id == "srs:v3:1"
+    assert srs[0].metadata["version"] == 3 and srs[1].metadata["chunk"] == 1
+
+
+def test_unchanged_chunks_keep_their_hash_across_versions():
+    parsers = get_node_parsers("markdown", 64, 0)
+    before = split_documents(1, [_srs(SECTIONS, 1)], parsers)
+    after = split_documents(1, [_srs(SECTIONS[:2] + ["Changed."] + SECTIONS[3:], 2)], parsers)
+
+    # Bookkeeping metadata is not part of the embedded text
+    assert "version" not in after[0].get_content(metadata_mode=MetadataMode.EMBED)
+    changed = {node.metadata["chunk_hash"] for node in after} - {node.metadata["chunk_hash"] for node in before}
+    assert [node.text for node in after if node.metadata["chunk_hash"] in changed] == ["## Section 2\nChanged."]
+
+
+def test_token_window_splitter():
+    nodes = split_documents(1, [_srs(SECTIONS)], get_node_parsers("token", 32, 8))
+    assert len(nodes) > 4
+    with pytest.raises(ValueError):
+        get_node_parsers("paragraph")
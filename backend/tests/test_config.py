@@ -0,0 +1,31 @@
+from sqlmodel import create_engine
+
+from backend.config import db_engine, configure_sqlite, sqlite_pragmas, settings
+
+
+def test_db_engine_applies_sqlite_pragmas():
+    with db_engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar().upper() == settings.SQLITE_JOURNAL_MODE
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.SQLITE_BUSY_TIMEOUT
+        assert connection.exec_driver_sql("PRAGMA cache_size").scalar() == settings.SQLITE_CACHE_SIZE
+
+
+def test_configure_sqlite_custom_pragmas(tmp_path):
+    engine = configure_sqlite(create_engine(f"sqlite:///{tmp_path / 'test.db'}"), {"synchronous": "OFF", "busy_timeout": 123})
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 0
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 123
+    engine.dispose()
+
+
+def test_sqlite_pragmas_start_with_busy_timeout_then_auto_vacuum_and_journal_mode():
+    # The connect-time PRAGMAs must already wait on locks held by other connections
+    assert list(sqlite_pragmas())[:3] == ["busy_timeout", "auto_vacuum", "journal_mode"]
+
+
+def test_auto_vacuum_applies_to_new_database(tmp_path):
+    engine = configure_sqlite(create_engine(f"sqlite:///{tmp_path / 'test.db'}"), sqlite_pragmas())
+    with engine.connect() as connection:
+        connection.exec_driver_sql("CREATE TABLE t (x)")
+        assert connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2  # INCREMENTAL
+    engine.dispose()
@@ -0,0 +1,57 @@
+from typing import List
+
+from llama_index.core.embeddings import MockEmbedding
+
+from backend.rag.embedding_cache import CachedEmbedding
+
+
+class CountingEmbedding(MockEmbedding):
+    # Records the texts each request would send to the embedding server
+    requests: List[List[str]] = []
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        self.requests.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        self.requests.append([query])
+        return [float(len(query)), 2.0]
+
+
+def _model(model_name: str = "model-a") -> CountingEmbedding:
+    return CountingEmbedding(embed_dim=2, model_name=model_name, requests=[])
+
+
+def test_text_embeddings_are_cached_on_disk(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    inner = _model()
+    cached = CachedEmbedding(inner, path)
+
+    assert cached.get_text_embedding_batch(["a", "bb", "a"]) == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert inner.requests == [["a", "bb"]]
+
+    # A new process (new instance on the same file) only embeds the new text
+    inner = _model()
+    cached = CachedEmbedding(inner, path)
+    assert cached.get_text_embedding_batch(["bb", "ccc"]) == [[2.0, 1.0], [3.0, 1.0]]
+    assert inner.requests == [["ccc"]]
+    assert cached.stats["text_hits"] == 1 and cached.stats["text_misses"] == 1
+
+    # Embeddings are kept per model
+    inner = _model("model-b")
+    cached = CachedEmbedding(inner, path)
+    cached.get_text_embedding("a")
+    assert inner.requests == [["a"]]
+    assert cached.store.count("model-a") == 3
+    assert cached.store.count() == 4
+
+
+def test_query_embeddings_use_an_lru(tmp_path):
+    inner = _model()
+    cached = CachedEmbedding(inner, str(tmp_path / "embeddings.db"), query_cache_size=2)
+
+    for query in ["q1", "q2", "q1", "q3", "q1", "q2"]:
+        assert cached.get_query_embedding(query) == [2.0, 2.0]
+    # q2 was evicted by q3 (q1 had been used more recently)
+    assert inner.requests == [["q1"], ["q2"], ["q3"], ["q2"]]
+    assert cached.stats["query_hits"] == 2
@@ -6,20 +6,25 @@ from typing import Dict
 from backend.crud.artifact import (
     insert_artifact_version,
     create_new_artifact,
+    update_artifact_version,
+    delete_artifacts_by_document,
     list_artifacts,
 )
 
 from backend.crud.index import (
     reindex_all_documents,
+    semantic_search_artifacts,
 )
+from backend.services.jobs import wait_for_job
 
 from sqlmodel import Session, delete, select
 
-from backend.models.artifact import Artifact
+from backend.models.artifact import Artifact, ArtifactHistory
+from backend.crud.cache import current_artifact_cache
 from backend.config import db_engine
 from backend.config import init_db
-from backend.rag.crud import insert_doc
-from backend.rag.index import chroma_collection, vector_index, reset
+from backend.rag.crud import insert_doc, clear_index
+from backend.rag.index import LEGACY_COLLECTION, chroma_client, get_collection, reset
 from backend.crud.workspace import create_workspace 
 
 init_db()
@@ -31,7 +36,9 @@ init_db()
 def clear_artifacts_table():
     with Session(db_engine) as session:
         session.exec(delete(Artifact))
+        session.exec(delete(ArtifactHistory))
         session.commit()
+    current_artifact_cache.clear()
 
 # Fixture to clear data in vector index
 @pytest.fixture(autouse=True)
@@ -63,7 +70,7 @@ def test_index_artifact_in_vector_store(workspace):
     insert_and_index_artifact(workspace.id, doc_id, title, content)
 
     # Query the vector store to check if the document is indexed
-    ret = chroma_collection.get(limit=1)
+    ret = get_collection(workspace.id).get(limit=1)
 
     # Check if the document ID is in the indexed results
     assert doc_id in [meta['document_id'] for meta in ret['metadatas']]
@@ -95,14 +102,90 @@ def test_reindex_all_artifacts(workspace):
     artifacts, total = list_artifacts(workspace_id=workspace.id, limit=-1)
     assert len(artifacts) == 10
     
-    # Reindex
-    reindex_all_documents(workspace_id)
+    # Reindex (a background job) and wait for it
+    result = reindex_all_documents(workspace.id)
+    assert wait_for_job(result["task_id"])["status"] == "completed"
 
     # Query the vector store and check the document
-    ret = chroma_collection.get()
+    ret = get_collection(workspace.id).get()
 
     # Assert if the all document is indexed
     assert len(ret['metadatas']) == 10
 
 
+# Test case to check that a second reindex only embeds what changed
+def test_reindex_only_changed_artifacts(workspace):
+    for i in range(3):
+        create_new_artifact(workspace.id, f"doc{i}", f"Title {i}", f"Content {i}")
+    result = reindex_all_documents(workspace.id)
+    assert wait_for_job(result["task_id"])["indexed"] == 3
+
+    # Unchanged: nothing is embedded again
+    status = wait_for_job(reindex_all_documents(workspace.id)["task_id"])
+    assert (status["indexed"], status["unchanged"], status["removed"]) == (0, 3, 0)
+
+    # A new version is re-embedded, a deleted document loses its vectors
+    update_artifact_version("doc1", "Title 1", "Content 1 changed", "doc")
+    delete_artifacts_by_document("doc2")
+    status = wait_for_job(reindex_all_documents(workspace.id)["task_id"])
+    assert (status["indexed"], status["unchanged"], status["removed"]) == (1, 1, 1)
+
+    ret = get_collection(workspace.id).get()
+    assert {meta['document_id'] for meta in ret['metadatas']} == {"doc0", "doc1"}
+    assert "Content 1 changed" in ret['documents']
+
+
+# Test case to check that clearing the index only touches one workspace
+def test_clear_index_of_one_workspace(workspace):
+    other = create_workspace(title="Other Workspace")
+    for i in range(3):
+        insert_and_index_artifact(workspace.id, f"doc{i}", f"Title {i}", f"Content {i}")
+    insert_and_index_artifact(other.id, "other_doc", "Other", "Other content")
+
+    assert clear_index(workspace.id) == {"workspace_id": workspace.id, "deleted": 3}
+    assert get_collection(workspace.id).count() == 0
+    ret = get_collection(other.id).get()
+    assert [meta['document_id'] for meta in ret['metadatas']] == ["other_doc"]
+    assert clear_index(workspace.id)["deleted"] == 0
+
+
+# Test case to check that vectors of the old shared collection are removed per workspace
+def test_legacy_collection_is_emptied_per_workspace(workspace):
+    other = create_workspace(title="Other Workspace")
+    legacy = chroma_client.get_or_create_collection(LEGACY_COLLECTION)
+    legacy.add(
+        ids=["a", "b", "c"],
+        embeddings=[[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]],
+        metadatas=[{"workspace_id": workspace.id}, {"workspace_id": workspace.id}, {"workspace_id": other.id}],
+    )
+
+    # Clearing a workspace deletes its legacy vectors as well
+    assert clear_index(workspace.id)["deleted"] == 2
+    assert legacy.get(include=["metadatas"])["metadatas"] == [{"workspace_id": other.id}]
+
+    # A reindex (here: of a workspace with nothing to embed) drops them too, and the
+    # collection goes once it is empty
+    status = wait_for_job(reindex_all_documents(other.id)["task_id"])
+    assert status["status"] == "completed" and status["legacy_removed"] == 1
+    assert LEGACY_COLLECTION not in [collection.name for collection in chroma_client.list_collections()]
+
+
+# Test case to check semantic search over the indexed chunks
+def test_semantic_search_artifacts(workspace):
+    create_new_artifact(workspace.id, "srs", "SRS", "The login screen asks for a user name and a password.")
+    create_new_artifact(workspace.id, "screens", "Screens", "Login screen, dashboard screen", art_type="screen_list")
+    wait_for_job(reindex_all_documents(workspace.id)["task_id"])
+
+    results = semantic_search_artifacts(workspace.id, "login", k=5)
+    assert {result["document_id"] for result in results} == {"srs", "screens"}
+    assert all(result["status"] == "current" and result["version"] == 1 for result in results)
+    assert results == sorted(results, key=lambda result: result["score"], reverse=True)
+
+    assert [result["document_id"] for result in semantic_search_artifacts(workspace.id, "login", art_type="screen_list")] == ["screens"]
+    # Not reindexed since the update: the chunks found are of the archived version
+    update_artifact_version("srs", "SRS", "Password rules", "doc")
+    archived = semantic_search_artifacts(workspace.id, "login", status="archived")
+    assert [(result["document_id"], result["version"]) for result in archived] == [("srs", 1)]
+
+
 # Test case to check if full indexes
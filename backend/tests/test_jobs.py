@@ -0,0 +1,94 @@
+import threading
+import pytest
+from sqlmodel import Session, delete
+from backend.crud.job import create_job, get_job, requeue_interrupted_jobs, claim_next_job
+from backend.models.job import Job
+from backend.services import jobs
+from backend.config import db_engine, init_db
+
+init_db()
+
+# Lets a test hold the "count" handler at an item until it has looked at the job
+gate = threading.Event()
+
+
+@jobs.register_job("count")
+def count_job(job, items: int, fail_at: int = None):
+    job.progress(0, items)
+    for index in range(1, items + 1):
+        gate.wait(5)
+        if index == fail_at:
+            raise Exception(f"item {index} failed")
+        job.progress(index, last_item=index)
+    return {"counted": items}
+
+
+@pytest.fixture(autouse=True)
+def clear_jobs_table(monkeypatch):
+    with Session(db_engine) as session:
+        session.exec(delete(Job))
+        session.commit()
+    monkeypatch.setattr(jobs.settings, "JOB_PROGRESS_INTERVAL", 0.0)
+    gate.set()
+
+
+def test_enqueue_job_runs_in_background():
+    task_id = jobs.enqueue_job("count", items=3)
+    status = jobs.wait_for_job(task_id, timeout=10)
+    assert status["status"] == "completed"
+    assert status["done"] == 3 and status["total"] == 3 and status["progress"] == 1.0
+    assert status["counted"] == 3 and status["last_item"] == 3
+    assert jobs.get_jobs_status(kind="count")[task_id]["status"] == "completed"
+
+
+def test_job_progress_is_live_and_cancellable():
+    gate.clear()
+    task_id = jobs.enqueue_job("count", items=100)
+    # Returns before the work is done
+    assert jobs.get_job_status(task_id)["status"] in ("queued", "in-progress")
+
+    jobs.request_cancel(task_id)
+    gate.set()
+    status = jobs.wait_for_job(task_id, timeout=10)
+    assert status["status"] == "cancelled"
+    assert status["done"] < 100
+
+
+def test_failed_job_records_error():
+    task_id = jobs.enqueue_job("count", items=5, fail_at=3)
+    status = jobs.wait_for_job(task_id, timeout=10)
+    assert status["status"] == "failed"
+    assert status["error"] == "item 3 failed"
+    assert status["done"] == 2
+
+
+def test_cancel_queued_job_and_unknown_kind():
+    job = create_job("not-registered")
+    assert jobs.request_cancel(job.id)["status"] == "cancelled"
+    assert jobs.get_job_status("missing") == {"status": "not found"}
+    with pytest.raises(ValueError):
+        jobs.enqueue_job("not-registered")
+
+
+def test_interrupted_jobs_are_requeued():
+    job = create_job("not-registered")
+    assert claim_next_job(["not-registered"]).id == job.id
+    assert claim_next_job(["not-registered"]) is None  # claimed once only
+    assert requeue_interrupted_jobs() == 1
+    assert get_job(job.id).status == "queued"
+
+
+def test_jobs_survive_a_restart(monkeypatch):
+    # A job the previous process was running when it stopped
+    with Session(db_engine) as session:
+        session.add(Job(id="interrupted", kind="count", params={"items": 2}, status="in-progress"))
+        session.commit()
+
+    # What the app does on start: init_db(), then start_workers() (once per process)
+    init_db()
+    monkeypatch.setattr(jobs, "_workers", [])
+    jobs.start_workers(1)
+
+    status = jobs.wait_for_job("interrupted", timeout=10)
+    assert status["status"] == "completed"
+    assert status["counted"] == 2
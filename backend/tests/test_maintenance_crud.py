@@ -0,0 +1,111 @@
+import datetime
+import pytest
+from sqlmodel import Session, delete, select
+from backend.crud.artifact import (
+    create_new_artifact,
+    get_artifact_versions,
+    update_artifact_version,
+    tag_artifact_version,
+    delete_artifacts_by_document,
+)
+from backend.crud.maintenance import (
+    prune_artifact_versions,
+    delete_orphan_blobs,
+    vacuum_database,
+    compact_database,
+)
+from backend.crud.workspace import create_workspace, update_workspace
+from backend.models.artifact import Artifact, ArtifactHistory, ContentBlob
+from backend.crud.cache import current_artifact_cache
+from backend.config import db_engine, init_db
+
+init_db()
+
+
+@pytest.fixture(autouse=True)
+def clear_artifacts_table():
+    with Session(db_engine) as session:
+        session.exec(delete(Artifact))
+        session.exec(delete(ArtifactHistory))
+        session.exec(delete(ContentBlob))
+        session.commit()
+    current_artifact_cache.clear()
+
+
+@pytest.fixture
+def workspace():
+    return create_workspace(title="Retention Workspace")
+
+
+def _make_versions(workspace_id: int, document_id: str, count: int) -> None:
+    create_new_artifact(workspace_id, document_id, "Title", "line 0\n" * 50)
+    for i in range(1, count):
+        update_artifact_version(document_id, "Title", "line 0\n" * 50 + f"edit {i}\n", "doc")
+
+
+def _versions(document_id: str):
+    return [artifact.version for artifact in get_artifact_versions(document_id)]
+
+
+def test_prune_keep_last_skips_current_and_tagged(workspace):
+    _make_versions(workspace.id, "doc_keep", 6)
+    tag_artifact_version("doc_keep", 2, "release-1")
+
+    deleted = prune_artifact_versions(workspace.id, keep_last=3)
+
+    # current (6) + the two newest archived ones, plus the tagged version
+    assert deleted == 2
+    assert _versions("doc_keep") == [6, 5, 4, 2]
+
+
+def test_prune_max_age_days(workspace):
+    _make_versions(workspace.id, "doc_age", 3)
+    old = (datetime.datetime.now() - datetime.timedelta(days=40)).isoformat()
+    with Session(db_engine) as session:
+        for artifact in session.exec(select(ArtifactHistory).where(ArtifactHistory.document_id == "doc_age")):
+            artifact.created_at = old
+            session.add(artifact)
+        session.commit()
+
+    assert prune_artifact_versions(workspace.id, max_age_days=30) == 2
+    assert _versions("doc_age") == [3]
+    # Other workspaces are untouched
+    other = create_workspace(title="Other Workspace")
+    _make_versions(other.id, "doc_other", 2)
+    assert prune_artifact_versions(workspace.id, keep_last=1) == 0
+    assert _versions("doc_other") == [2, 1]
+
+
+def test_delete_orphan_blobs_keeps_delta_bases(workspace):
+    _make_versions(workspace.id, "doc_gc", 4)
+    # v1 is the snapshot the archived deltas are stored against
+    tag_artifact_version("doc_gc", 3, "keep")
+    assert prune_artifact_versions(workspace.id, keep_last=1) == 2
+    delete_orphan_blobs()
+
+    v3 = next(a for a in get_artifact_versions("doc_gc") if a.version == 3)
+    assert v3.content == "line 0\n" * 50 + "edit 2\n"
+
+    delete_artifacts_by_document("doc_gc")
+    assert delete_orphan_blobs() > 0
+    with Session(db_engine) as session:
+        assert session.exec(select(ContentBlob)).all() == []
+
+
+def test_compact_database_reports_reclaimed_bytes(workspace):
+    update_workspace(workspace.id, retention_keep_last=1)
+    create_new_artifact(workspace.id, "doc_big", "Title", "a\n" * 200000)
+    for i in range(5):
+        update_artifact_version("doc_big", "Title", f"{i}\n" * 200000, "doc")
+
+    report = compact_database(workspace.id)
+
+    assert report["versions_pruned"] == 5
+    assert report["blobs_deleted"] == 5
+    assert report["bytes_reclaimed"] > 0
+    assert report["bytes_after"] < report["bytes_before"]
+    with db_engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+        assert connection.exec_driver_sql("PRAGMA freelist_count").scalar() == 0
+    assert _versions("doc_big") == [6]
+    assert vacuum_database()["bytes_reclaimed"] == 0
@@ -0,0 +1,170 @@
+import re
+import pytest
+
+from sqlalchemy import event, text
+from sqlmodel import Session, delete
+from backend.crud.artifact import (
+    create_new_artifact,
+    list_artifacts,
+    encode_cursor,
+    search_artifacts,
+    fulltext_search_artifacts,
+    get_artifact_by_internal_id,
+    get_current_artifact,
+    get_artifact_versions,
+    update_artifact_version,
+    rollback_artifact_version,
+    set_artifact_meta,
+    set_artifact_indexed,
+    delete_artifact_by_id,
+    delete_artifacts_by_document,
+    apply_artifact_batch,
+    get_artifact_dependencies,
+    get_artifact_dependents,
+    get_artifact_impact,
+    get_current_artifacts,
+    list_stale_artifacts,
+    set_artifacts_indexed,
+    tag_artifact_version,
+)
+from backend.crud.cache import current_artifact_cache
+from backend.crud.maintenance import prune_artifact_versions
+from backend.crud.workspace import create_workspace
+from backend.models.artifact import Artifact, ArtifactHistory, ArtifactImpact
+from backend.config import db_engine
+from backend.config import init_db
+
+init_db()
+
+# A plan step like "SCAN artifact" or "SCAN artifact_history" (optionally "USING INDEX ...")
+# reads the whole table; the same goes for the reference tables. The FTS5 virtual table is
+# reported as "SCAN artifact_fts VIRTUAL TABLE ..." and is fine.
+FULL_SCAN = re.compile(r"\bSCAN artifact(?:_history|_reference|_impact)?\b")
+
+
+@pytest.fixture(autouse=True)
+def clear_artifacts_table():
+    with Session(db_engine) as session:
+        session.exec(delete(Artifact))
+        session.exec(delete(ArtifactHistory))
+        session.exec(delete(ArtifactImpact))
+        session.commit()
+    current_artifact_cache.clear()
+
+
+@pytest.fixture
+def workspace():
+    return create_workspace(title="Query Plan Workspace")
+
+
+@pytest.fixture
+def captured_statements():
+    """
+    Records every artifact statement the CRUD layer sends to SQLite
+    (executemany ones with their first parameter set).
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "artifact" in statement and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH", "INSERT")):
+            statements.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(db_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", capture)
+
+
+def query_plans(statements):
+    """
+    Runs EXPLAIN QUERY PLAN for each captured statement; returns (statement, plan details) pairs.
+    """
+    with db_engine.connect() as conn:
+        return [
+            (statement, [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()])
+            for statement, parameters in statements
+        ]
+
+
+def full_scans(statements):
+    """
+    Returns the captured statements (with their plans) that scan the artifact,
+    artifact_history, artifact_reference or artifact_impact table.
+    """
+    return [
+        (statement, details) for statement, details in query_plans(statements)
+        if any(FULL_SCAN.search(detail) for detail in details)
+    ]
+
+
+def plan_steps(statements, run):
+    """
+    Calls run() and returns the plan steps of the statements it sent.
+    """
+    start = len(statements)
+    run()
+    return [detail for _, details in query_plans(statements[start:]) for detail in details]
+
+
+def test_crud_functions_use_indexes(workspace, captured_statements):
+    first = create_new_artifact(workspace.id, "plan_doc", "Plan Title", "Plan content for the query plan test")
+    create_new_artifact(workspace.id, "plan_doc_2", "Other", "Other content")
+
+    page, _ = list_artifacts(workspace_id=workspace.id, limit=1, page=2)
+    list_artifacts(workspace_id=workspace.id, limit=1, cursor=encode_cursor(page[0]))
+    list_artifacts(workspace_id=workspace.id, limit=-1)
+    search_artifacts(workspace_id=workspace.id, art_type="doc", status="current", version=1, limit=5)
+    search_artifacts(workspace_id=workspace.id, keyword="content", limit=5)
+    fulltext_search_artifacts(workspace_id=workspace.id, keyword="query plan", limit=5)
+    get_artifact_by_internal_id(first.id)
+    get_current_artifact("plan_doc")
+    get_artifact_versions("plan_doc")
+    update_artifact_version("plan_doc", "Plan Title 2", "Plan content 2", new_art_type="doc")
+    rollback_artifact_version("plan_doc", 1)
+    set_artifact_meta("plan_doc", new_title="Plan Title 3")
+    # Archived versions in artifact_history: versions, search, point reads and retention
+    update_artifact_version("plan_doc_2", "Other 2", "Other content 2", new_art_type="doc")
+    get_artifact_versions("plan_doc")
+    get_artifact_versions("plan_doc", columns=["id", "document_id", "version"])
+    search_artifacts(workspace_id=workspace.id, status="archived", version=1, limit=5)
+    search_artifacts(workspace_id=workspace.id, status="archived", keyword="content", limit=5)
+    rollback_artifact_version("plan_doc_2", 1)
+    prune_artifact_versions(workspace.id, keep_last=3)
+    prune_artifact_versions(workspace.id, max_age_days=30)
+    tag_artifact_version("plan_doc", 1, "baseline")
+    set_artifact_indexed(first.id)
+    set_artifacts_indexed({get_current_artifact("plan_doc_2").id: "hash"}, "model")
+    get_current_artifacts(["plan_doc", "plan_doc_2"])
+    apply_artifact_batch([
+        {"op": "create", "document_id": "plan_batch", "workspace_id": workspace.id, "title": "Batch", "content": "Batch content"},
+        {"op": "update", "document_id": "plan_batch", "title": "Batch 2"},
+        {"op": "delete", "document_id": "plan_batch", "version": 1},
+        {"op": "delete", "document_id": "plan_batch"},
+    ])
+    delete_artifacts_by_document("plan_doc", version=2)
+    delete_artifact_by_id(first.id)
+    delete_artifacts_by_document("plan_doc_2")
+
+    assert captured_statements
+    assert any("artifact_history" in statement for statement, _ in captured_statements)
+    offenders = full_scans(captured_statements)
+    assert offenders == [], "full table scans:\n" + "\n".join(f"{stmt}\n  -> {plan}" for stmt, plan in offenders)
+
+
+def test_reference_and_stale_queries_use_indexes(workspace, captured_statements):
+    srs = create_new_artifact(workspace.id, "plan_srs", "SRS", "Requirements")
+    create_new_artifact(workspace.id, "plan_design", "Design", "Design", references=[srs.id])
+    create_new_artifact(workspace.id, "plan_test", "Test", "Tests", references=["plan_design"])
+    # Marks plan_design and plan_test stale through artifact_impact
+    update_artifact_version("plan_srs", "SRS", "Requirements 2", new_art_type="doc")
+
+    dependents = plan_steps(captured_statements, lambda: get_artifact_dependents("plan_srs"))
+    stale = plan_steps(captured_statements, lambda: list_stale_artifacts(workspace.id))
+    get_artifact_dependencies("plan_test")
+    get_artifact_impact("plan_srs")
+
+    # "Who references X" walks the reversed edges, and the stale listing reads only stale rows in order
+    assert any("ix_artifact_reference_target" in step for step in dependents)
+    assert any("ix_artifact_workspace_stale" in step for step in stale)
+    assert not any("TEMP B-TREE" in step for step in stale)
+    offenders = full_scans(captured_statements)
+    assert offenders == [], "full table scans:\n" + "\n".join(f"{stmt}\n  -> {plan}" for stmt, plan in offenders)
@@ -0,0 +1,78 @@
+import pytest
+from sqlmodel import Session, delete
+from backend.crud.artifact import create_new_artifact, update_artifact_version, get_current_artifact, list_stale_artifacts
+from backend.crud.workspace import create_workspace
+from backend.models.artifact import Artifact, ArtifactHistory, ArtifactImpact
+from backend.crud.cache import current_artifact_cache
+from backend.services import regeneration
+from backend.services.jobs import wait_for_job
+from backend.config import db_engine, init_db
+
+init_db()
+
+
+@pytest.fixture(autouse=True)
+def clear_artifacts_table():
+    with Session(db_engine) as session:
+        session.exec(delete(Artifact))
+        session.exec(delete(ArtifactHistory))
+        session.exec(delete(ArtifactImpact))
+        session.commit()
+    current_artifact_cache.clear()
+
+
+@pytest.fixture
+def calls():
+    # A generator for a test-only art_type that records its calls instead of calling the LLM
+    calls = []
+
+    @regeneration.register_generator("summary")
+    def summarize(artifact, sources):
+        calls.append(artifact.document_id)
+        return " + ".join(source.content for source in sources)
+
+    yield calls
+    regeneration.generators.pop("summary")
+
+
+def test_regenerate_stale_artifacts_in_dependency_order(calls):
+    workspace = create_workspace(title="Regeneration")
+    create_new_artifact(workspace.id, "srs", "SRS", "srs v1")
+    create_new_artifact(workspace.id, "notes", "Notes", "notes")
+    # top depends on mid, which depends on srs; created top first so id order is wrong
+    create_new_artifact(workspace.id, "top", "Top", "", art_type="summary", references=["mid", "notes"])
+    create_new_artifact(workspace.id, "mid", "Mid", "", art_type="summary", references=["srs"])
+    create_new_artifact(workspace.id, "manual", "Manual", "", references=["srs"])  # no generator
+
+    update_artifact_version("srs", "SRS", "srs v2", "doc")
+    result = regeneration.regenerate_stale_artifacts(workspace.id)
+
+    assert calls == ["mid", "top"]
+    assert result["total"] == 2 and result["regenerated"] == 2 and result["failed"] == 0
+    assert get_current_artifact("mid").content == "srs v2"
+    assert get_current_artifact("top").content in ("srs v2 + notes", "notes + srs v2")
+    assert [artifact.document_id for artifact in list_stale_artifacts(workspace.id)] == ["manual"]
+
+    # Nothing is stale any more: a second run generates nothing
+    assert regeneration.regenerate_stale_artifacts(workspace.id)["total"] == 0
+    assert calls == ["mid", "top"]
+
+
+def test_regeneration_order_with_cycle():
+    artifacts = [Artifact(document_id=name, title=name, content="", content_hash="") for name in "abcd"]
+    edges = {"a": ["b"], "b": ["a"], "c": ["d"], "d": []}
+    assert [artifact.document_id for artifact in regeneration.regeneration_order(artifacts, edges)] == ["d", "c", "a", "b"]
+
+
+def test_start_regeneration_records_progress(calls):
+    workspace = create_workspace(title="Regeneration")
+    create_new_artifact(workspace.id, "srs", "SRS", "srs v1")
+    create_new_artifact(workspace.id, "derived", "Derived", "", art_type="summary", references=["srs"])
+    update_artifact_version("srs", "SRS", "srs v2", "doc")
+
+    task_id = regeneration.start_regeneration(workspace.id)["task_id"]
+    wait_for_job(task_id, timeout=10)
+    task = regeneration.get_regeneration_status(task_id)
+    assert task["status"] == "completed"
+    assert task["regenerated"] == 1 and task["done"] == task["total"] == 1
+    assert calls == ["derived"]
@@ -1,3 +1,4 @@
+import time
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
@@ -75,3 +76,31 @@ def test_delete_workspace():
     # Ensure it was deleted
     get_response = client.get(f"/workspaces/{workspace_id}")
     assert get_response.status_code == 404  # Not found
+
+# Test retention rules and a compaction run
+def test_compact_workspace():
+    data = {"title": "Retention", "retention_keep_last": 2}
+    create_response = client.post("/workspaces/", json=data)
+    assert create_response.json()["retention_keep_last"] == 2
+    workspace_id = create_response.json()["id"]
+
+    response = client.post(f"/workspaces/{workspace_id}/compact")
+    assert response.status_code == 202
+    task_id = response.json()["task_id"]
+
+    for _ in range(100):
+        task = client.get(f"/workspaces/compaction_status/{task_id}").json()
+        if task["status"] not in ("queued", "in-progress"):
+            break
+        time.sleep(0.05)
+    assert task["status"] == "completed"
+    assert task["bytes_reclaimed"] >= 0
+
+    # Also visible through the generic job endpoints
+    job = client.get(f"/jobs/{task_id}").json()
+    assert job["kind"] == "compaction" and job["status"] == "completed"
+    assert client.post(f"/jobs/{task_id}/cancel").json()["status"] == "completed"
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/workspaces/compaction_status/missing").status_code == 404
+
+    assert client.post("/workspaces/999999/compact").status_code == 404
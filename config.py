@@ -9,6 +9,9 @@ class Config:
     DEBUG =  os.getenv("DEBUG", "False").lower() == "true" 
     
     VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "./vector_db")
+    # On-disk embedding cache shared with the backend ("" disables it)
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.db")
+    EMBEDDING_QUERY_CACHE_SIZE = int(os.getenv("EMBEDDING_QUERY_CACHE_SIZE", 256))
     OUTPUT_DIR = os.getenv("OUTPUT_DIR", "./output")
     # Add other configurations as needed
 
@@ -70,10 +70,15 @@ def list_artifacts(
     art_type: Optional[str] = None,
     version: Optional[int] = None, 
     status: Optional[str] = None, 
-    keyword: Optional[str] = None
+    keyword: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_content: bool = True,
+    fields: Optional[List[str]] = None
 ):
     """
     List artifacts for a workspace with optional filters and pagination.
+    Pass the `next_cursor` of the previous response as `cursor` to page without OFFSET.
+    For table views, `include_content=False` or `fields=[...]` returns slim items.
     """
     url = f"{BACKEND_URL}/artifacts/"
     params = {
@@ -89,6 +94,12 @@ def list_artifacts(
         params["status"] = status
     if keyword is not None:
         params["keyword"] = keyword
+    if cursor is not None:
+        params["cursor"] = cursor
+    if not include_content:
+        params["include_content"] = "false"
+    if fields:
+        params["fields"] = ",".join(fields)
     response = requests.get(url, params=params)
     response.raise_for_status()
     return response.json()
@@ -100,12 +111,33 @@ def search_artifacts(
     art_type: Optional[str] = None,
     version: Optional[int] = None, 
     status: Optional[str] = None, 
-    keyword: Optional[str] = None
+    keyword: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
     """
     Search artifacts (alias for list_artifacts).
     """
-    return list_artifacts(workspace_id, page, limit, art_type, version, status, keyword)
+    return list_artifacts(workspace_id, page, limit, art_type, version, status, keyword, cursor)
+
+def semantic_search(
+    workspace_id: int,
+    query: str,
+    k: int = 10,
+    art_type: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """
+    Semantic search over the indexed artifacts: ranked chunks with artifact id, version and score.
+    """
+    url = f"{BACKEND_URL}/artifacts/semantic_search"
+    params = {"workspace_id": workspace_id, "q": query, "k": k}
+    if art_type is not None:
+        params["art_type"] = art_type
+    if status is not None:
+        params["status"] = status
+    response = requests.get(url, params=params)
+    response.raise_for_status()
+    return response.json()
 
 def get_artifact_by_id(artifact_id: int):
     """
@@ -239,6 +271,15 @@ def get_reindexing_status(task_id: str):
     response.raise_for_status()
     return response.json()
 
+def cancel_reindexing(task_id: str):
+    """
+    Cancel a reindexing task by task ID.
+    """
+    url = f"{BACKEND_URL}/artifacts/reindex_cancel/{task_id}"
+    response = requests.post(url)
+    response.raise_for_status()
+    return response.json()
+
 def get_all_reindexing_status():
     """
     Get the status of all reindexing tasks.
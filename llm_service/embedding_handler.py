@@ -1,10 +1,14 @@
 # /llm_service/embedding_handler.py
 from llama_index.embeddings.ollama import OllamaEmbedding
 from config import config
+from backend.rag.embedding_cache import CachedEmbedding
 
 class EmbeddingHandler:
     def __init__(self):
         self.embedding_model = OllamaEmbedding(model_name=config.EMBEDDING_MODEL, base_url=config.LLM_HOST, request_timeout=config.LLM_TIMEOUT)
+        if config.EMBEDDING_CACHE_PATH:
+            # Same cache file as the backend, so documents embedded by either app are reused
+            self.embedding_model = CachedEmbedding(self.embedding_model, config.EMBEDDING_CACHE_PATH, config.EMBEDDING_QUERY_CACHE_SIZE)
         
     def get_embeddings(self, text_list):
         """